@@ -0,0 +1,214 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" run.py
+
+Benchmarks for the chart and xducer engines.
+
+    python benchmarks/run.py                       # print timings
+    python benchmarks/run.py --save baseline.json  # record a baseline
+    python benchmarks/run.py --compare baseline.json
+
+Each case is timed with `timeit`, taking the best of several repeats, and
+run once more under `tracemalloc` to find its peak memory.
+With `--compare`, cases that got slower (or hungrier) than the baseline
+by more than `--tolerance` are reported, and the exit status is 1.
+Cases cover sequence lengths from 3 to 500, multi-character graphemes,
+and a Unicode-aware cost function; `--max-length` and `--match` select a
+subset.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import argparse
+import json
+import random
+import re
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+import unicodedata
+
+import pontospell.chart as chart
+import pontospell.xducer as px
+
+                                                  #pylint: disable=invalid-name
+class Case(NamedTuple):
+    """ One benchmark: a name, the sequence length, and what to run. """
+    name: str
+    length: int
+    function: Callable[[], Any]
+Measurement = Dict[str, float]
+                                                  #pylint: enable=invalid-name
+
+LENGTHS: List[int] = [3, 10, 30, 100, 500]
+LETTERS: str = 'abcdefghijklmnopqrstuvwxyz'
+WELSH: List[str] = ['a', 'b', 'c', 'ch', 'd', 'dd', 'e', 'f', 'ff', 'g',
+                    'ng', 'h', 'i', 'l', 'll', 'm', 'n', 'o', 'p', 'ph',
+                    'r', 'rh', 's', 't', 'th', 'u', 'w', 'y']
+SPECIALS: List[str] = ['-', "'", 'e\N{COMBINING ACUTE ACCENT}',
+                       '\N{LATIN SMALL LETTER E WITH CIRCUMFLEX}']
+
+def misspell(word: Sequence, alphabet: Sequence, rng: random.Random,
+             rate: float = 0.2) -> List:
+    """ Return a copy of word with about `rate` of its elements edited. """
+    spelling: List = []
+    for element in word:
+        roll: float = rng.random()
+        if roll < rate / 3:
+            continue  # omission
+        if roll < rate * 2 / 3:
+            spelling.append(rng.choice(alphabet))  # substitution
+        elif roll < rate:
+            spelling.extend([element, rng.choice(alphabet)])  # intrusion
+        else:
+            spelling.append(element)
+    return spelling
+
+def unicode_ins_cost(insertion: Any) -> chart.Cost:
+    """ 1 for letters, 0.2 for other symbols. """
+    return (1 if unicodedata.category(str(insertion)[0]).startswith('L')
+            else 0.2)
+
+def bind(function: Callable, *args: Any, **kwargs: Any) -> Callable[[], Any]:
+    """ Freeze the arguments of one case. """
+    return lambda: function(*args, **kwargs)
+
+def make_cases(max_length: int) -> List[Case]:
+    """ Return all benchmark cases up to the given sequence length. """
+    rng = random.Random(1)
+    cases: List[Case] = []
+    for length in (length for length in LENGTHS if length <= max_length):
+        source: str = ''.join(rng.choice(LETTERS) for _ in range(length))
+        target: str = ''.join(misspell(source, LETTERS, rng))
+        graphemes: List[str] = [rng.choice(WELSH) for _ in range(length)]
+        grapheme_target: List[str] = misspell(graphemes, WELSH, rng)
+        unicode_target: List[str] = misspell(
+            source, LETTERS + ''.join(SPECIALS), rng)
+        analysis = chart.levenshtein(source, target)
+        flat_analysis = chart.levenshtein(
+            source, target, engine=chart.Engine.FLAT)
+        cases.extend([
+            Case(f'chart.levenshtein/dict/{length}', length,
+                 bind(chart.levenshtein, source, target)),
+            Case(f'chart.levenshtein/flat/{length}', length,
+                 bind(chart.levenshtein, source, target,
+                      engine=chart.Engine.FLAT)),
+            Case(f'chart.levenshtein/graphemes/{length}', length,
+                 bind(chart.levenshtein, graphemes, grapheme_target)),
+            Case(f'chart.levenshtein/unicode-costs/{length}', length,
+                 bind(chart.levenshtein, source, unicode_target,
+                      ins_costs=unicode_ins_cost)),
+            Case(f'chart.distance/{length}', length,
+                 bind(chart.distance, source, target)),
+            Case(f'chart.get_one_backtrace/dict/{length}', length,
+                 bind(chart.get_one_backtrace, analysis)),
+            Case(f'chart.get_one_backtrace/flat/{length}', length,
+                 bind(chart.get_one_backtrace, flat_analysis)),
+            Case(f'chart.vertical_alignment/{length}', length,
+                 bind(chart.vertical_alignment, analysis)),
+            Case(f'xducer.count_optimal_alignments/{length}', length,
+                 bind(px.count_optimal_alignments,
+                      px.arguments(source, target)))])
+        # The recursive engine runs out of stack on long sequences, and the
+        # number of co-optimal parses can grow exponentially with length.
+        # Each call needs fresh `Arguments`, whose memory would otherwise
+        # answer every call after the first.
+        if length <= 100:
+            cases.append(Case(
+                f'xducer.relate/just_one/{length}', length,
+                lambda source=source, target=target: px.relate(
+                    px.arguments(source, target, just_one=True))))
+            parse: px.Parse = px.relate(
+                px.arguments(source, target, just_one=True))[0]
+            cases.append(Case(f'xducer.vertical_align/{length}', length,
+                              bind(px.vertical_align, parse)))
+        if length <= 10:
+            cases.append(Case(
+                f'xducer.relate/all/{length}', length,
+                lambda source=source, target=target: px.relate(
+                    px.arguments(source, target))))
+            cases.append(Case(
+                f'xducer.relate/all-graphemes/{length}', length,
+                lambda source=graphemes, target=grapheme_target: px.relate(
+                    px.arguments(source, target))))
+    cases.append(Case(
+        'xducer.relate/all/intention', 9,
+        lambda: px.relate(px.arguments('intention', 'execution'))))
+    cases.append(Case(
+        'xducer.iter_relate/all/intention', 9,
+        lambda: list(px.iter_relate(px.arguments('intention', 'execution')))))
+    return cases
+
+def measure(case: Case, repeat: int, budget: float) -> Measurement:
+    """ Return best time per call and peak memory for one case. """
+    timer = timeit.Timer(case.function)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * budget / max(elapsed, 1e-9) / 5))
+    seconds: float = min(timer.repeat(repeat=repeat, number=number)) / number
+    tracemalloc.start()
+    case.function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': seconds, 'peak_bytes': float(peak)}
+
+def regressions(results: Dict[str, Measurement],
+                baseline: Dict[str, Measurement],
+                tolerance: float) -> List[str]:
+    """ Describe each measurement that is worse than its baseline. """
+    messages: List[str] = []
+    for name, measurement in results.items():
+        if name not in baseline:
+            continue
+        for key, value in measurement.items():
+            before: float = baseline[name].get(key, 0)
+            if before and value > before * (1 + tolerance):
+                messages.append(
+                    f'{name}: {key} {before:.4g} -> {value:.4g} '
+                    f'({value / before - 1:+.0%})')
+    return messages
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """ Run the benchmarks; return exit status. """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--max-length', type=int, default=max(LENGTHS))
+    parser.add_argument('--match', default='',
+                        help='only run cases whose names match this regex')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.2,
+                        help='approximate seconds to spend per repeat')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='compare with this JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+    results: Dict[str, Measurement] = {}
+    for case in make_cases(args.max_length):
+        if not re.search(args.match, case.name):
+            continue
+        results[case.name] = measure(case, args.repeat, args.budget)
+        print(f"{case.name:<45} {results[case.name]['seconds'] * 1e3:12.4f} ms"
+              f" {results[case.name]['peak_bytes'] / 1024:12.1f} KiB")
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as stream:
+            json.dump({'python': sys.version, 'results': results}, stream,
+                      indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as stream:
+            baseline: Dict[str, Measurement] = json.load(stream)['results']
+        messages: List[str] = regressions(results, baseline, args.tolerance)
+        for message in messages:
+            print('REGRESSION', message)
+        return 1 if messages else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -0,0 +1,21 @@
+# developed under python 3.6.3 from anaconda
+""" __main__.py
+
+Run `python -m pontospell`; see `pontospell.cli`.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+import sys
+
+from pontospell.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
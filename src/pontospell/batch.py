@@ -0,0 +1,235 @@
+# developed under python 3.6.3 from anaconda
+""" batch.py
+
+Score many pairs of sequences at once, optionally in several processes.
+
+>>> import pontospell.batch as batch
+>>> pairs = [('intention', 'execution'), ('dag', 'doge')]
+>>> batch.levenshtein_many(pairs, distance_only=True)
+[8, 3]
+>>> print(batch.levenshtein_many(pairs)[1].backtrace[1].cell)
+Cell(this_cost=2, cumulative_cost=2, operation=<Operation.SUB: 's'>)
+
+Results come back in the same order as the pairs went in, whether they
+are computed in this process (the default) or spread over a pool of
+`workers` processes in chunks of `chunk_size` pairs.
+Cost functions must reach the worker processes, so pass either a
+`CostFunctions` made of module-level functions, which can be pickled, or
+the name under which a `CostFunctions` was given to `register_costs`.
+Names are looked up in the worker, so register them when your module is
+imported, not inside `if __name__ == '__main__'`.
+A name of the form 'module:attribute' that is not registered is imported
+instead, so a `CostFunctions` defined in any importable module can be
+named, as on the command line.
+
+Many spellings of one word share long prefixes.
+`levenshtein_targets` aligns them in sorted order with one
+`incremental.IncrementalAligner`, so the rows of the distance matrix for
+a prefix shared with the previous spelling are computed only once:
+>>> batch.levenshtein_targets('because', ['becuz', 'because', 'becaus'],
+...                           distance_only=True)
+[4, 0, 1]
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from importlib import import_module
+from itertools import islice
+from typing import (
+    Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple,
+    Optional, Sequence, Tuple, Union)
+
+from pontospell.chart import (
+    Backtrace, Cost, Engine, distance, get_one_backtrace, levenshtein,
+    min_edit_distance)
+from pontospell.incremental import IncrementalAligner
+from pontospell.xducer import CostFunctions, Parses, arguments, relate
+
+                                                  #pylint: disable=invalid-name
+Pair = Tuple[Sequence, Sequence]
+CostSpec = Union[str, CostFunctions]
+class Scored(NamedTuple):
+    """ Distance and one optimal alignment for a pair. """
+    distance: Cost
+    backtrace: Backtrace
+class ChartTask(NamedTuple):
+    """ What to compute for each pair sent to `chart`. """
+    costs: CostSpec
+    engine: Engine
+    distance_only: bool
+class XducerTask(NamedTuple):
+    """ What to compute for each pair sent to `xducer`. """
+    costs: CostSpec
+    just_one: bool
+                                                  #pylint: enable=invalid-name
+
+COST_REGISTRY: Dict[str, CostFunctions] = {'levenshtein': CostFunctions()}
+""" Cost functions that can be referred to by name across processes. """
+
+def register_costs(name: str, costs: CostFunctions) -> None:
+    """ Make cost functions available to batch workers under this name. """
+    COST_REGISTRY[name] = costs
+
+def import_costs(name: str) -> CostFunctions:
+    """Import the `CostFunctions` named as 'module:attribute'.
+
+    Raises `ValueError` if there is none.
+    >>> import_costs('pontospell.xducer:CostFunctions')
+    Traceback (most recent call last):
+    ...
+    ValueError: 'pontospell.xducer:CostFunctions' is not a CostFunctions
+    """
+    module_name, _, attribute = name.partition(':')
+    try:
+        loaded: Any = getattr(import_module(module_name), attribute)
+    except (ImportError, AttributeError, ValueError) as error:
+        raise ValueError(f'cannot import cost functions {name!r}: {error}'
+                        ) from None
+    if not isinstance(loaded, CostFunctions):
+        raise ValueError(f'{name!r} is not a CostFunctions')
+    return loaded
+
+def resolve_costs(costs: CostSpec) -> CostFunctions:
+    """Return the cost functions, looking them up if given a name.
+
+    Names containing ':' that are not registered are imported, and then
+    registered under that name.
+    """
+    if isinstance(costs, str):
+        try:
+            return COST_REGISTRY[costs]
+        except KeyError:
+            if ':' not in costs:
+                raise ValueError(
+                    f'no cost functions registered as {costs!r}') from None
+        functions: CostFunctions = import_costs(costs)
+        register_costs(costs, functions)
+        return functions
+    return costs
+
+def score_chart_chunk(
+        task: ChartTask, pairs: List[Pair]) -> List[Union[Cost, Scored]]:
+    """ Score a chunk of pairs with `chart`; runs in the worker. """
+    functions: CostFunctions = resolve_costs(task.costs)
+    results: List[Union[Cost, Scored]] = []
+    source: Sequence
+    target: Sequence
+    for source, target in pairs:
+        if task.distance_only:
+            results.append(distance(source, target, functions.insert,
+                                    functions.delete, functions.substitute))
+            continue
+        analysis = levenshtein(
+            source, target, functions.insert, functions.delete,
+            functions.substitute, engine=task.engine)
+        results.append(Scored(min_edit_distance(analysis),
+                              get_one_backtrace(analysis)))
+    return results
+
+def score_xducer_chunk(task: XducerTask, pairs: List[Pair]) -> List[Parses]:
+    """ Relate a chunk of pairs with `xducer`; runs in the worker. """
+    functions: CostFunctions = resolve_costs(task.costs)
+    return [relate(arguments(source, target, functions, task.just_one))
+            for source, target in pairs]
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Yield successive lists of up to `size` items.
+
+    >>> list(chunked('abcde', 2))
+    [['a', 'b'], ['c', 'd'], ['e']]
+    """
+    iterator = iter(items)
+    while True:
+        chunk: List = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def map_chunks(function: Callable[[Any, List[Pair]], List],
+               task: Any, pairs: Iterable[Pair],
+               workers: Optional[int], chunk_size: int) -> Iterator:
+    """Apply `function` to chunks of pairs and yield results in order.
+
+    With no `workers`, chunks are scored in this process.
+    Otherwise at most two chunks per worker are in flight at once, so
+    `pairs` can be a long stream.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive')
+    if not workers:
+        for chunk in chunked(pairs, chunk_size):
+            yield from function(task, chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in chunked(pairs, chunk_size):
+            pending.append(pool.submit(function, task, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def iter_levenshtein(pairs: Iterable[Pair], costs: CostSpec = 'levenshtein',
+                     engine: Engine = Engine.FLAT,
+                     distance_only: bool = False,
+                     workers: Optional[int] = None,
+                     chunk_size: int = 256) -> Iterator[Union[Cost, Scored]]:
+    """Yield a `chart` score for each pair, in order.
+
+    Each score is a `Scored` unless `distance_only`, in which case it is
+    just the minimal edit distance and no backtrace is made or sent back.
+    """
+    return map_chunks(score_chart_chunk,
+                      ChartTask(costs, engine, distance_only),
+                      pairs, workers, chunk_size)
+
+def levenshtein_many(pairs: Iterable[Pair], costs: CostSpec = 'levenshtein',
+                     engine: Engine = Engine.FLAT,
+                     distance_only: bool = False,
+                     workers: Optional[int] = None,
+                     chunk_size: int = 256) -> List[Union[Cost, Scored]]:
+    """ Return a list of `chart` scores; see `iter_levenshtein`. """
+    return list(iter_levenshtein(
+        pairs, costs, engine, distance_only, workers, chunk_size))
+
+def levenshtein_targets(source: Sequence, targets: Sequence[Sequence],
+                        costs: CostSpec = 'levenshtein',
+                        distance_only: bool = False
+                       ) -> List[Union[Cost, Scored]]:
+    """Return a `chart` score for one source and each target, in order.
+
+    Scores are as from `iter_levenshtein`, but each target only extends or
+    cuts back the rows left by the target before it in sorted order.
+    Targets whose elements cannot be sorted are taken in the order given.
+    """
+    functions: CostFunctions = resolve_costs(costs)
+    aligner = IncrementalAligner(source, functions.insert, functions.delete,
+                                 functions.substitute)
+    order: List[int]
+    try:
+        order = sorted(range(len(targets)), key=lambda i: tuple(targets[i]))
+    except TypeError:  # unorderable elements
+        order = list(range(len(targets)))
+    results: List[Union[Cost, Scored]] = [0] * len(targets)
+    for index in order:
+        cost: Cost = aligner.update(targets[index])
+        results[index] = (cost if distance_only
+                          else Scored(cost, aligner.backtrace()))
+    return results
+
+def relate_many(pairs: Iterable[Pair], costs: CostSpec = 'levenshtein',
+                just_one: bool = False,
+                workers: Optional[int] = None,
+                chunk_size: int = 256) -> List[Parses]:
+    """ Return the `xducer.relate` parses for each pair, in order. """
+    return list(map_chunks(score_xducer_chunk, XducerTask(costs, just_one),
+                           pairs, workers, chunk_size))
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -0,0 +1,73 @@
+# developed under python 3.6.3 from anaconda
+""" bitparallel.py
+
+Compute Levenshtein’s default distance many cells at a time.
+
+With the default costs of `chart` and `xducer` (1 to insert, 1 to
+delete, 2 to substitute unlike elements) substituting is never cheaper
+than deleting and inserting, so the minimal edit distance between
+sequences of lengths n and m is n + m − 2·LCS, where LCS is the length of
+their longest common subsequence.
+The length of the LCS can be found a whole row of the matrix at a time,
+holding the row as the bits of one Python integer (after Hyyrö):
+>>> from pontospell.bitparallel import lcs_length, levenshtein_distance
+>>> lcs_length('intention', 'execution')
+5
+>>> levenshtein_distance('intention', 'execution')
+8
+
+Elements can be of any hashable type; a table of the positions where
+each distinct element occurs is built for each call:
+>>> levenshtein_distance(['ll', 'a', 'dd'], ['ll', 'a'])
+1
+
+`chart.distance` uses this module whenever it is given the default cost
+functions.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from typing import Any, Dict, Sequence
+
+def position_masks(sequence: Sequence) -> Dict[Any, int]:
+    """Return, for each distinct element, a mask of where it occurs.
+
+    Bit n is set if the element is at position n.
+    Raises `TypeError` if an element cannot be hashed.
+    >>> sorted(position_masks('abca').items())
+    [('a', 9), ('b', 2), ('c', 4)]
+    """
+    masks: Dict[Any, int] = {}
+    for pos, element in enumerate(sequence):
+        masks[element] = masks.get(element, 0) | 1 << pos
+    return masks
+
+def lcs_length(source: Sequence, target: Sequence) -> int:
+    """Return the length of a longest common subsequence.
+
+    Bits run along the longer sequence, so the loop runs once per element
+    of the shorter.
+    Raises `TypeError` if an element cannot be hashed.
+    """
+    if len(source) < len(target):
+        source, target = target, source
+    if not target:
+        return 0
+    masks: Dict[Any, int] = position_masks(source)
+    full: int = (1 << len(source)) - 1
+    row: int = full  # zero bits mark where the LCS has grown
+    for element in target:
+        matches: int = row & masks.get(element, 0)
+        row = ((row + matches) | (row - matches)) & full
+    return len(source) - bin(row).count('1')
+
+def levenshtein_distance(source: Sequence, target: Sequence) -> int:
+    """ Return the distance with the default costs, from the LCS. """
+    return len(source) + len(target) - 2 * lcs_length(source, target)
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
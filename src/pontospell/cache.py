@@ -0,0 +1,315 @@
+# developed under python 3.6.3 from anaconda
+""" cache.py
+
+Remember scores of pairs already seen, in memory and optionally on disk.
+
+Spelling data repeat themselves: the same misspellings of the same words
+turn up again and again.
+A `ResultCache` keeps the score of each pair under a key made of the two
+sequences and a fingerprint of the cost functions, so a pair is only
+aligned the first time it is seen with those costs.
+>>> import pontospell.cache as pcache
+>>> cache = pcache.ResultCache()
+>>> cache.levenshtein('because', 'becuz').distance
+4
+>>> cache.levenshtein('because', 'becuz').distance
+4
+>>> cache.cache_info()
+ResultCacheInfo(hits=1, disk_hits=0, misses=1, maxsize=4096, currsize=1)
+
+Parses from `xducer.relate` are cached the same way:
+>>> len(cache.relate('intention', 'execution'))
+134
+
+Given a `path`, results are also written to an SQLite database there,
+which later runs (and other processes) consult when their memory misses.
+Fingerprints are computed from the code, defaults and closures of the
+cost functions and from the globals they read, so editing a cost function
+or a table it consults invalidates its old results.
+A cache computes the fingerprint of a set of functions only once, so
+call `cache_clear` after changing such a table in the same process.
+Callables that have no code of their own, such as bound methods, are
+fingerprinted by their `repr`, which usually changes from run to run;
+their results are cached in memory, but are not found on disk later.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from collections import OrderedDict
+import hashlib
+import pickle
+import sqlite3
+from types import CodeType, ModuleType
+from typing import (
+    Any, Callable, Dict, Hashable, NamedTuple, Optional, Set, Tuple)
+
+from pontospell.batch import Scored
+from pontospell.chart import (
+    DeleteCostFunction, Engine, InsertCostFunction,
+    SubstituteCostFunction, get_one_backtrace, lev_del_function,
+    lev_ins_function, lev_sub_function, levenshtein, min_edit_distance)
+from pontospell.costs import CompiledCosts
+from pontospell.xducer import CostFunctions, Parses, arguments, relate
+
+                                                  #pylint: disable=invalid-name
+CacheKey = Tuple[str, str, Tuple, Tuple]
+""" Kind of result, cost fingerprint, source, target. """
+class ResultCacheInfo(NamedTuple):
+    """ Statistics about a `ResultCache`. """
+    hits: int  # found in memory
+    disk_hits: int  # found only on disk
+    misses: int  # computed
+    maxsize: int
+    currsize: int  # entries in memory
+                                                  #pylint: enable=invalid-name
+
+def code_digest(code: CodeType, digest: Any) -> None:
+    """ Feed the parts of compiled code that define its behavior. """
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode('utf-8'))
+    for constant in code.co_consts:
+        if isinstance(constant, CodeType):
+            code_digest(constant, digest)
+        else:
+            digest.update(repr(constant).encode('utf-8'))
+
+def code_names(code: CodeType) -> Set[str]:
+    """ Return the names used by code, including its nested code. """
+    names: Set[str] = set(code.co_names)
+    for constant in code.co_consts:
+        if isinstance(constant, CodeType):
+            names |= code_names(constant)
+    return names
+
+def value_digest(value: Any, digest: Any, seen: Set[int]) -> None:
+    """ Feed a value a function reads from a global or a closure. """
+    if isinstance(value, ModuleType):
+        digest.update(value.__name__.encode('utf-8'))
+    elif callable(value):
+        function_digest(value, digest, seen)
+    else:
+        digest.update(repr(value).encode('utf-8'))
+
+def function_digest(function: Callable, digest: Any,
+                    seen: Optional[Set[int]] = None) -> None:
+    """Feed the identity and behavior of a callable.
+
+    That includes the current values of the globals it reads, such as a
+    table of costs, and of its closure cells.
+    Functions already in `seen` are fed only by name.
+    """
+    code: Optional[CodeType] = getattr(function, '__code__', None)
+    if code is None:
+        digest.update(repr(function).encode('utf-8'))
+        return
+    digest.update(getattr(function, '__module__', '').encode('utf-8'))
+    digest.update(getattr(function, '__qualname__', '').encode('utf-8'))
+    if seen is None:
+        seen = set()
+    elif id(function) in seen:  # recursion
+        return
+    seen.add(id(function))
+    code_digest(code, digest)
+    digest.update(repr(getattr(function, '__defaults__', None))
+                  .encode('utf-8'))
+    namespace: Dict[str, Any] = getattr(function, '__globals__', {})
+    for name in sorted(code_names(code)):
+        if name in namespace:
+            digest.update(name.encode('utf-8'))
+            value_digest(namespace[name], digest, seen)
+    for cell in getattr(function, '__closure__', None) or ():
+        value_digest(cell.cell_contents, digest, seen)
+
+def cost_fingerprint(*functions: Callable) -> str:
+    """Return a digest identifying these cost functions.
+
+    >>> from pontospell.chart import lev_ins_function, lev_del_function
+    >>> (cost_fingerprint(lev_ins_function, lev_del_function)
+    ...  == cost_fingerprint(lev_ins_function, lev_del_function))
+    True
+    >>> (cost_fingerprint(lev_ins_function, lev_del_function)
+    ...  == cost_fingerprint(lev_del_function, lev_ins_function))
+    False
+    """
+    digest = hashlib.sha1()
+    for function in functions:
+        function_digest(function, digest)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def pair_key(kind: str, fingerprint: str,
+             source: Any, target: Any) -> Optional[CacheKey]:
+    """ Return the key for a pair, or None if it cannot be hashed. """
+    key: CacheKey = (kind, fingerprint, tuple(source), tuple(target))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+class ResultCache:
+    """Scores of pairs, kept in memory and optionally in SQLite.
+
+    The `maxsize` most recently used results stay in memory.
+    Elements of the sequences must be hashable, or the pair is scored
+    without caching, and picklable, or the pair is kept only in memory.
+    Results are shared, so do not modify them.
+    """
+    def __init__(self, path: Optional[str] = None,
+                 maxsize: int = 4096, commit_every: int = 256) -> None:
+        self.maxsize: int = maxsize
+        self.commit_every: int = commit_every
+        self.memory: 'OrderedDict[CacheKey, Any]' = OrderedDict()
+        self.fingerprints: Dict[Tuple[Hashable, ...], str] = {}
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.uncommitted: int = 0
+        self.connection: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self.connection = sqlite3.connect(path)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS results'
+                ' (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+            self.connection.commit()
+
+    def __enter__(self) -> 'ResultCache':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def fingerprint(self, *functions: Callable) -> str:
+        """ Return the fingerprint of these functions, computed once. """
+        try:
+            return self.fingerprints[functions]
+        except KeyError:
+            fingerprint = self.fingerprints[functions] = (
+                cost_fingerprint(*functions))
+            return fingerprint
+        except TypeError:  # unhashable callable
+            return cost_fingerprint(*functions)
+
+    def disk_key(self, key: CacheKey) -> Optional[str]:
+        """Return the stable text under which a result is stored.
+
+        Returns None if the key cannot be pickled.
+        """
+        try:
+            pickled: bytes = pickle.dumps(key, protocol=4)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return None
+        return hashlib.sha1(pickled).hexdigest()
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """ Return the result stored under key, or None. """
+        result: Any = self.memory.get(key)
+        if result is not None:
+            self.hits += 1
+            self.memory.move_to_end(key)
+            return result
+        disk_key: Optional[str] = (
+            None if self.connection is None else self.disk_key(key))
+        if self.connection is not None and disk_key is not None:
+            row = self.connection.execute(
+                'SELECT value FROM results WHERE key = ?',
+                (disk_key,)).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                result = pickle.loads(row[0])
+                self.remember(key, result)
+                return result
+        self.misses += 1
+        return None
+
+    def remember(self, key: CacheKey, result: Any) -> None:
+        """ Keep a result in memory, dropping the least recently used. """
+        self.memory[key] = result
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def put(self, key: CacheKey, result: Any) -> None:
+        """ Store a result in memory and, if there is one, on disk. """
+        self.remember(key, result)
+        if self.connection is None:
+            return
+        disk_key: Optional[str] = self.disk_key(key)
+        if disk_key is None:
+            return
+        try:
+            value: bytes = pickle.dumps(result, protocol=4)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return
+        self.connection.execute(
+            'INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)',
+            (disk_key, value))
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Commit results written to disk so other processes see them. """
+        if self.connection is not None and self.uncommitted:
+            self.connection.commit()
+        self.uncommitted = 0
+
+    def close(self) -> None:
+        """ Commit and close the disk tier; memory stays usable. """
+        self.flush()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def cache_info(self) -> ResultCacheInfo:
+        """ Report on use of the cache. """
+        return ResultCacheInfo(self.hits, self.disk_hits, self.misses,
+                               self.maxsize, len(self.memory))
+
+    def cache_clear(self) -> None:
+        """ Forget results held in memory and reset the counters. """
+        self.memory.clear()
+        self.fingerprints.clear()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def levenshtein(self, source: Any, target: Any,
+                    ins_costs: InsertCostFunction = lev_ins_function,
+                    del_costs: DeleteCostFunction = lev_del_function,
+                    sub_costs: SubstituteCostFunction = lev_sub_function,
+                    engine: Engine = Engine.FLAT,
+                    costs: Optional[CompiledCosts] = None) -> Scored:
+        """ Return the `chart` distance and one optimal alignment. """
+        functions: CostFunctions = (
+            CostFunctions(ins_costs, del_costs, sub_costs) if costs is None
+            else costs.functions)
+        key: Optional[CacheKey] = pair_key(
+            'chart', self.fingerprint(*functions), source, target)
+        result: Optional[Scored] = None if key is None else self.get(key)
+        if result is None:
+            analysis = levenshtein(source, target, ins_costs, del_costs,
+                                   sub_costs, engine=engine, costs=costs)
+            result = Scored(min_edit_distance(analysis),
+                            get_one_backtrace(analysis))
+            if key is not None:
+                self.put(key, result)
+        return result
+
+    def relate(self, source: Any, target: Any,
+               costs: CostFunctions = CostFunctions(),
+               just_one: bool = False) -> Parses:
+        """ Return the `xducer.relate` parses for a pair. """
+        key: Optional[CacheKey] = pair_key(
+            'xducer-one' if just_one else 'xducer-all',
+            self.fingerprint(*costs), source, target)
+        result: Optional[Parses] = None if key is None else self.get(key)
+        if result is None:
+            result = relate(arguments(source, target, costs, just_one))
+            if key is not None:
+                self.put(key, result)
+        return result
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -62,11 +62,20 @@ phonemes to phonograms to costs as the core of a `sub_costs` argument.
 # Brett Kessler, Washington University in St. Louis, Psychology
 # http://spell.psychology.wustl.edu
 
+from array import array
 from enum import Enum
+from itertools import repeat
+from operator import itemgetter
 from typing import (
-    Any, Callable, Dict, Iterator, List, NamedTuple, NewType, Sequence, Tuple)
+    Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple,
+    NewType, Optional, Sequence, Tuple, cast, overload)
 import unicodedata
 
+import pontospell.bitparallel as bitparallel
+from pontospell.costs import CompiledCosts, CostTable
+import pontospell.instrument as instrument
+import pontospell.xducer as px
+
                                                   #pylint: disable=invalid-name
 SeqPos = int
 class Coordinates(NamedTuple):
@@ -90,7 +99,10 @@ InsertCostFunction = Callable[[Any], Cost]
 DeleteCostFunction = Callable[[Any], Cost]
 SubstituteCostFunction = Callable[[Any, Any], Cost]
 class PairAnalysis(NamedTuple):
-    """ Results of a string-edit analysis. """
+    """Results of a string-edit analysis.
+
+    Each analysis needs a matrix of its own; see `new_distance_matrix`.
+    """
     source: Sequence
     source_widest: int
     target: Sequence
@@ -98,16 +110,91 @@ class PairAnalysis(NamedTuple):
     ins_cost: InsertCostFunction
     del_cost: DeleteCostFunction
     sub_cost: SubstituteCostFunction
-    matrix: DistanceMatrix = DistanceMatrix(
-        {Coordinates(0, 0): Cell(0, 0, Operation.START)})
+    matrix: DistanceMatrix
 class EditStep(NamedTuple):
     """ One step in string-edit path. """
     source: Any
     target: Any
     cell: Cell
 Backtrace = NewType('Backtrace', List[EditStep])
+class Engine(Enum):
+    """ Ways of storing the dynamic programming matrix. """
+    DICT = 'dict'  # a `Cell` per `Coordinates` in a dict
+    FLAT = 'flat'  # parallel preallocated arrays; see `FlatMatrix`
+    NUMPY = 'numpy'  # `FlatMatrix` filled by NumPy; see `vectorized`
                                                   #pylint: enable=invalid-name
 
+OPERATION_CODES: Tuple[Operation, ...] = (
+    Operation.START, Operation.INS, Operation.DEL, Operation.SUB)
+""" Operations by the small-integer codes that `FlatMatrix` stores. """
+START_CODE, INS_CODE, DEL_CODE, SUB_CODE = range(len(OPERATION_CODES))
+
+class FlatMatrix(Mapping[Coordinates, Cell]):
+    """Distance matrix kept in flat arrays instead of a dict of cells.
+
+    Cells are stored row by row (one row per target position) at index
+    `target_pos * width + source_pos`.
+    Costs go into preallocated lists rather than `array('d')` so that they
+    keep whatever numeric type the cost functions return, and the
+    operation of each cell is an index into `OPERATION_CODES`.
+    Looking up a `Coordinates` builds the `Cell` on demand, so that
+    `min_edit_distance`, `get_one_backtrace`, and `vertical_alignment`
+    work unchanged.
+
+    >>> matrix = FlatMatrix(1, 2)
+    >>> len(matrix)
+    6
+    >>> matrix[Coordinates(0, 0)]
+    Cell(this_cost=0, cumulative_cost=0, operation=<Operation.START: 'start'>)
+    """
+    def __init__(self, target_len: int, source_len: int) -> None:
+        self.target_len: int = 0
+        self.source_len: int = 0
+        self.width: int = 1
+        self.this_costs: List[Cost] = [0]
+        self.cumulative_costs: List[Cost] = [0]
+        self.operations: array = array('b', bytes(1))
+        self.resize(target_len, source_len)
+
+    def resize(self, target_len: int, source_len: int) -> None:
+        """Make room for a matrix of a new shape.
+
+        The arrays grow as needed but never shrink, so a matrix can be
+        reused for many pairs without reallocating.
+        All cells but the origin are left with stale contents.
+        """
+        self.target_len = target_len
+        self.source_len = source_len
+        self.width = source_len + 1
+        extra: int = len(self) - len(self.operations)
+        if extra > 0:
+            self.this_costs.extend([0] * extra)
+            self.cumulative_costs.extend([0] * extra)
+            self.operations.extend(bytes(extra))
+        self.this_costs[0] = self.cumulative_costs[0] = 0
+        self.operations[0] = START_CODE
+
+    def index(self, coords: Coordinates) -> int:
+        """ Return position of the cell in the flat arrays. """
+        targ_pos, src_pos = coords
+        if not (0 <= targ_pos <= self.target_len
+                and 0 <= src_pos <= self.source_len):
+            raise KeyError(coords)
+        return targ_pos * self.width + src_pos
+
+    def __getitem__(self, coords: Coordinates) -> Cell:
+        index: int = self.index(coords)
+        return Cell(self.this_costs[index], self.cumulative_costs[index],
+                    OPERATION_CODES[self.operations[index]])
+
+    def __iter__(self) -> Iterator[Coordinates]:
+        for targ_pos in range(self.target_len + 1):
+            for src_pos in range(self.width):
+                yield Coordinates(targ_pos, src_pos)
+
+    def __len__(self) -> int:
+        return (self.target_len + 1) * self.width
+
 def print_len(elements: Any) -> int:
     """Return length of text in characters, excluding Mark characters.
 
@@ -196,6 +283,97 @@ def compute_min_edit_distance(analysis: PairAnalysis) -> None:
                           else ins_cell)
             analysis.matrix[coords] = cell
 
+def compute_flat_min_edit_distance(
+        analysis: PairAnalysis, table: Optional[CostTable] = None) -> None:
+    """Fill out a `FlatMatrix` for this analysis.
+
+    Produces the same cells as `compute_min_edit_distance`, including its
+    preference for substitution over deletion over insertion when costs tie,
+    but works on array indices instead of building and discarding `Cell`
+    objects.
+    Insertion and deletion costs are looked up once per element rather than
+    once per cell, and if a `CostTable` for the two sequences is given,
+    all costs are read from it instead of from the cost functions.
+    """
+    matrix: FlatMatrix = analysis.matrix  # type: ignore
+    this_costs: List[Cost] = matrix.this_costs
+    cumulative: List[Cost] = matrix.cumulative_costs
+    operations: array = matrix.operations
+    width: int = matrix.width
+    sub_rows: List[List[Cost]] = []
+    del_costs: List[Cost]
+    if table is None:
+        del_costs = [analysis.del_cost(src_element)
+                     for src_element in analysis.source]
+    else:
+        source_ids: List[int] = [table.source_index[src_element]
+                                 for src_element in analysis.source]
+        del_costs = [table.delete[src_id] for src_id in source_ids]
+        # The table's row of substitution costs for each source position:
+        sub_rows = [table.substitute[src_id] for src_id in source_ids]
+    src_pos: SeqPos
+    del_cost: Cost
+    for src_pos, del_cost in enumerate1(del_costs):
+        this_costs[src_pos] = del_cost
+        cumulative[src_pos] = cumulative[src_pos - 1] + del_cost
+        operations[src_pos] = DEL_CODE
+    above: int = 0
+    targ_element: Any
+    for targ_element in analysis.target:
+        if table is None:
+            fill_flat_row(
+                matrix, above, analysis.ins_cost(targ_element),
+                map(analysis.sub_cost, analysis.source, repeat(targ_element)),
+                del_costs)
+        else:
+            targ_id: int = table.target_index[targ_element]
+            fill_flat_row(matrix, above, table.insert[targ_id],
+                          map(itemgetter(targ_id), sub_rows), del_costs)
+        above += width
+
+def fill_flat_row(matrix: FlatMatrix, above: int, ins_cost: Cost,
+                  sub_costs: Iterable[Cost], del_costs: List[Cost]) -> None:
+    """Fill the row of a `FlatMatrix` after the row starting at `above`.
+
+    `ins_cost` is the cost of inserting the row’s target element,
+    `sub_costs` the cost of substituting it for each source element, and
+    `del_costs` the cost of deleting each source element.
+    `sub_costs` is read once, in order, so callers can pass a `map` over
+    the source rather than build a list for every row.
+    Ties are broken as in `compute_min_edit_distance`.
+    """
+    this_costs: List[Cost] = matrix.this_costs
+    cumulative: List[Cost] = matrix.cumulative_costs
+    operations: array = matrix.operations
+    row: int = above + matrix.width
+    this_costs[row] = ins_cost
+    cumulative[row] = cumulative[above] + ins_cost
+    operations[row] = INS_CODE
+    src_pos: SeqPos
+    sub_cost: Cost
+    for src_pos, sub_cost in enumerate(sub_costs, 1):
+        here: int = row + src_pos
+        sub_total: Cost = cumulative[above + src_pos - 1] + sub_cost
+        del_cost: Cost = del_costs[src_pos - 1]
+        del_total: Cost = cumulative[here - 1] + del_cost
+        ins_total: Cost = cumulative[above + src_pos] + ins_cost
+        if sub_total <= del_total and sub_total <= ins_total:
+            this_costs[here] = sub_cost
+            cumulative[here] = sub_total
+            operations[here] = SUB_CODE
+        elif del_total <= ins_total:
+            this_costs[here] = del_cost
+            cumulative[here] = del_total
+            operations[here] = DEL_CODE
+        else:
+            this_costs[here] = ins_cost
+            cumulative[here] = ins_total
+            operations[here] = INS_CODE
+
+def new_distance_matrix() -> DistanceMatrix:
+    """ Return an empty matrix holding only the origin. """
+    return DistanceMatrix({Coordinates(0, 0): Cell(0, 0, Operation.START)})
+
 def lev_ins_function(targ_element: Any) -> Cost:
     """ Return the cost of inserting this element.
 
@@ -220,17 +398,352 @@ def lev_sub_function(src_element: Any, targ_element: Any) -> Cost:
     #pylint: disable=unused-argument
     return 0 if src_element == targ_element else 2
 
+def default_costs(ins_costs: InsertCostFunction,
+                  del_costs: DeleteCostFunction,
+                  sub_costs: SubstituteCostFunction) -> bool:
+    """Tell whether these are Levenshtein’s cost functions, as defined here
+    or in `xducer`.
+    """
+    # Compared by identity, since cost functions need not be hashable.
+    return ((ins_costs is lev_ins_function
+             or ins_costs is px.lev_ins_function) and
+            (del_costs is lev_del_function
+             or del_costs is px.lev_del_function) and
+            (sub_costs is lev_sub_function
+             or sub_costs is px.lev_sub_function))
+
+def bitparallel_distance(source: Sequence, target: Sequence
+                        ) -> Optional[Cost]:
+    """Return the default distance from `bitparallel`.
+
+    Returns `None` if elements cannot be hashed.
+    Counts 'chart.bitparallel_calls' if recording.
+    """
+    try:
+        cost: Cost = bitparallel.levenshtein_distance(source, target)
+    except TypeError:  # unhashable elements
+        return None
+    if instrument.CURRENT is not None:
+        instrument.count('chart.bitparallel_calls')
+    return cost
+
+def compiled_table(costs: Optional[CompiledCosts],
+                   source: Sequence, target: Sequence) -> Optional[CostTable]:
+    """ Return the cost table for these sequences, if it can be made. """
+    if costs is None:
+        return None
+    try:
+        return costs.table(source, target)
+    except TypeError:  # unhashable elements
+        return None
+
+def counted_costs(source: Sequence, target: Sequence,
+                  ins_costs: InsertCostFunction,
+                  del_costs: DeleteCostFunction,
+                  sub_costs: SubstituteCostFunction
+                 ) -> Tuple[InsertCostFunction, DeleteCostFunction,
+                            SubstituteCostFunction]:
+    """If recording, count cells to fill and wrap costs to count calls.
+
+    The wrappers are for filling the matrix only; see `uncounted`.
+    """
+    if instrument.CURRENT is None:
+        return ins_costs, del_costs, sub_costs
+    instrument.count('chart.cells', (len(source) + 1) * (len(target) + 1) - 1)
+    return tuple(instrument.counting_costs(  # type: ignore
+        'chart', ('ins_calls', ins_costs), ('del_calls', del_costs),
+        ('sub_calls', sub_costs)))
+
+def uncounted(analysis: PairAnalysis,
+              ins_costs: InsertCostFunction,
+              del_costs: DeleteCostFunction,
+              sub_costs: SubstituteCostFunction) -> PairAnalysis:
+    """Return the analysis with the caller’s own cost functions.
+
+    An analysis filled with the wrappers from `counted_costs` would
+    otherwise keep counting after recording ends, and could not be pickled.
+    """
+    if (analysis.ins_cost is ins_costs and analysis.del_cost is del_costs
+            and analysis.sub_cost is sub_costs):
+        return analysis
+    return analysis._replace(
+        ins_cost=ins_costs, del_cost=del_costs, sub_cost=sub_costs)
+
 def levenshtein(source: Sequence, target: Sequence,
                 ins_costs: InsertCostFunction = lev_ins_function,
                 del_costs: DeleteCostFunction = lev_del_function,
-                sub_costs: SubstituteCostFunction = lev_sub_function
+                sub_costs: SubstituteCostFunction = lev_sub_function,
+                engine: Engine = Engine.DICT,
+                costs: Optional[CompiledCosts] = None
                ) -> PairAnalysis:
-    """ Compare two sequences and return analysis. """
-    analysis = PairAnalysis(
-        source, greatest_width(source), target, greatest_width(target),
-        ins_costs, del_costs, sub_costs)
-    compute_min_edit_distance(analysis)
-    return analysis
+    """Compare two sequences and return analysis.
+
+    `engine` chooses how the distance matrix is stored; `Engine.FLAT`
+    avoids most per-cell allocation and is faster on long sequences.
+    >>> result = levenshtein('dag', 'doge', engine=Engine.FLAT)
+    >>> min_edit_distance(result)
+    3
+
+    If `costs` is given, it replaces the three cost functions, and the
+    `Engine.FLAT` engine reads costs from its cached tables.
+    `Engine.NUMPY` always works from a cost table, and falls back to
+    `Engine.FLAT` if NumPy is not installed, elements cannot be hashed, or
+    some cost is not an `int` or `float` that NumPy can sum exactly.
+    """
+    if costs is not None:
+        ins_costs, del_costs, sub_costs = (
+            costs.insert, costs.delete, costs.substitute)
+    counted: Tuple[InsertCostFunction, DeleteCostFunction,
+                   SubstituteCostFunction] = counted_costs(
+                       source, target, ins_costs, del_costs, sub_costs)
+    with instrument.span('chart.fill'):
+        source_widest: int = greatest_width(source) if len(source) else 0
+        target_widest: int = greatest_width(target) if len(target) else 0
+        if engine not in {Engine.FLAT, Engine.NUMPY}:
+            analysis = PairAnalysis(
+                source, source_widest, target, target_widest,
+                *counted, new_distance_matrix())
+            compute_min_edit_distance(analysis)
+            return uncounted(analysis, ins_costs, del_costs, sub_costs)
+        analysis = PairAnalysis(
+            source, source_widest, target, target_widest, *counted,
+            cast(DistanceMatrix, FlatMatrix(len(target), len(source))))
+        table: Optional[CostTable] = compiled_table(costs, source, target)
+        if engine == Engine.NUMPY:
+            # Imported here because `vectorized` builds on this module.
+            #pylint: disable=cyclic-import,import-outside-toplevel
+            import pontospell.vectorized as vectorized
+            if table is None:
+                table = compiled_table(
+                    CompiledCosts(ins_costs, del_costs, sub_costs),
+                    source, target)
+            if (vectorized.numpy_available() and table is not None
+                    and vectorized.cost_dtype(table) is not None):
+                vectorized.compute_numpy_min_edit_distance(analysis, table)
+                return uncounted(analysis, ins_costs, del_costs, sub_costs)
+        compute_flat_min_edit_distance(analysis, table)
+        return uncounted(analysis, ins_costs, del_costs, sub_costs)
+
+class Aligner:
+    """Reusable workspace for aligning many pairs with the same costs.
+
+    Every call to `levenshtein` fills the same `FlatMatrix`, which grows to
+    fit the largest pair seen so far, so a worker loop allocates almost
+    nothing per pair once it has warmed up.
+    An analysis returned by the aligner is valid only until its next call;
+    use the module-level `levenshtein` for results that must be kept.
+    >>> aligner = Aligner()
+    >>> min_edit_distance(aligner.levenshtein('intention', 'execution'))
+    8
+    >>> print(vertical_alignment(aligner.levenshtein('dag', 'doge')))
+    d = d  0
+    a ~ o  2
+    g = g  0
+      < e  1
+    """
+    def __init__(self,
+                 ins_costs: InsertCostFunction = lev_ins_function,
+                 del_costs: DeleteCostFunction = lev_del_function,
+                 sub_costs: SubstituteCostFunction = lev_sub_function,
+                 costs: Optional[CompiledCosts] = None) -> None:
+        if costs is not None:
+            ins_costs, del_costs, sub_costs = (
+                costs.insert, costs.delete, costs.substitute)
+        self.ins_costs: InsertCostFunction = ins_costs
+        self.del_costs: DeleteCostFunction = del_costs
+        self.sub_costs: SubstituteCostFunction = sub_costs
+        self.costs: Optional[CompiledCosts] = costs
+        self.matrix = FlatMatrix(0, 0)
+
+    def levenshtein(self, source: Sequence, target: Sequence
+                   ) -> PairAnalysis:
+        """ Compare two sequences, reusing the aligner’s matrix. """
+        self.matrix.resize(len(target), len(source))
+        analysis = PairAnalysis(
+            source, greatest_width(source) if len(source) else 0,
+            target, greatest_width(target) if len(target) else 0,
+            *counted_costs(source, target, self.ins_costs, self.del_costs,
+                           self.sub_costs),
+            DistanceMatrix(self.matrix))  # type: ignore
+        with instrument.span('chart.fill'):
+            compute_flat_min_edit_distance(
+                analysis, compiled_table(self.costs, source, target))
+        return uncounted(analysis, self.ins_costs, self.del_costs,
+                         self.sub_costs)
+
+@overload
+def distance(source: Sequence, target: Sequence,
+             ins_costs: InsertCostFunction = ...,
+             del_costs: DeleteCostFunction = ...,
+             sub_costs: SubstituteCostFunction = ...,
+             max_cost: None = ...) -> Cost:
+    """ Without `max_cost`, there is always a distance. """
+@overload
+def distance(source: Sequence, target: Sequence,
+             ins_costs: InsertCostFunction = ...,
+             del_costs: DeleteCostFunction = ...,
+             sub_costs: SubstituteCostFunction = ...,
+             max_cost: Optional[Cost] = ...) -> Optional[Cost]:
+    """ With `max_cost`, there may be none. """
+def distance(source: Sequence, target: Sequence,
+             ins_costs: InsertCostFunction = lev_ins_function,
+             del_costs: DeleteCostFunction = lev_del_function,
+             sub_costs: SubstituteCostFunction = lev_sub_function,
+             max_cost: Optional[Cost] = None) -> Optional[Cost]:
+    """Return the minimal edit distance without keeping the matrix.
+
+    Gives the same result as `min_edit_distance(levenshtein(...))`, but
+    keeps only two rows of the matrix, each as long as the shorter
+    sequence, and does not compute display widths.
+    >>> distance('intention', 'execution')
+    8
+    >>> distance(['ll', 'a', 'dd'], ['ll', 'a'])
+    1
+
+    If `max_cost` is given, returns `None` as soon as it is clear that the
+    distance is greater; see `bounded_distance`.
+    >>> distance('intention', 'execution', max_cost=5) is None
+    True
+
+    With the default cost functions, the distance is computed by
+    `bitparallel`, unless elements cannot be hashed.
+    """
+    if max_cost is not None:
+        return bounded_distance(source, target, max_cost,
+                                ins_costs, del_costs, sub_costs)
+    if default_costs(ins_costs, del_costs, sub_costs):
+        fast_cost: Optional[Cost] = bitparallel_distance(source, target)
+        if fast_cost is not None:
+            return fast_cost
+    ins_costs, del_costs, sub_costs = counted_costs(
+        source, target, ins_costs, del_costs, sub_costs)
+    # Candidates are listed as substitution, deletion, insertion so that
+    # `min` breaks ties the same way `compute_min_edit_distance` does.
+    previous: List[Cost]
+    current: List[Cost]
+    pos: SeqPos
+    ins_cost: Cost
+    del_cost: Cost
+    if len(source) <= len(target):
+        # Rows run along the source, one per target element.
+        del_vector: List[Cost] = [del_costs(element) for element in source]
+        previous = [0] * (len(source) + 1)
+        for pos, del_cost in enumerate1(del_vector):
+            previous[pos] = previous[pos - 1] + del_cost
+        current = previous[:]
+        for targ_element in target:
+            ins_cost = ins_costs(targ_element)
+            current[0] = previous[0] + ins_cost
+            for pos, src_element in enumerate1(source):
+                current[pos] = min(
+                    previous[pos - 1] + sub_costs(src_element, targ_element),
+                    current[pos - 1] + del_vector[pos - 1],
+                    previous[pos] + ins_cost)
+            previous, current = current, previous
+    else:
+        # Columns run along the target, one per source element.
+        ins_vector: List[Cost] = [ins_costs(element) for element in target]
+        previous = [0] * (len(target) + 1)
+        for pos, ins_cost in enumerate1(ins_vector):
+            previous[pos] = previous[pos - 1] + ins_cost
+        current = previous[:]
+        for src_element in source:
+            del_cost = del_costs(src_element)
+            current[0] = previous[0] + del_cost
+            for pos, targ_element in enumerate1(target):
+                current[pos] = min(
+                    previous[pos - 1] + sub_costs(src_element, targ_element),
+                    previous[pos] + del_cost,
+                    current[pos - 1] + ins_vector[pos - 1])
+            previous, current = current, previous
+    return previous[-1]
+
+def bounded_distance(source: Sequence, target: Sequence, max_cost: Cost,
+                     ins_costs: InsertCostFunction = lev_ins_function,
+                     del_costs: DeleteCostFunction = lev_del_function,
+                     sub_costs: SubstituteCostFunction = lev_sub_function
+                    ) -> Optional[Cost]:
+    """Return the minimal edit distance if it is at most `max_cost`.
+
+    Otherwise return `None`.
+    Only cells within a diagonal band of the matrix are computed (after
+    Ukkonen): a path through a cell off the main diagonals needs at least so
+    many insertions and deletions, and the band holds the cells where those
+    cannot already cost more than `max_cost`, at the cheapest insertion and
+    deletion costs in these sequences.
+    Computation stops as soon as every cell in a row costs more than
+    `max_cost`.
+    Costs must not be negative.
+    With the default cost functions, the whole distance is computed by
+    `bitparallel` instead, which is faster even for narrow bands.
+    """
+    if default_costs(ins_costs, del_costs, sub_costs):
+        fast_cost: Optional[Cost] = bitparallel_distance(source, target)
+        if fast_cost is not None:
+            return fast_cost if fast_cost <= max_cost else None
+    infinity: Cost = float('inf')
+    ins_vector: List[Cost] = [ins_costs(element) for element in target]
+    del_vector: List[Cost] = [del_costs(element) for element in source]
+    min_ins: Cost = min(ins_vector, default=infinity)
+    min_del: Cost = min(del_vector, default=infinity)
+    def indel_bound(diagonal: int) -> Cost:
+        """ Least cost of moving this many diagonals away. """
+        return (diagonal * min_ins if diagonal > 0
+                else -diagonal * min_del if diagonal < 0
+                else 0)
+    # Allow for rounding when comparing products of costs to their sums.
+    limit: Cost = max_cost + 1e-9 * max(1, abs(max_cost))
+    surplus: int = len(target) - len(source)
+    diagonals: List[int] = [
+        diagonal for diagonal in range(-len(source), len(target) + 1)
+        if indel_bound(diagonal) + indel_bound(surplus - diagonal) <= limit]
+    if not diagonals:
+        return None
+    low_diagonal: int = diagonals[0]
+    high_diagonal: int = diagonals[-1]
+    previous: List[Cost] = [infinity] * (len(source) + 1)
+    previous[0] = 0
+    pos: SeqPos
+    for pos in range(1, min(len(source), -low_diagonal) + 1):
+        previous[pos] = previous[pos - 1] + del_vector[pos - 1]
+    current: List[Cost] = previous[:]
+    targ_pos: SeqPos
+    targ_element: Any
+    for targ_pos, targ_element in enumerate1(target):
+        low: SeqPos = max(0, targ_pos - high_diagonal)
+        high: SeqPos = min(len(source), targ_pos - low_diagonal)
+        ins_cost: Cost = ins_vector[targ_pos - 1]
+        if low == 0:
+            current[0] = previous[0] + ins_cost
+            low = 1
+        else:
+            current[low - 1] = infinity
+        if high < len(source):
+            current[high + 1] = infinity
+        for pos in range(low, high + 1):
+            current[pos] = min(
+                previous[pos - 1] + sub_costs(source[pos - 1], targ_element),
+                current[pos - 1] + del_vector[pos - 1],
+                previous[pos] + ins_cost)
+        if min(current[low - 1:high + 1]) > limit:
+            return None
+        previous, current = current, previous
+    cost: Cost = previous[-1]
+    return cost if cost <= max_cost else None
+
+def within(source: Sequence, target: Sequence, max_cost: Cost,
+           ins_costs: InsertCostFunction = lev_ins_function,
+           del_costs: DeleteCostFunction = lev_del_function,
+           sub_costs: SubstituteCostFunction = lev_sub_function) -> bool:
+    """Tell whether the two sequences are at most `max_cost` apart.
+
+    >>> within('becuase', 'because', 2)
+    True
+    >>> within('bcs', 'because', 2)
+    False
+    """
+    return bounded_distance(
+        source, target, max_cost, ins_costs, del_costs, sub_costs) is not None
 
 def min_edit_distance(analysis: PairAnalysis) -> Cost:
     """ Return the minimal string edit distance as shown in matrix. """
@@ -249,27 +762,28 @@ def get_one_backtrace(analysis: PairAnalysis) -> Backtrace:
     src_pos: SeqPos = len(analysis.source)
     targ_pos: SeqPos = len(analysis.target)
     backtrace = Backtrace([])
-    while src_pos > 0 or targ_pos > 0:
-        cell: Cell = analysis.matrix[Coordinates(targ_pos, src_pos)]
-        if cell.operation == Operation.SUB:
-            src_pos -= 1
-            targ_pos -= 1
-            backtrace.insert(0, EditStep(
-                analysis.source[src_pos],
-                analysis.target[targ_pos],
-                cell))
-        elif cell.operation == Operation.INS:
-            targ_pos -= 1
-            backtrace.insert(0, EditStep(
-                None,
-                analysis.target[targ_pos],
-                cell))
-        else:  # DEL
-            src_pos -= 1
-            backtrace.insert(0, EditStep(
-                analysis.source[src_pos],
-                None,
-                cell))
+    with instrument.span('chart.backtrace'):
+        while src_pos > 0 or targ_pos > 0:
+            cell: Cell = analysis.matrix[Coordinates(targ_pos, src_pos)]
+            if cell.operation == Operation.SUB:
+                src_pos -= 1
+                targ_pos -= 1
+                backtrace.insert(0, EditStep(
+                    analysis.source[src_pos],
+                    analysis.target[targ_pos],
+                    cell))
+            elif cell.operation == Operation.INS:
+                targ_pos -= 1
+                backtrace.insert(0, EditStep(
+                    None,
+                    analysis.target[targ_pos],
+                    cell))
+            else:  # DEL
+                src_pos -= 1
+                backtrace.insert(0, EditStep(
+                    analysis.source[src_pos],
+                    None,
+                    cell))
     return backtrace
 
 def vertical_alignment(analysis: PairAnalysis) -> str:
@@ -281,19 +795,20 @@ def vertical_alignment(analysis: PairAnalysis) -> str:
     = for no change), target character (white space if deletion),
     and cost of the operation.
     """
-    backtrace: Backtrace = get_one_backtrace(analysis)
-    lines: List[str] = []
-    step: EditStep
-    for step in backtrace:
-        source = f"{(step.source or ' '):<{analysis.source_widest}}"
-        operator: str = {
-            Operation.DEL: '>',
-            Operation.INS: '<',
-            Operation.SUB: '=' if step.source == step.target else '~'
-            }[step.cell.operation]
-        target = f"{(step.target or ' '):<{analysis.target_widest}}"
-        lines.append(
-            f'{source} {operator} {target}  {step.cell.this_cost}')
+    with instrument.span('chart.render'):
+        backtrace: Backtrace = get_one_backtrace(analysis)
+        lines: List[str] = []
+        step: EditStep
+        for step in backtrace:
+            source = f"{(step.source or ' '):<{analysis.source_widest}}"
+            operator: str = {
+                Operation.DEL: '>',
+                Operation.INS: '<',
+                Operation.SUB: '=' if step.source == step.target else '~'
+                }[step.cell.operation]
+            target = f"{(step.target or ' '):<{analysis.target_widest}}"
+            lines.append(
+                f'{source} {operator} {target}  {step.cell.this_cost}')
     return '\n'.join(lines)
 
 # Local Variables:
@@ -0,0 +1,241 @@
+# developed under python 3.6.3 from anaconda
+""" cli.py
+
+Score a file of spellings from the command line:
+
+    python -m pontospell responses.csv --output scored.csv --workers 4
+
+Each input row names the `target` word and the subject’s `spelling`, and
+may give a `pronunciation`.
+The pronunciation, or else the target word, is aligned as the source
+sequence against the spelling, and each row is written back out with two
+more fields: the minimal edit `distance` and the `alignment`, a JSON list
+of [source, target, cost] steps.
+Rows are read, scored and written as a stream, a chunk at a time, so
+files of any size can be processed in bounded memory.
+CSV, tab-separated, and JSON Lines files are recognized by extension, or
+can be named with `--format`.
+Rows that cannot be scored, such as those with no spelling, are skipped
+with a message naming their line.
+CSV and tab-separated output has the columns of the first row scored;
+fields that later rows lack are left empty, and fields they add are
+dropped.
+Cost functions other than Levenshtein’s can be given with
+`--costs module:attribute`, naming a `xducer.CostFunctions` in any
+importable module.
+Letters written with more than one character, such as Welsh ‹ll›, can
+be listed with `--graphemes ll,dd` so that both sequences are split into
+letters before they are aligned.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+import argparse
+from contextlib import ExitStack
+import csv
+from itertools import tee
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from pontospell.batch import Pair, Scored, iter_levenshtein, resolve_costs
+from pontospell.chart import Cost
+from pontospell.graphemes import Tokenizer
+
+                                                  #pylint: disable=invalid-name
+Row = Dict[str, Any]
+                                                  #pylint: enable=invalid-name
+
+FORMATS: Dict[str, str] = {'.csv': 'csv', '.tsv': 'tsv', '.tab': 'tsv',
+                           '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+""" File formats by file name extension. """
+
+def guess_format(path: str, default: str = 'csv') -> str:
+    """Return the file format implied by the file name.
+
+    >>> guess_format('responses.tsv')
+    'tsv'
+    >>> guess_format('-')
+    'csv'
+    """
+    for extension, file_format in FORMATS.items():
+        if path.lower().endswith(extension):
+            return file_format
+    return default
+
+def read_rows(stream: TextIO, file_format: str) -> Iterator[Tuple[int, Any]]:
+    """Yield each row of the input as a dict, with its line number.
+
+    A JSON Lines row that is not valid JSON is yielded as None.
+    """
+    if file_format == 'jsonl':
+        for line_number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError:
+                    yield line_number, None
+    else:
+        reader = csv.DictReader(
+            stream, delimiter='\t' if file_format == 'tsv' else ',')
+        for row in reader:
+            yield reader.line_num, row
+
+def row_problem(row: Any, args: argparse.Namespace) -> Optional[str]:
+    """ Return what keeps this row from being scored, if anything. """
+    if row is None:
+        return 'not valid JSON'
+    if not isinstance(row, dict):
+        return 'not a JSON object'
+    if None in row:
+        return 'more fields than the header'
+    fields: List[str] = [args.spelling_field]
+    if not row.get(args.pronunciation_field):
+        fields.append(args.target_field)
+    for field in fields:
+        if not isinstance(row.get(field), str):
+            return f'no {field} text'
+    return None
+
+def checked_rows(numbered_rows: Iterator[Tuple[int, Any]],
+                 args: argparse.Namespace) -> Iterator[Row]:
+    """ Yield the rows that can be scored, reporting the others. """
+    for line_number, row in numbered_rows:
+        problem: Optional[str] = row_problem(row, args)
+        if problem is None:
+            yield row
+        else:
+            print(f'{args.input}:{line_number}: skipping row: {problem}',
+                  file=sys.stderr)
+
+def row_pair(row: Row, target_field: str, spelling_field: str,
+             pronunciation_field: str,
+             tokenizer: Optional[Tokenizer] = None) -> Pair:
+    """ Return the sequences to align for this row, split into letters. """
+    source: str = row.get(pronunciation_field) or row[target_field]
+    if tokenizer is not None:
+        return (tokenizer.segment(source),
+                tokenizer.segment(row[spelling_field]))
+    return source, row[spelling_field]
+
+def serialize_alignment(scored: Scored) -> List[Tuple[Any, Any, Cost]]:
+    """ Return the alignment as a list that JSON can represent. """
+    return [(step.source, step.target, step.cell.this_cost)
+            for step in scored.backtrace]
+
+def score_rows(rows: Iterator[Row], args: argparse.Namespace
+              ) -> Iterator[Tuple[Row, Union[Cost, Scored]]]:
+    """ Yield each row with its score, in order. """
+    rows, pair_rows = tee(rows)
+    tokenizer: Optional[Tokenizer] = (
+        Tokenizer(args.graphemes.split(',')) if args.graphemes else None)
+    pairs: Iterator[Pair] = (
+        row_pair(row, args.target_field, args.spelling_field,
+                 args.pronunciation_field, tokenizer)
+        for row in pair_rows)
+    scores = iter_levenshtein(
+        pairs, args.costs, distance_only=args.distance_only,
+        workers=args.workers, chunk_size=args.chunk_size)
+    return zip(rows, scores)
+
+def write_rows(scored_rows: Iterator[Tuple[Row, Union[Cost, Scored]]],
+               stream: TextIO, file_format: str, distance_only: bool) -> int:
+    """ Write each row with its score added; return number of rows. """
+    writer: Optional[csv.DictWriter] = None
+    count: int = 0
+    for row, score in scored_rows:
+        row = dict(row)
+        if distance_only:
+            row['distance'] = score
+        else:
+            row['distance'] = score.distance  # type: ignore
+            row['alignment'] = serialize_alignment(score)  # type: ignore
+        if file_format == 'jsonl':
+            stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+        else:
+            if 'alignment' in row:
+                row['alignment'] = json.dumps(
+                    row['alignment'], ensure_ascii=False)
+            if writer is None:
+                writer = csv.DictWriter(
+                    stream, fieldnames=list(row), restval='',
+                    extrasaction='ignore',
+                    delimiter='\t' if file_format == 'tsv' else ',')
+                writer.writeheader()
+            writer.writerow(row)
+        count += 1
+    return count
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """ Interpret the command line. """
+    parser = argparse.ArgumentParser(
+        prog='python -m pontospell',
+        description='Score spellings against target words.')
+    parser.add_argument(
+        'input', nargs='?', default='-',
+        help='file of responses to score (default: standard input)')
+    parser.add_argument(
+        '-o', '--output', default='-',
+        help='file to write scored rows to (default: standard output)')
+    parser.add_argument(
+        '--format', choices=sorted(set(FORMATS.values())),
+        help='input format (default: from input file name, else csv)')
+    parser.add_argument(
+        '--output-format', choices=sorted(set(FORMATS.values())),
+        help='output format (default: from output file name, else input)')
+    parser.add_argument('--target-field', default='target')
+    parser.add_argument('--spelling-field', default='spelling')
+    parser.add_argument('--pronunciation-field', default='pronunciation')
+    parser.add_argument(
+        '--costs', default='levenshtein',
+        help='cost functions: a name registered with pontospell.batch, or'
+        ' module:attribute naming a pontospell.xducer.CostFunctions')
+    parser.add_argument(
+        '--graphemes',
+        help='comma-separated letters of more than one character')
+    parser.add_argument(
+        '--distance-only', action='store_true',
+        help='write only the distance, not the alignment')
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='number of worker processes (default: score in this process)')
+    parser.add_argument(
+        '--chunk-size', type=int, default=256,
+        help='rows sent to a worker at a time (default: 256)')
+    args = parser.parse_args(argv)
+    if args.format is None:
+        args.format = guess_format(args.input)
+    if args.output_format is None:
+        args.output_format = guess_format(args.output, args.format)
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be positive')
+    try:
+        resolve_costs(args.costs)
+    except ValueError as error:
+        parser.error(str(error))
+    return args
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """ Run the command line program; return exit status. """
+    args = parse_arguments(argv)
+    with ExitStack() as files:
+        input_stream: TextIO = (
+            sys.stdin if args.input == '-'
+            else files.enter_context(
+                open(args.input, newline='', encoding='utf-8')))
+        output_stream: TextIO = (
+            sys.stdout if args.output == '-'
+            else files.enter_context(
+                open(args.output, 'w', newline='', encoding='utf-8')))
+        rows: Iterator[Row] = checked_rows(
+            read_rows(input_stream, args.format), args)
+        write_rows(score_rows(rows, args), output_stream,
+                   args.output_format, args.distance_only)
+    return 0
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
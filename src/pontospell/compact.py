@@ -0,0 +1,214 @@
+# developed under python 3.6.3 from anaconda
+""" compact.py
+
+Store alignments in a few bytes per step.
+
+A `chart.Backtrace` or an `xducer.Parse` holds a tuple, and often copies
+of the elements, for every step of the alignment.
+A `CompactAlignment` holds only a string of operation letters and an
+array of step costs; positions in the sequences follow from the
+operations, and cumulative costs from the step costs.
+>>> import pontospell.chart as chart
+>>> import pontospell.compact as compact
+>>> analysis = chart.levenshtein('dag', 'doge')
+>>> packed = compact.from_backtrace(chart.get_one_backtrace(analysis))
+>>> packed.operations
+'sssi'
+>>> list(packed.costs)
+[0.0, 2.0, 0.0, 1.0]
+>>> compact.to_backtrace(packed, 'dag', 'doge') == (
+...     chart.get_one_backtrace(analysis))
+True
+>>> print(compact.vertical_alignment(packed, 'dag', 'doge'))
+d = d  0
+a ~ o  2
+g = g  0
+  < e  1
+
+Parses convert the same way:
+>>> import pontospell.xducer as px
+>>> pars = px.relate(px.arguments('dag', 'doge', just_one=True))[0]
+>>> compact.to_parse(compact.from_parse(pars), 'dag', 'doge') == pars
+True
+
+Conversions are lossless: costs that were `int`s come back as `int`s,
+and cumulative costs are summed in the same order as the engines sum
+them, so floating-point totals are reproduced exactly.
+Costs that a double cannot hold exactly, such as a `Fraction` or an
+integer beyond 2**53, are kept as they are in a list instead:
+>>> from fractions import Fraction
+>>> compact.pack('ss', [Fraction(1, 3), 0]).costs
+[Fraction(1, 3), 0]
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from array import array
+from typing import (
+    Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union)
+
+from pontospell.chart import (
+    Backtrace, Cell, EditStep, Operation, greatest_width)
+import pontospell.xducer as px
+
+                                                  #pylint: disable=invalid-name
+Cost = float
+class CompactAlignment(NamedTuple):
+    """An alignment as operation letters and step costs.
+
+    `operations` holds the value of each step's `Operation`: 's', 'd'
+    or 'i'.
+    `costs` holds each step's cost as a double, and bit n of
+    `int_costs` is set if step n's cost was an `int`; or, if some cost
+    would not survive that, `costs` is a list of the original costs.
+    """
+    operations: str
+    costs: Union[array, List]
+    int_costs: int
+StepPositions = Tuple[Optional[int], Optional[int]]
+""" Zero-based source and target positions; None for a gap. """
+                                                  #pylint: enable=invalid-name
+
+FLOAT_INT_LIMIT: int = 2 ** 53
+""" Integers up to this size are held exactly by a double. """
+
+SUB: str = Operation.SUB.value
+DEL: str = Operation.DEL.value
+INS: str = Operation.INS.value
+
+def pack(operations: str, costs: Iterable[Cost]) -> CompactAlignment:
+    """Make a compact alignment, remembering which costs were ints.
+
+    Keeps the costs in a list if any is neither a `float` nor an `int`
+    that a double holds exactly.
+    """
+    cost_list: List[Cost] = list(costs)
+    if not all(isinstance(cost, float) or isinstance(cost, int)
+               and abs(cost) <= FLOAT_INT_LIMIT for cost in cost_list):
+        return CompactAlignment(operations, cost_list, 0)
+    int_costs: int = 0
+    for pos, cost in enumerate(cost_list):
+        if isinstance(cost, int):
+            int_costs |= 1 << pos
+    return CompactAlignment(operations, array('d', cost_list), int_costs)
+
+def step_costs(compact: CompactAlignment) -> List[Cost]:
+    """ Return the cost of each step, with its original type. """
+    if isinstance(compact.costs, list):
+        return list(compact.costs)
+    return [int(cost) if compact.int_costs >> pos & 1 else cost
+            for pos, cost in enumerate(compact.costs)]
+
+def positions(compact: CompactAlignment) -> Iterator[StepPositions]:
+    """Yield the source and target positions each step consumes.
+
+    >>> list(positions(CompactAlignment('sdi', array('d', [0, 1, 1]), 7)))
+    [(0, 0), (1, None), (None, 1)]
+    """
+    src_pos: int = 0
+    targ_pos: int = 0
+    for operation in compact.operations:
+        if operation == SUB:
+            yield src_pos, targ_pos
+            src_pos += 1
+            targ_pos += 1
+        elif operation == DEL:
+            yield src_pos, None
+            src_pos += 1
+        else:
+            yield None, targ_pos
+            targ_pos += 1
+
+def from_backtrace(backtrace: Backtrace) -> CompactAlignment:
+    """ Compact a `chart` backtrace. """
+    return pack(''.join(step.cell.operation.value for step in backtrace),
+                [step.cell.this_cost for step in backtrace])
+
+def to_backtrace(compact: CompactAlignment,
+                 source: Any, target: Any) -> Backtrace:
+    """ Rebuild the `chart` backtrace for these sequences. """
+    backtrace = Backtrace([])
+    cumulative: Cost = 0
+    for operation, (src_pos, targ_pos), cost in zip(
+            compact.operations, positions(compact), step_costs(compact)):
+        cumulative = cumulative + cost
+        backtrace.append(EditStep(
+            None if src_pos is None else source[src_pos],
+            None if targ_pos is None else target[targ_pos],
+            Cell(cost, cumulative, Operation(operation))))
+    return backtrace
+
+def from_parse(pars: px.Parse) -> CompactAlignment:
+    """ Compact an `xducer` parse. """
+    return pack(''.join(DEL if cell.target is None else
+                        INS if cell.source is None else
+                        SUB for cell in pars),
+                [cell.this_cost for cell in pars])
+
+def to_parse(compact: CompactAlignment,
+             source: Any, target: Any) -> px.Parse:
+    """ Rebuild the `xducer` parse for these sequences. """
+    costs: List[Cost] = step_costs(compact)
+    cells: List[px.Cell] = []
+    cumulative: Cost = 0
+    for pos, (src_pos, targ_pos) in reversed(
+            list(enumerate(positions(compact)))):
+        cumulative = (costs[pos] if pos == len(costs) - 1
+                      else costs[pos] + cumulative)
+        cells.append(px.Cell(
+            None if src_pos is None else source[src_pos],
+            None if targ_pos is None else target[targ_pos],
+            costs[pos], cumulative))
+    cells.reverse()
+    return px.Parse(cells)
+
+def format_step(src_element: Any, targ_element: Any, operation: str,
+                cost: Cost, source_widest: int, target_widest: int) -> str:
+    """ Return one line of a vertical alignment. """
+    operator: str = (
+        '>' if operation == DEL else
+        '<' if operation == INS else
+        '=' if src_element == targ_element else
+        '~')
+    return (f"{(src_element or ' '):<{source_widest}} {operator} "
+            f"{(targ_element or ' '):<{target_widest}}  {cost}")
+
+def render(compact: CompactAlignment, source: Any, target: Any,
+           source_widest: int, target_widest: int) -> str:
+    """ Return the vertical alignment with these column widths. """
+    lines: List[str] = []
+    for operation, (src_pos, targ_pos), cost in zip(
+            compact.operations, positions(compact), step_costs(compact)):
+        lines.append(format_step(
+            None if src_pos is None else source[src_pos],
+            None if targ_pos is None else target[targ_pos],
+            operation, cost, source_widest, target_widest))
+    return '\n'.join(lines)
+
+def vertical_alignment(compact: CompactAlignment,
+                       source: Any, target: Any) -> str:
+    """ Render like `chart.vertical_alignment`. """
+    return render(compact, source, target,
+                  greatest_width(source) if len(source) else 0,
+                  greatest_width(target) if len(target) else 0)
+
+def vertical_align(compact: CompactAlignment,
+                   source: Any, target: Any) -> str:
+    """ Render like `xducer.vertical_align`. """
+    source_widest: int = 0
+    target_widest: int = 0
+    for src_pos, targ_pos in positions(compact):
+        if src_pos is not None:
+            source_widest = max(source_widest,
+                                len(str(source[src_pos] or '')))
+        if targ_pos is not None:
+            target_widest = max(target_widest,
+                                len(str(target[targ_pos] or '')))
+    return render(compact, source, target, source_widest, target_widest)
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
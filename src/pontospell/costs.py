@@ -0,0 +1,201 @@
+# developed under python 3.6.3 from anaconda
+""" costs.py
+
+Remember the costs of edit operations instead of recomputing them.
+
+Cost functions that consult orthographic tables can be slow, yet the
+dynamic programming engines call them once per cell of the matrix, over
+and over for the same few letters.
+A `CompiledCosts` wraps the three cost functions, remembers every cost it
+has looked up, and builds dense tables of all the costs needed for the
+alphabets of a source and a target.
+>>> import pontospell.costs as pc
+>>> compiled = pc.CompiledCosts()
+>>> table = compiled.table('intention', 'execution')
+>>> table.source_alphabet
+('i', 'n', 't', 'e', 'o')
+>>> table.substitute[table.source_index['t']][table.target_index['t']]
+0
+>>> table.delete
+[1, 1, 1, 1, 1]
+
+Tables are cached for the most recently used pairs of alphabets:
+>>> table is compiled.table('intention', 'execution')
+True
+>>> compiled.cache_info()
+CacheInfo(hits=1, misses=1, maxsize=128, currsize=1)
+
+`chart.levenshtein` accepts a `CompiledCosts` as its `costs` argument, and
+since it has `insert`, `delete` and `substitute` methods, it can stand in
+for the `CostFunctions` given to `xducer.arguments`.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from collections import OrderedDict
+from typing import (
+    Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple)
+
+from pontospell.xducer import (
+    CostFunctions, DelCostFunction, InsCostFunction, SubCostFunction,
+    lev_del_function, lev_ins_function, lev_sub_function)
+
+                                                  #pylint: disable=invalid-name
+Cost = float
+AlphabetKey = Tuple[FrozenSet, FrozenSet]
+class CostTable(NamedTuple):
+    """Dense costs for the alphabets of one source and one target.
+
+    Each alphabet holds the distinct elements in order of appearance,
+    and the `*_index` dicts map an element to its position there.
+    `substitute` is indexed first by source id, then by target id.
+    """
+    source_alphabet: Tuple
+    source_index: Dict[Any, int]
+    target_alphabet: Tuple
+    target_index: Dict[Any, int]
+    insert: List[Cost]
+    delete: List[Cost]
+    substitute: List[List[Cost]]
+class CacheInfo(NamedTuple):
+    """ Statistics about the table cache, like `functools.lru_cache`'s. """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+                                                  #pylint: enable=invalid-name
+
+def alphabet(sequence: Sequence) -> Tuple:
+    """Return the distinct elements of a sequence, in order of appearance.
+
+    >>> alphabet(['ll', 'a', 'll'])
+    ('ll', 'a')
+    """
+    return tuple(dict.fromkeys(sequence))
+
+class CompiledCosts:
+    """Cost functions with memoized lookups and cached dense tables.
+
+    The wrapped functions must always return the same cost for the same
+    elements.
+    Elements that cannot be hashed are passed straight to the functions.
+    Each of the three memos keeps the `memo_size` most recently used
+    costs, and the table cache the `maxsize` most recently used tables.
+    """
+    def __init__(self,
+                 insert: InsCostFunction = lev_ins_function,
+                 delete: DelCostFunction = lev_del_function,
+                 substitute: SubCostFunction = lev_sub_function,
+                 maxsize: int = 128,
+                 memo_size: int = 65536) -> None:
+        self.functions = CostFunctions(insert, delete, substitute)
+        self.maxsize: int = maxsize
+        self.memo_size: int = memo_size
+        self.insert_memo: 'OrderedDict[Any, Cost]' = OrderedDict()
+        self.delete_memo: 'OrderedDict[Any, Cost]' = OrderedDict()
+        self.substitute_memo: 'OrderedDict[Tuple[Any, Any], Cost]' = (
+            OrderedDict())
+        self.tables: 'OrderedDict[AlphabetKey, CostTable]' = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @classmethod
+    def from_cost_functions(cls, functions: CostFunctions,
+                            maxsize: int = 128) -> 'CompiledCosts':
+        """ Wrap the cost functions used by `xducer`. """
+        return cls(functions.insert, functions.delete, functions.substitute,
+                   maxsize)
+
+    def remember(self, memo: 'OrderedDict[Any, Cost]', key: Any,
+                 cost: Cost) -> Cost:
+        """ Store a cost, dropping the least recently used if full. """
+        memo[key] = cost
+        if len(memo) > self.memo_size:
+            memo.popitem(last=False)
+        return cost
+
+    def insert(self, target: Any) -> Cost:
+        """ Return the cost of inserting this element. """
+        memo: 'OrderedDict[Any, Cost]' = self.insert_memo
+        try:
+            cost: Cost = memo[target]
+            memo.move_to_end(target)
+        except KeyError:
+            return self.remember(memo, target, self.functions.insert(target))
+        except TypeError:
+            return self.functions.insert(target)
+        return cost
+
+    def delete(self, source: Any) -> Cost:
+        """ Return the cost of deleting this element. """
+        memo: 'OrderedDict[Any, Cost]' = self.delete_memo
+        try:
+            cost: Cost = memo[source]
+            memo.move_to_end(source)
+        except KeyError:
+            return self.remember(memo, source, self.functions.delete(source))
+        except TypeError:
+            return self.functions.delete(source)
+        return cost
+
+    def substitute(self, source: Any, target: Any) -> Cost:
+        """ Return the cost of replacing source element with target. """
+        memo: 'OrderedDict[Tuple[Any, Any], Cost]' = self.substitute_memo
+        try:
+            cost: Cost = memo[source, target]
+            memo.move_to_end((source, target))
+        except KeyError:
+            return self.remember(memo, (source, target),
+                                 self.functions.substitute(source, target))
+        except TypeError:
+            return self.functions.substitute(source, target)
+        return cost
+
+    def table(self, source: Sequence, target: Sequence) -> CostTable:
+        """Return the dense cost table for the alphabets of these sequences.
+
+        Raises `TypeError` if any element cannot be hashed.
+        """
+        key: AlphabetKey = (frozenset(source), frozenset(target))
+        cached: Optional[CostTable] = self.tables.get(key)
+        if cached is not None:
+            self.hits += 1
+            self.tables.move_to_end(key)
+            return cached
+        self.misses += 1
+        source_alphabet: Tuple = alphabet(source)
+        target_alphabet: Tuple = alphabet(target)
+        table: CostTable = CostTable(
+            source_alphabet,
+            {element: pos for pos, element in enumerate(source_alphabet)},
+            target_alphabet,
+            {element: pos for pos, element in enumerate(target_alphabet)},
+            [self.insert(element) for element in target_alphabet],
+            [self.delete(element) for element in source_alphabet],
+            [[self.substitute(src_element, targ_element)
+              for targ_element in target_alphabet]
+             for src_element in source_alphabet])
+        self.tables[key] = table
+        if len(self.tables) > self.maxsize:
+            self.tables.popitem(last=False)
+        return table
+
+    def cache_info(self) -> CacheInfo:
+        """ Report on use of the table cache. """
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self.tables))
+
+    def cache_clear(self) -> None:
+        """ Forget all remembered costs and tables. """
+        self.insert_memo.clear()
+        self.delete_memo.clear()
+        self.substitute_memo.clear()
+        self.tables.clear()
+        self.hits = self.misses = 0
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
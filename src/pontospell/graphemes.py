@@ -0,0 +1,123 @@
+# developed under python 3.6.3 from anaconda
+""" graphemes.py
+
+Split spellings into the letters of a writing system.
+
+Where several characters count as one letter, as ‹ll› and ‹dd› do in
+Welsh, sequences are split into those letters before they are aligned.
+A `Tokenizer` is made once from the inventory of letters longer than one
+character, and splits each string at the longest letter that matches:
+>>> import pontospell.chart as chart
+>>> from pontospell.graphemes import Tokenizer
+>>> welsh = Tokenizer(['ch', 'dd', 'ff', 'ng', 'll', 'ph', 'rh', 'th'])
+>>> welsh.segment('lladd')
+('ll', 'a', 'dd')
+>>> print(chart.vertical_alignment(chart.levenshtein(
+...     welsh.segment('lladd'), welsh.segment('lla'))))
+ll = ll  0
+a  = a   0
+dd >     1
+
+Any other character is a letter by itself.
+The letters are interned strings, so they compare quickly and any number
+of segmented spellings share one copy of each; `encode` gives small
+integer ids instead, which `decode` turns back into letters:
+>>> welsh.encode('dallt')
+(9, 8, 4, 10)
+>>> welsh.decode(welsh.encode('dallt'))
+('d', 'a', 'll', 't')
+
+Segmented spellings are remembered, most recently used first, so
+repeated spellings are split only once.
+The result of either method can be passed to `chart`, `xducer`, or the
+other aligners as a sequence.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from functools import lru_cache
+import re
+import sys
+from typing import Dict, Iterable, List, Pattern, Tuple
+
+                                                  #pylint: disable=invalid-name
+Segments = Tuple[str, ...]
+Ids = Tuple[int, ...]
+                                                  #pylint: enable=invalid-name
+
+def compile_inventory(inventory: Iterable[str]) -> Pattern:
+    """Return a pattern matching the longest letter at a position.
+
+    Letters are tried longest first, and any single character matches if
+    no letter does.
+    >>> compile_inventory(['l', 'll', 'lly']).findall('llyll')
+    ['lly', 'll']
+    """
+    letters: List[str] = sorted(
+        {letter for letter in inventory if len(letter) > 1},
+        key=lambda letter: (-len(letter), letter))
+    return re.compile(
+        '|'.join([re.escape(letter) for letter in letters] + ['.']),
+        re.DOTALL)
+
+class Tokenizer:
+    """Splits strings into letters from a fixed inventory.
+
+    Letters of the inventory have ids in the order given; other letters
+    get the next id when first seen.
+    `cache_size` is the number of distinct strings whose segments and ids
+    are each remembered.
+    """
+    def __init__(self, inventory: Iterable[str],
+                 cache_size: int = 65536) -> None:
+        inventory = list(inventory)
+        self.pattern: Pattern = compile_inventory(inventory)
+        self.letters: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.known: Dict[str, str] = {}
+        for letter in inventory:
+            self.intern(letter)
+        self.segment = lru_cache(maxsize=cache_size)(self.split)
+        self.encode = lru_cache(maxsize=cache_size)(self.split_ids)
+
+    def intern(self, letter: str) -> str:
+        """ Return the one copy of this letter, giving it an id if new. """
+        try:
+            return self.known[letter]
+        except KeyError:
+            letter = self.known[letter] = sys.intern(letter)
+            self.ids[letter] = len(self.letters)
+            self.letters.append(letter)
+            return letter
+
+    def split(self, text: str) -> Segments:
+        """Return the letters of the string, without using the cache.
+
+        Call `segment` instead to use the cache.
+        """
+        letters: List[str] = self.pattern.findall(text)
+        try:
+            return tuple(map(self.known.__getitem__, letters))
+        except KeyError:  # some letter seen for the first time
+            return tuple(map(self.intern, letters))
+
+    def split_ids(self, text: str) -> Ids:
+        """Return the ids of the letters of the string, without using the
+        cache.
+
+        Call `encode` instead to use the cache.
+        """
+        ids: Dict[str, int] = self.ids
+        return tuple([ids[letter] for letter in self.segment(text)])
+
+    def decode(self, ids: Iterable[int]) -> Segments:
+        """ Return the letters with these ids. """
+        letters: List[str] = self.letters
+        return tuple([letters[letter_id] for letter_id in ids])
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
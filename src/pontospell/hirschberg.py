@@ -0,0 +1,162 @@
+# developed under python 3.6.3 from anaconda
+""" hirschberg.py
+
+Align long sequences in linear space.
+
+`chart.levenshtein` keeps the whole distance matrix so that
+`chart.get_one_backtrace` can trace an alignment through it, which takes
+memory proportional to the product of the sequence lengths.
+`hirschberg` finds where an optimal alignment crosses the middle row of
+the matrix from two half-matrices computed a row at a time, then aligns
+each half the same way, so it needs memory proportional only to their
+sum, and about twice the time.
+>>> import pontospell.chart as chart
+>>> from pontospell.hirschberg import hirschberg
+>>> backtrace = hirschberg('intention', 'execution')
+>>> backtrace[-1].cell.cumulative_cost
+8
+>>> backtrace[:2]  # doctest: +NORMALIZE_WHITESPACE
+[EditStep(source='i', target=None,
+          cell=Cell(this_cost=1, cumulative_cost=1,
+                    operation=<Operation.DEL: 'd'>)),
+ EditStep(source='n', target='e',
+          cell=Cell(this_cost=2, cumulative_cost=3,
+                    operation=<Operation.SUB: 's'>))]
+
+The result is a `chart.Backtrace`, and the same cost functions apply.
+When several alignments are optimal, it may return a different one than
+`chart.get_one_backtrace` would.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from typing import List, Optional, Sequence, Tuple
+
+from pontospell.chart import (
+    Backtrace, Cell, Cost, DeleteCostFunction, EditStep, Engine,
+    InsertCostFunction, Operation, SubstituteCostFunction, get_one_backtrace,
+    lev_del_function, lev_ins_function, lev_sub_function, levenshtein)
+from pontospell.costs import CompiledCosts
+
+                                                  #pylint: disable=invalid-name
+Step = Tuple[Operation, int, int, Cost]
+""" Operation, source position, target position, and cost of one step. """
+Span = Tuple[int, int]
+""" Start and end of a slice of a sequence. """
+                                                  #pylint: enable=invalid-name
+
+BASE_CELLS: int = 4096
+""" Subproblems with no more cells than this are aligned with `chart`. """
+
+class Hirschberg:
+    """ The sequences and cost functions of one alignment. """
+    def __init__(self, source: Sequence, target: Sequence,
+                 ins_costs: InsertCostFunction,
+                 del_costs: DeleteCostFunction,
+                 sub_costs: SubstituteCostFunction) -> None:
+        self.source: Sequence = source
+        self.target: Sequence = target
+        self.ins_costs: InsertCostFunction = ins_costs
+        self.del_costs: DeleteCostFunction = del_costs
+        self.sub_costs: SubstituteCostFunction = sub_costs
+
+    def last_row(self, sources: Sequence[int], targets: Sequence[int]
+                ) -> List[Cost]:
+        """Return costs of aligning all `targets` with each prefix of
+        `sources`.
+
+        Both are sequences of positions, in the order they are to be
+        aligned, so ranges running backwards give the costs of suffixes.
+        """
+        source: Sequence = self.source
+        target: Sequence = self.target
+        src_elements: List = [source[pos] for pos in sources]
+        del_vector: List[Cost] = [self.del_costs(element)
+                                  for element in src_elements]
+        row: List[Cost] = [0]
+        for del_cost in del_vector:
+            row.append(row[-1] + del_cost)
+        sub_costs: SubstituteCostFunction = self.sub_costs
+        for targ_pos in targets:
+            targ_element = target[targ_pos]
+            ins_cost: Cost = self.ins_costs(targ_element)
+            new_row: List[Cost] = [row[0] + ins_cost]
+            for pos, src_element in enumerate(src_elements):
+                new_row.append(min(
+                    row[pos] + sub_costs(src_element, targ_element),
+                    new_row[pos] + del_vector[pos],
+                    row[pos + 1] + ins_cost))
+            row = new_row
+        return row
+
+    def base_steps(self, sources: Span, targets: Span) -> List[Step]:
+        """ Align a small block with `chart` and return its steps. """
+        analysis = levenshtein(
+            self.source[sources[0]:sources[1]],
+            self.target[targets[0]:targets[1]],
+            self.ins_costs, self.del_costs, self.sub_costs,
+            engine=Engine.FLAT)
+        steps: List[Step] = []
+        src_pos: int = sources[0]
+        targ_pos: int = targets[0]
+        for step in get_one_backtrace(analysis):
+            operation: Operation = step.cell.operation
+            steps.append((operation, src_pos, targ_pos, step.cell.this_cost))
+            if operation != Operation.INS:
+                src_pos += 1
+            if operation != Operation.DEL:
+                targ_pos += 1
+        return steps
+
+    def steps(self, sources: Span, targets: Span) -> List[Step]:
+        """ Return the steps of an optimal alignment of these slices. """
+        src_start, src_end = sources
+        targ_start, targ_end = targets
+        if (targ_end - targ_start <= 1 or
+                (src_end - src_start + 1) * (targ_end - targ_start + 1)
+                <= BASE_CELLS):
+            return self.base_steps(sources, targets)
+        targ_mid: int = (targ_start + targ_end) // 2
+        prefix_costs: List[Cost] = self.last_row(
+            range(src_start, src_end), range(targ_start, targ_mid))
+        suffix_costs: List[Cost] = self.last_row(
+            range(src_end - 1, src_start - 1, -1),
+            range(targ_end - 1, targ_mid - 1, -1))
+        width: int = src_end - src_start
+        split: int = min(range(width + 1), key=lambda pos: (
+            prefix_costs[pos] + suffix_costs[width - pos]))
+        return (self.steps((src_start, src_start + split),
+                           (targ_start, targ_mid)) +
+                self.steps((src_start + split, src_end),
+                           (targ_mid, targ_end)))
+
+def hirschberg(source: Sequence, target: Sequence,
+               ins_costs: InsertCostFunction = lev_ins_function,
+               del_costs: DeleteCostFunction = lev_del_function,
+               sub_costs: SubstituteCostFunction = lev_sub_function,
+               costs: Optional[CompiledCosts] = None) -> Backtrace:
+    """Return an optimal alignment of two sequences in linear space.
+
+    Arguments are as for `chart.levenshtein`.
+    """
+    if costs is not None:
+        ins_costs, del_costs, sub_costs = (
+            costs.insert, costs.delete, costs.substitute)
+    aligner = Hirschberg(source, target, ins_costs, del_costs, sub_costs)
+    backtrace = Backtrace([])
+    cumulative_cost: Cost = 0
+    for operation, src_pos, targ_pos, cost in aligner.steps(
+            (0, len(source)), (0, len(target))):
+        cumulative_cost = cumulative_cost + cost
+        backtrace.append(EditStep(
+            None if operation == Operation.INS else source[src_pos],
+            None if operation == Operation.DEL else target[targ_pos],
+            Cell(cost, cumulative_cost, operation)))
+    return backtrace
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
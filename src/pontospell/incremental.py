@@ -0,0 +1,156 @@
+# developed under python 3.6.3 from anaconda
+""" incremental.py
+
+Align a source with a target that grows and shrinks at its end.
+
+When a learner types a word one key at a time, each keystroke adds or
+removes one target element, and only one row of the distance matrix
+changes.
+An `IncrementalAligner` keeps the matrix of the source against the target
+typed so far, and computes or discards one row per `push` or `pop`, so
+each keystroke costs time proportional to the length of the source:
+>>> from pontospell.incremental import IncrementalAligner
+>>> aligner = IncrementalAligner('dog')
+>>> for letter in 'dgo':
+...     print(letter, aligner.push(letter))
+d 2
+g 1
+o 2
+>>> aligner.pop()
+'o'
+>>> aligner.update('doge')
+1
+>>> print(aligner.vertical_alignment())
+d = d  0
+o = o  0
+g = g  0
+  < e  1
+
+The matrix is a `chart.FlatMatrix` filled exactly as `chart.levenshtein`
+fills it with `Engine.FLAT`, including its preference among operations
+of equal cost, so `analysis` can be passed to the `chart` functions that
+read a matrix.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from itertools import repeat
+from typing import Any, List, Optional, Sequence
+
+from pontospell.chart import (
+    DEL_CODE, Backtrace, Cost, DeleteCostFunction, DistanceMatrix,
+    FlatMatrix, InsertCostFunction, PairAnalysis, SubstituteCostFunction,
+    fill_flat_row, get_one_backtrace, greatest_width, lev_del_function,
+    lev_ins_function, lev_sub_function, vertical_alignment)
+from pontospell.costs import CompiledCosts
+import pontospell.instrument as instrument
+
+class IncrementalAligner:
+    """The distance matrix of a fixed source and a changing target.
+
+    The matrix grows a row at a time and never shrinks its storage, so
+    typing and erasing allocates nothing once the longest target so far
+    has been seen.
+    """
+    def __init__(self, source: Sequence,
+                 ins_costs: InsertCostFunction = lev_ins_function,
+                 del_costs: DeleteCostFunction = lev_del_function,
+                 sub_costs: SubstituteCostFunction = lev_sub_function,
+                 costs: Optional[CompiledCosts] = None) -> None:
+        if costs is not None:
+            ins_costs, del_costs, sub_costs = (
+                costs.insert, costs.delete, costs.substitute)
+        self.source: Sequence = source
+        self.target: List[Any] = []
+        self.ins_costs: InsertCostFunction = ins_costs
+        self.del_costs: DeleteCostFunction = del_costs
+        self.sub_costs: SubstituteCostFunction = sub_costs
+        self.del_vector: List[Cost] = [del_costs(element)
+                                       for element in source]
+        self.matrix = FlatMatrix(0, len(source))
+        cumulative: List[Cost] = self.matrix.cumulative_costs
+        for src_pos, del_cost in enumerate(self.del_vector, 1):
+            self.matrix.this_costs[src_pos] = del_cost
+            cumulative[src_pos] = cumulative[src_pos - 1] + del_cost
+            self.matrix.operations[src_pos] = DEL_CODE
+
+    def __len__(self) -> int:
+        """ Return the length of the target so far. """
+        return len(self.target)
+
+    def push(self, targ_element: Any) -> Cost:
+        """Append an element to the target; return the new distance.
+
+        Computes one row of the matrix, counted as 'incremental.rows' if
+        recording.
+        """
+        if instrument.CURRENT is not None:
+            instrument.count('incremental.rows')
+        matrix: FlatMatrix = self.matrix
+        above: int = len(self.target) * matrix.width
+        self.target.append(targ_element)
+        matrix.resize(len(self.target), len(self.source))
+        fill_flat_row(matrix, above, self.ins_costs(targ_element),
+                      map(self.sub_costs, self.source, repeat(targ_element)),
+                      self.del_vector)
+        return matrix.cumulative_costs[above + matrix.width + len(self.source)]
+
+    def pop(self) -> Any:
+        """Remove the last element of the target and return it.
+
+        Raises `IndexError` if the target is empty.
+        """
+        targ_element: Any = self.target.pop()
+        self.matrix.resize(len(self.target), len(self.source))
+        return targ_element
+
+    def update(self, target: Sequence) -> Cost:
+        """Make the target equal to `target`; return the distance.
+
+        Keeps the rows of the prefix `target` shares with the current
+        target, and recomputes only the rest.
+        """
+        common: int = 0
+        for old, new in zip(self.target, target):
+            if old != new:
+                break
+            common += 1
+        while len(self.target) > common:
+            self.pop()
+        for targ_element in target[common:]:
+            self.push(targ_element)
+        return self.min_edit_distance()
+
+    def min_edit_distance(self) -> Cost:
+        """ Return the distance between the source and the target so far. """
+        return self.matrix.cumulative_costs[
+            len(self.target) * self.matrix.width + len(self.source)]
+
+    def analysis(self) -> PairAnalysis:
+        """Return an analysis of the source and the target so far.
+
+        Like an `Aligner`'s analyses, it reads the aligner's matrix and is
+        valid only until the next `push` or `pop`.
+        """
+        target: tuple = tuple(self.target)
+        return PairAnalysis(
+            self.source,
+            greatest_width(self.source) if len(self.source) else 0,
+            target, greatest_width(target) if target else 0,
+            self.ins_costs, self.del_costs, self.sub_costs,
+            DistanceMatrix(self.matrix))  # type: ignore
+
+    def backtrace(self) -> Backtrace:
+        """ Return an optimal alignment of the source and the target. """
+        return get_one_backtrace(self.analysis())
+
+    def vertical_alignment(self) -> str:
+        """ Return the alignment as a printable plaintext string. """
+        return vertical_alignment(self.analysis())
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -0,0 +1,223 @@
+# developed under python 3.6.3 from anaconda
+""" index.py
+
+Find the words in a list that are nearest to a spelling.
+
+Words on the list are compared as the `source` and the spelling as the
+`target` of `chart.levenshtein`, so the same cost functions apply.
+>>> import pontospell.index as pi
+>>> words = ['because', 'cause', 'became', 'beast', 'bee']
+>>> index = pi.TrieIndex(words)
+>>> index.nearest('becuz', k=2)
+[Match(word='because', cost=4), Match(word='bee', cost=4)]
+>>> index.nearest('becaus', max_cost=2)
+[Match(word='because', cost=1)]
+
+A `TrieIndex` shares the rows of the distance matrix among all words that
+begin alike, and skips every word under a prefix that already costs too
+much.
+A `BKTree` compares whole words with `chart.distance`, and needs the costs
+to form a metric: symmetric, and obeying the triangle inequality, as
+Levenshtein’s costs do.
+>>> pi.BKTree(words).nearest('becuz', k=2)
+[Match(word='because', cost=4), Match(word='bee', cost=4)]
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+import heapq
+from typing import (
+    Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple)
+
+from pontospell.chart import (
+    Cost, DeleteCostFunction, InsertCostFunction, SubstituteCostFunction,
+    distance, lev_del_function, lev_ins_function, lev_sub_function)
+
+                                                  #pylint: disable=invalid-name
+class Match(NamedTuple):
+    """ A word from the index and its distance from the spelling. """
+    word: Sequence
+    cost: Cost
+                                                  #pylint: enable=invalid-name
+
+class Nearest:
+    """The `k` best matches so far, preferring words added earlier.
+
+    Raises `ValueError` unless `k` is positive.
+    """
+    def __init__(self, k: int, max_cost: Optional[Cost]) -> None:
+        if k < 1:
+            raise ValueError('k must be positive')
+        self.k: int = k
+        self.max_cost: Cost = float('inf') if max_cost is None else max_cost
+        self.heap: List[Tuple[Cost, int, Sequence]] = []  # negated keys
+
+    def bound(self) -> Cost:
+        """ Return the greatest cost that could still make the list. """
+        if len(self.heap) < self.k:
+            return self.max_cost
+        return min(self.max_cost, -self.heap[0][0])
+
+    def offer(self, cost: Cost, order: int, word: Sequence) -> None:
+        """ Consider a word for the list. """
+        if cost > self.max_cost:
+            return
+        entry = (-cost, -order, word)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def matches(self) -> List[Match]:
+        """ Return the best matches, least cost first. """
+        return [Match(word, -cost) for cost, _, word in sorted(
+            self.heap, reverse=True)]
+
+class TrieNode:
+    """ Words sharing a prefix; `words` are (order, word) ending here. """
+    __slots__ = ('children', 'words')
+    def __init__(self) -> None:
+        self.children: Dict[Any, 'TrieNode'] = {}
+        self.words: List[Tuple[int, Sequence]] = []
+
+class TrieIndex:
+    """Words in a trie, searched with one matrix column per trie node.
+
+    Elements of the words must be hashable.
+    Costs must not be negative.
+    """
+    def __init__(self, words: Iterable[Sequence] = (),
+                 ins_costs: InsertCostFunction = lev_ins_function,
+                 del_costs: DeleteCostFunction = lev_del_function,
+                 sub_costs: SubstituteCostFunction = lev_sub_function
+                ) -> None:
+        self.root = TrieNode()
+        self.size: int = 0
+        self.ins_costs: InsertCostFunction = ins_costs
+        self.del_costs: DeleteCostFunction = del_costs
+        self.sub_costs: SubstituteCostFunction = sub_costs
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, word: Sequence) -> None:
+        """ Add a word to the index. """
+        node: TrieNode = self.root
+        for element in word:
+            node = node.children.setdefault(element, TrieNode())
+        node.words.append((self.size, word))
+        self.size += 1
+
+    def nearest(self, spelling: Sequence, k: int = 5,
+                max_cost: Optional[Cost] = None) -> List[Match]:
+        """Return up to `k` closest words costing at most `max_cost`.
+
+        Raises `ValueError` unless `k` is positive.
+        """
+        best = Nearest(k, max_cost)
+        ins_vector: List[Cost] = [self.ins_costs(element)
+                                  for element in spelling]
+        root_column: List[Cost] = [0]
+        for ins_cost in ins_vector:
+            root_column.append(root_column[-1] + ins_cost)
+        stack: List[Tuple[TrieNode, List[Cost]]] = [(self.root, root_column)]
+        while stack:
+            node, column = stack.pop()
+            for order, word in node.words:
+                best.offer(column[-1], order, word)
+            for src_element, child in node.children.items():
+                child_column: List[Cost] = self.next_column(
+                    column, src_element, spelling, ins_vector)
+                if min(child_column) <= best.bound():
+                    stack.append((child, child_column))
+        return best.matches()
+
+    def next_column(self, column: List[Cost], src_element: Any,
+                    spelling: Sequence, ins_vector: List[Cost]
+                   ) -> List[Cost]:
+        """ Extend the matrix by one source element. """
+        del_cost: Cost = self.del_costs(src_element)
+        new_column: List[Cost] = [column[0] + del_cost]
+        for pos, targ_element in enumerate(spelling):
+            new_column.append(min(
+                column[pos] + self.sub_costs(src_element, targ_element),
+                column[pos + 1] + del_cost,
+                new_column[pos] + ins_vector[pos]))
+        return new_column
+
+class BKNode:
+    """ A word in a BK-tree, with subtrees keyed by distance from it. """
+    __slots__ = ('order', 'word', 'children')
+    def __init__(self, order: int, word: Sequence) -> None:
+        self.order: int = order
+        self.word: Sequence = word
+        self.children: Dict[Cost, 'BKNode'] = {}
+
+class BKTree:
+    """Words in a Burkhard-Keller tree.
+
+    The triangle inequality lets a search skip every subtree whose
+    distance from its parent differs too much from the spelling's.
+    """
+    def __init__(self, words: Iterable[Sequence] = (),
+                 ins_costs: InsertCostFunction = lev_ins_function,
+                 del_costs: DeleteCostFunction = lev_del_function,
+                 sub_costs: SubstituteCostFunction = lev_sub_function
+                ) -> None:
+        self.root: Optional[BKNode] = None
+        self.size: int = 0
+        self.ins_costs: InsertCostFunction = ins_costs
+        self.del_costs: DeleteCostFunction = del_costs
+        self.sub_costs: SubstituteCostFunction = sub_costs
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def distance(self, word: Sequence, spelling: Sequence) -> Cost:
+        """ Return the edit distance from word to spelling. """
+        return distance(word, spelling,
+                        self.ins_costs, self.del_costs, self.sub_costs)
+
+    def add(self, word: Sequence) -> None:
+        """ Add a word to the tree. """
+        new_node = BKNode(self.size, word)
+        self.size += 1
+        if self.root is None:
+            self.root = new_node
+            return
+        node: BKNode = self.root
+        while True:
+            cost: Cost = self.distance(node.word, word)
+            child: Optional[BKNode] = node.children.get(cost)
+            if child is None:
+                node.children[cost] = new_node
+                return
+            node = child
+
+    def nearest(self, spelling: Sequence, k: int = 5,
+                max_cost: Optional[Cost] = None) -> List[Match]:
+        """Return up to `k` closest words costing at most `max_cost`.
+
+        Raises `ValueError` unless `k` is positive.
+        """
+        best = Nearest(k, max_cost)
+        stack: List[BKNode] = [self.root] if self.root is not None else []
+        while stack:
+            node: BKNode = stack.pop()
+            cost: Cost = self.distance(node.word, spelling)
+            best.offer(cost, node.order, node.word)
+            bound: Cost = best.bound()
+            stack.extend(child for child_cost, child in node.children.items()
+                         if abs(child_cost - cost) <= bound)
+        return best.matches()
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -0,0 +1,158 @@
+# developed under python 3.6.3 from anaconda
+""" instrument.py
+
+Count and time what the alignment engines do, when asked to.
+
+Inside a `recording` block, `chart` and `xducer` count matrix cells,
+calls to the cost functions, memory hits and pruned branches, and time
+each phase of their work:
+>>> import pontospell.chart as chart
+>>> import pontospell.instrument as instrument
+>>> with instrument.recording() as recorder:
+...     print(chart.vertical_alignment(chart.levenshtein('dag', 'doge')))
+d = d  0
+a ~ o  2
+g = g  0
+  < e  1
+>>> recorder.counters['chart.cells']
+19
+>>> recorder.counters['chart.sub_calls']
+12
+>>> sorted(recorder.timings)
+['chart.backtrace', 'chart.fill', 'chart.render']
+
+Outside such a block the engines only check, once per call, whether
+anything is recording, so instrumentation costs next to nothing.
+The recorder is global to the process; do not record in several threads
+at once.
+A `callback` given to the `Recorder` is called with the name and
+duration in seconds of each span as it ends, which suits sending timings
+on to a monitoring system.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from collections import Counter
+from contextlib import contextmanager
+import time
+from typing import (
+    Any, Callable, Dict, Iterator, List, Optional, Tuple)
+
+                                                  #pylint: disable=invalid-name
+SpanCallback = Callable[[str, float], None]
+                                                  #pylint: enable=invalid-name
+
+class Recorder:
+    """Counters and cumulative timings, by name.
+
+    Names are prefixed with the module that records them, such as
+    'chart.fill' or 'xducer.memo_hits'.
+    Spans may nest, and each span's time includes that of spans inside it.
+    """
+    def __init__(self, callback: Optional[SpanCallback] = None) -> None:
+        self.counters: Counter = Counter()
+        self.timings: Dict[str, float] = {}
+        self.spans: Counter = Counter()
+        self.callback: Optional[SpanCallback] = callback
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """ Add to a counter. """
+        self.counters[name] += amount
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """ Time the enclosed code and add it to the named total. """
+        started: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds: float = time.perf_counter() - started
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+            self.spans[name] += 1
+            if self.callback is not None:
+                self.callback(name, seconds)
+
+    def counting(self, name: str, function: Callable) -> Callable:
+        """Return function wrapped to count its calls under name.
+
+        Calls are counted only while this recorder is recording.
+        """
+        counters: Counter = self.counters
+        def counted(*args: Any) -> Any:
+            """ Count this call, then make it. """
+            if CURRENT is self:
+                counters[name] += 1
+            return function(*args)
+        return counted
+
+    def report(self) -> str:
+        """Return the counters and timings as a plain-text table.
+
+        >>> recorder = Recorder()
+        >>> recorder.count('chart.cells', 12)
+        >>> print(recorder.report())
+        chart.cells        12
+        """
+        lines: List[str] = [f'{name:<16} {value:>4}'
+                            for name, value in sorted(self.counters.items())]
+        lines.extend(
+            f'{name:<16} {self.timings[name] * 1e3:10.3f} ms'
+            f' in {self.spans[name]} spans'
+            for name in sorted(self.timings))
+        return '\n'.join(lines)
+
+CURRENT: Optional[Recorder] = None
+""" The recorder in use, if any; engines test this before recording. """
+
+class NoSpan:
+    """ A reusable context manager that does nothing. """
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+NO_SPAN = NoSpan()
+
+@contextmanager
+def recording(recorder: Optional[Recorder] = None) -> Iterator[Recorder]:
+    """ Record engine activity within the block; yield the recorder. """
+    global CURRENT                          #pylint: disable=global-statement
+    if recorder is None:
+        recorder = Recorder()
+    previous: Optional[Recorder] = CURRENT
+    CURRENT = recorder
+    try:
+        yield recorder
+    finally:
+        CURRENT = previous
+
+def span(name: str) -> Any:
+    """ Time the enclosed code if recording; otherwise do nothing. """
+    recorder: Optional[Recorder] = CURRENT
+    return NO_SPAN if recorder is None else recorder.span(name)
+
+def count(name: str, amount: int = 1) -> None:
+    """ Add to a counter if recording. """
+    recorder: Optional[Recorder] = CURRENT
+    if recorder is not None:
+        recorder.counters[name] += amount
+
+def counting_costs(prefix: str, *functions: Tuple[str, Callable]
+                  ) -> List[Callable]:
+    """Return cost functions that count their calls if recording.
+
+    Each function is paired with the name of its counter.
+    """
+    recorder: Optional[Recorder] = CURRENT
+    if recorder is None:
+        return [function for _, function in functions]
+    return [recorder.counting(f'{prefix}.{name}', function)
+            for name, function in functions]
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
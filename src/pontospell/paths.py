@@ -0,0 +1,256 @@
+# developed under python 3.6.3 from anaconda
+""" paths.py
+
+Find every optimal alignment, or the k best, in a filled matrix.
+
+`chart.get_one_backtrace` follows the one operation the matrix keeps for
+each cell.
+These functions recover all the operations that reach each cell at its
+minimal cost, so they can count the co-optimal alignments, draw one of
+them at random, or rank alignments by cost:
+>>> from pontospell.chart import levenshtein
+>>> from pontospell.paths import count_optimal_paths, k_best_backtraces
+>>> result = levenshtein('dag', 'doge')
+>>> count_optimal_paths(result)
+3
+>>> len(k_best_backtraces(result, 5))
+5
+
+They work on analyses from any `chart` engine, with any cost functions.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from array import array
+import heapq
+from itertools import islice
+import random
+from typing import Any, Iterator, List, NamedTuple, Optional, Sequence
+
+from pontospell.chart import (
+    DEL_CODE, INS_CODE, OPERATION_CODES, START_CODE, SUB_CODE, Backtrace,
+    Cell, Coordinates, Cost, EditStep, FlatMatrix, PairAnalysis, SeqPos,
+    enumerate1)
+
+INS_BIT, DEL_BIT, SUB_BIT = (1 << INS_CODE, 1 << DEL_CODE, 1 << SUB_CODE)
+""" Bits of a predecessor mask, one per operation that reaches a cell. """
+
+class OptimalPaths(NamedTuple):
+    """Every optimal way of reaching each cell of an analysis’s matrix.
+
+    Lists are indexed like a `FlatMatrix`: `target_pos * width +
+    source_pos`.
+    `masks` has a bit set for each operation that reaches the cell at
+    its minimal cumulative cost, and `counts` the number of optimal
+    paths from the origin to the cell.
+    """
+    width: int
+    cumulative_costs: List[Cost]
+    masks: array
+    counts: List[int]
+
+class Ranked(NamedTuple):
+    """ One of the best paths to a cell, for `k_best_backtraces`. """
+    cumulative_cost: Cost
+    preference: int  # prefer substitution, deletion, insertion on ties
+    operation: int  # code in `OPERATION_CODES`
+    this_cost: Cost
+    rank: int  # which of the best paths to the preceding cell
+
+def cumulative_costs(analysis: PairAnalysis) -> List[Cost]:
+    """ Return the cumulative costs of all cells, row by row. """
+    matrix = analysis.matrix
+    if isinstance(matrix, FlatMatrix):
+        return matrix.cumulative_costs[:len(matrix)]
+    return [matrix[Coordinates(targ_pos, src_pos)].cumulative_cost
+            for targ_pos in range(len(analysis.target) + 1)
+            for src_pos in range(len(analysis.source) + 1)]
+
+def optimal_paths(analysis: PairAnalysis) -> OptimalPaths:
+    """Find all optimal predecessors of every cell, and count paths.
+
+    The matrix keeps only the preferred operation for each cell, so the
+    others are found again by redoing each cell’s sums, which are
+    compared exactly as the engines compared them.
+    """
+    source: Sequence = analysis.source
+    width: int = len(source) + 1
+    cumulative: List[Cost] = cumulative_costs(analysis)
+    del_costs: List[Cost] = [analysis.del_cost(src_element)
+                             for src_element in source]
+    masks: array = array('b', bytes(len(cumulative)))
+    counts: List[int] = [0] * len(cumulative)
+    counts[0] = 1
+    src_pos: SeqPos
+    for src_pos in range(1, width):
+        masks[src_pos] = DEL_BIT
+        counts[src_pos] = 1
+    row: int = 0
+    targ_element: Any
+    for targ_element in analysis.target:
+        above: int = row
+        row += width
+        ins_cost: Cost = analysis.ins_cost(targ_element)
+        masks[row] = INS_BIT
+        counts[row] = 1
+        src_element: Any
+        for src_pos, src_element in enumerate1(source):
+            here: int = row + src_pos
+            total: Cost = cumulative[here]
+            mask: int = 0
+            count: int = 0
+            if (cumulative[above + src_pos - 1]
+                    + analysis.sub_cost(src_element, targ_element) == total):
+                mask |= SUB_BIT
+                count += counts[above + src_pos - 1]
+            if cumulative[here - 1] + del_costs[src_pos - 1] == total:
+                mask |= DEL_BIT
+                count += counts[here - 1]
+            if cumulative[above + src_pos] + ins_cost == total:
+                mask |= INS_BIT
+                count += counts[above + src_pos]
+            masks[here] = mask
+            counts[here] = count
+    return OptimalPaths(width, cumulative, masks, counts)
+
+def count_optimal_paths(analysis: PairAnalysis) -> int:
+    """Return the number of different alignments with the minimal cost.
+
+    Cumulative costs are compared exactly, as the engines compare them.
+    With `float` costs, sums that differ only by rounding are not equal,
+    so the count can differ from `xducer.count_optimal_alignments`, which
+    adds up the same costs in the opposite order.
+    >>> from pontospell.chart import levenshtein
+    >>> count_optimal_paths(levenshtein('intention', 'execution'))
+    134
+    """
+    return optimal_paths(analysis).counts[-1]
+
+def step_cost(analysis: PairAnalysis, operation: int,
+              src_pos: SeqPos, targ_pos: SeqPos) -> Cost:
+    """ Return the cost of the operation that ends at this cell. """
+    if operation == SUB_CODE:
+        return analysis.sub_cost(analysis.source[src_pos - 1],
+                                 analysis.target[targ_pos - 1])
+    if operation == DEL_CODE:
+        return analysis.del_cost(analysis.source[src_pos - 1])
+    return analysis.ins_cost(analysis.target[targ_pos - 1])
+
+def edit_step(analysis: PairAnalysis, operation: int,
+              src_pos: SeqPos, targ_pos: SeqPos, cell: Cell) -> EditStep:
+    """ Return the step of the operation that ends at this cell. """
+    return EditStep(
+        analysis.source[src_pos - 1] if operation != INS_CODE else None,
+        analysis.target[targ_pos - 1] if operation != DEL_CODE else None,
+        cell)
+
+def sample_backtrace(analysis: PairAnalysis,
+                     rng: Optional[random.Random] = None) -> Backtrace:
+    """Return one of the optimal alignments, each equally likely.
+
+    >>> from pontospell.chart import levenshtein
+    >>> backtrace = sample_backtrace(levenshtein('dag', 'doge'),
+    ...                              random.Random(1))
+    >>> backtrace[-1].cell.cumulative_cost
+    3
+    """
+    if rng is None:
+        rng = random.Random()
+    paths: OptimalPaths = optimal_paths(analysis)
+    width: int = paths.width
+    src_pos: SeqPos = len(analysis.source)
+    targ_pos: SeqPos = len(analysis.target)
+    backtrace = Backtrace([])
+    while src_pos > 0 or targ_pos > 0:
+        here: int = targ_pos * width + src_pos
+        choice: int = rng.randrange(paths.counts[here])
+        operation: int
+        for operation, bit, before in (
+                (SUB_CODE, SUB_BIT, here - width - 1),
+                (DEL_CODE, DEL_BIT, here - 1),
+                (INS_CODE, INS_BIT, here - width)):
+            if paths.masks[here] & bit:
+                if choice < paths.counts[before]:
+                    break
+                choice -= paths.counts[before]
+        backtrace.append(edit_step(
+            analysis, operation, src_pos, targ_pos,
+            Cell(step_cost(analysis, operation, src_pos, targ_pos),
+                 paths.cumulative_costs[here],
+                 OPERATION_CODES[operation])))
+        if operation != INS_CODE:
+            src_pos -= 1
+        if operation != DEL_CODE:
+            targ_pos -= 1
+    backtrace.reverse()
+    return backtrace
+
+def k_best_backtraces(analysis: PairAnalysis, k: int) -> List[Backtrace]:
+    """Return the `k` cheapest alignments, cheapest first.
+
+    Alignments need not be optimal: after all the co-optimal ones come
+    the next cheapest.
+    Each cell keeps its own `k` cheapest paths, so this takes time and
+    memory proportional to `k` times the size of the matrix.
+    The first alignment is the one `get_one_backtrace` returns.
+    >>> from pontospell.chart import levenshtein
+    >>> result = levenshtein('dag', 'doge')
+    >>> [backtrace[-1].cell.cumulative_cost
+    ...  for backtrace in k_best_backtraces(result, 4)]
+    [3, 3, 3, 5]
+    """
+    source: Sequence = analysis.source
+    width: int = len(source) + 1
+    del_costs: List[Cost] = [analysis.del_cost(src_element)
+                             for src_element in source]
+    best: List[List[Ranked]] = [[Ranked(0, 0, START_CODE, 0, 0)]]
+    def extend(before: int, operation: int, preference: int,
+               cost: Cost) -> Iterator[Ranked]:
+        """ Extend each best path to an earlier cell by one operation. """
+        return (Ranked(path.cumulative_cost + cost, preference, operation,
+                       cost, rank)
+                for rank, path in enumerate(best[before]))
+    for src_pos in range(1, width):
+        best.append(list(extend(src_pos - 1, DEL_CODE, 1,
+                                del_costs[src_pos - 1])))
+    row: int = 0
+    targ_element: Any
+    for targ_element in analysis.target:
+        above: int = row
+        row += width
+        ins_cost: Cost = analysis.ins_cost(targ_element)
+        best.append(list(extend(above, INS_CODE, 2, ins_cost)))
+        src_element: Any
+        for src_pos, src_element in enumerate1(source):
+            best.append(list(islice(heapq.merge(
+                extend(above + src_pos - 1, SUB_CODE, 0,
+                       analysis.sub_cost(src_element, targ_element)),
+                extend(row + src_pos - 1, DEL_CODE, 1,
+                       del_costs[src_pos - 1]),
+                extend(above + src_pos, INS_CODE, 2, ins_cost)), k)))
+    backtraces: List[Backtrace] = []
+    for rank in range(min(k, len(best[-1]))):
+        backtrace = Backtrace([])
+        src_pos = len(source)
+        targ_pos: SeqPos = len(analysis.target)
+        while src_pos > 0 or targ_pos > 0:
+            path: Ranked = best[targ_pos * width + src_pos][rank]
+            backtrace.append(edit_step(
+                analysis, path.operation, src_pos, targ_pos,
+                Cell(path.this_cost, path.cumulative_cost,
+                     OPERATION_CODES[path.operation])))
+            if path.operation != INS_CODE:
+                src_pos -= 1
+            if path.operation != DEL_CODE:
+                targ_pos -= 1
+            rank = path.rank
+        backtrace.reverse()
+        backtraces.append(backtrace)
+    return backtraces
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
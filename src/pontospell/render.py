@@ -0,0 +1,172 @@
+# developed under python 3.6.3 from anaconda
+""" render.py
+
+Format many alignments of the same pair of sequences quickly.
+
+`chart.vertical_alignment` and `xducer.vertical_align` measure every
+element and build every line afresh for each alignment.
+An `AlignmentFormatter` measures the elements of a pair once, remembers
+each padded element, and renders any number of alignments of that pair:
+chart backtraces, xducer parses, or compact alignments.
+>>> import pontospell.xducer as px
+>>> import pontospell.render as render
+>>> parses = px.relate(px.arguments('dag', 'doge'))
+>>> formatter = render.AlignmentFormatter('dag', 'doge', render.text_len)
+>>> print(formatter.render(parses[0]))
+d = d  0
+a ~ o  2
+g = g  0
+  < e  1
+>>> all(formatter.render(p) == px.vertical_align(p) for p in parses)
+True
+
+The default `width` function is `chart.print_len`, as used by
+`chart.vertical_alignment`; `text_len` reproduces `xducer.vertical_align`.
+Lines can be written straight to a file with `write`, and `tsv_lines`
+and `json_steps` give unpadded, machine-readable forms:
+>>> for line in formatter.tsv_lines(parses[0]):
+...     print(line.replace('\\t', '|'))
+d|=|d|0
+a|~|o|2
+g|=|g|0
+|<|e|1
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+import json
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Sequence, TextIO, Tuple,
+    Union)
+
+from pontospell.chart import Backtrace, Cost, EditStep, print_len
+from pontospell.compact import CompactAlignment, positions, step_costs
+from pontospell.xducer import Parse
+
+                                                  #pylint: disable=invalid-name
+Alignment = Union[Backtrace, Parse, CompactAlignment]
+Step = Tuple[Any, Any, Cost]
+""" Source element, target element, cost; None for a gap. """
+                                                  #pylint: enable=invalid-name
+
+def text_len(element: Any) -> int:
+    """Return the width `xducer.vertical_align` gives an element.
+
+    >>> text_len('ll'), text_len(None)
+    (2, 0)
+    """
+    return len(str(element or ''))
+
+def operator(src_element: Any, targ_element: Any) -> str:
+    """ Return the symbol for the operation that aligned these. """
+    return ('>' if targ_element is None else
+            '<' if src_element is None else
+            '=' if src_element == targ_element else
+            '~')
+
+def widest(elements: Iterable, width: Callable[[Any], int]) -> int:
+    """Return the greatest width, measuring each distinct element once.
+
+    >>> widest(['ll', 'a', 'll'], text_len)
+    2
+    """
+    widths: Dict[Any, int] = {}
+    greatest: int = 0
+    for element in elements:
+        try:
+            element_width = widths.get(element)
+            if element_width is None:
+                element_width = widths[element] = width(element)
+        except TypeError:  # unhashable
+            element_width = width(element)
+        greatest = max(greatest, element_width)
+    return greatest
+
+class AlignmentFormatter:
+    """Renders alignments of one source and one target.
+
+    Elements must be hashable for their padding to be remembered;
+    others are padded afresh each time.
+    """
+    def __init__(self, source: Sequence, target: Sequence,
+                 width: Callable[[Any], int] = print_len) -> None:
+        self.source: Sequence = source
+        self.target: Sequence = target
+        self.source_widest: int = widest(source, width)
+        self.target_widest: int = widest(target, width)
+        self.source_cells: Dict[Any, str] = {}
+        self.target_cells: Dict[Any, str] = {}
+
+    def steps(self, alignment: Alignment) -> Iterator[Step]:
+        """ Yield the elements aligned at each step, and its cost. """
+        if isinstance(alignment, CompactAlignment):
+            for (src_pos, targ_pos), cost in zip(
+                    positions(alignment), step_costs(alignment)):
+                yield (None if src_pos is None else self.source[src_pos],
+                       None if targ_pos is None else self.target[targ_pos],
+                       cost)
+            return
+        for step in alignment:
+            if isinstance(step, EditStep):
+                yield step.source, step.target, step.cell.this_cost
+            else:
+                yield step.source, step.target, step.this_cost
+
+    def pad(self, element: Any, width: int, cells: Dict[Any, str]) -> str:
+        """ Return the element padded to its column width. """
+        try:
+            return cells[element]
+        except KeyError:
+            cell = cells[element] = f"{(element or ' '):<{width}}"
+            return cell
+        except TypeError:  # unhashable
+            return f"{(element or ' '):<{width}}"
+
+    def lines(self, alignment: Alignment) -> Iterator[str]:
+        """ Yield each line of the vertical alignment. """
+        source_widest: int = self.source_widest
+        target_widest: int = self.target_widest
+        for src_element, targ_element, cost in self.steps(alignment):
+            source: str = self.pad(src_element, source_widest,
+                                   self.source_cells)
+            target: str = self.pad(targ_element, target_widest,
+                                   self.target_cells)
+            yield (f'{source} {operator(src_element, targ_element)} '
+                   f'{target}  {cost}')
+
+    def render(self, alignment: Alignment) -> str:
+        """ Return the vertical alignment as a string. """
+        return '\n'.join(self.lines(alignment))
+
+    def write(self, alignment: Alignment, stream: TextIO) -> None:
+        """ Write the vertical alignment, ending each line with newline. """
+        for line in self.lines(alignment):
+            stream.write(line)
+            stream.write('\n')
+
+    def tsv_lines(self, alignment: Alignment) -> Iterator[str]:
+        """ Yield source, operator, target and cost separated by tabs. """
+        for src_element, targ_element, cost in self.steps(alignment):
+            yield (f"{'' if src_element is None else src_element}\t"
+                   f'{operator(src_element, targ_element)}\t'
+                   f"{'' if targ_element is None else targ_element}\t"
+                   f'{cost}')
+
+    def json_steps(self, alignment: Alignment) -> List[Step]:
+        """ Return the steps as a list that JSON can represent. """
+        return list(self.steps(alignment))
+
+    def write_json(self, alignments: Iterable[Alignment],
+                   stream: TextIO) -> None:
+        """ Write each alignment's steps as one line of JSON. """
+        for alignment in alignments:
+            stream.write(json.dumps(self.json_steps(alignment),
+                                    ensure_ascii=False))
+            stream.write('\n')
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
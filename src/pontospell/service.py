@@ -0,0 +1,436 @@
+# developed under python 3.6.3 from anaconda
+""" service.py
+
+Score spellings for asyncio programs and over HTTP.
+
+Aligning is CPU-bound, so calling `chart.levenshtein` from a coroutine
+stalls every other connection until it finishes.
+A `ScoringService` queues the pairs from all requests, gathers them into
+micro-batches, and scores the batches in a pool of worker processes,
+while the event loop goes on serving.
+>>> import asyncio
+>>> from concurrent.futures import ThreadPoolExecutor
+>>> import pontospell.service as ps
+>>> async def demo():
+...     service = ps.ScoringService(executor=ThreadPoolExecutor(1))
+...     await service.start()
+...     reply = await service.score([('intention', 'execution'),
+...                                  ('dag', 'doge')])
+...     await service.stop()
+...     return reply
+>>> loop = asyncio.new_event_loop()
+>>> reply = loop.run_until_complete(demo())
+>>> loop.close()
+>>> [scored.distance for scored in reply.scores]
+[8, 3]
+>>> reply.latency >= 0
+True
+
+The queue holds at most `max_queue` pairs; a request arriving when it is
+full waits for room, so a flood of requests slows its senders down
+instead of exhausting memory.
+Batches go to the pool as soon as `batch_size` pairs are waiting or the
+oldest has waited `max_delay` seconds, and up to two batches per worker
+are scored at once.
+Once the queue is full, the pairs of all waiting requests are admitted
+in turn, so a large request cannot keep small ones waiting for long.
+
+Run `python -m pontospell.service --port 8000` to serve HTTP.
+`POST /score` with a JSON body `{"pairs": [[source, target], ...]}`
+returns `{"scores": [{"distance": ..., "alignment": ...}, ...],
+"latency": seconds}`, and `GET /stats` reports totals.
+Malformed requests, and pairs the cost functions reject, are answered
+with status 400 and `{"error": message}`.
+Only the standard library is used.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+import argparse
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+import json
+import os
+import sys
+import time
+from typing import (
+    Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union)
+
+from pontospell.batch import (
+    ChartTask, CostSpec, Pair, Scored, score_chart_chunk)
+from pontospell.chart import Cost, Engine
+from pontospell.cli import serialize_alignment
+
+                                                  #pylint: disable=invalid-name
+Score = Union[Cost, Scored]
+class Job(NamedTuple):
+    """ One pair waiting to be scored, and where its score goes. """
+    pair: Pair
+    future: asyncio.Future
+class Reply(NamedTuple):
+    """ Scores for one request, in order, and seconds taken. """
+    scores: List[Score]
+    latency: float
+class ServiceStats(NamedTuple):
+    """ Totals since the service started. """
+    requests: int
+    pairs: int
+    batches: int
+    queued: int  # pairs waiting now
+    mean_latency: float
+    max_latency: float
+                                                  #pylint: enable=invalid-name
+
+HTTP_REASONS: Dict[int, str] = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 413: 'Payload Too Large',
+    500: 'Internal Server Error'}
+
+def abandon(job: Job) -> None:
+    """ Fail a job that will never be scored. """
+    if not job.future.done():
+        job.future.set_exception(RuntimeError('service stopped'))
+
+class ScoringService:
+    """Micro-batching front end to a pool of scoring processes.
+
+    Cost functions are given as to `batch.levenshtein_many`: a name
+    registered with `batch.register_costs`, or picklable functions.
+    If no `executor` is given, a `ProcessPoolExecutor` with `workers`
+    processes is made, and shut down by `stop`.
+    """
+    def __init__(self, costs: CostSpec = 'levenshtein',
+                 engine: Engine = Engine.FLAT,
+                 distance_only: bool = False,
+                 workers: Optional[int] = None,
+                 executor: Optional[Executor] = None,
+                 batch_size: int = 64,
+                 max_delay: float = 0.005,
+                 max_queue: int = 4096) -> None:
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        self.task = ChartTask(costs, engine, distance_only)
+        self.workers: int = workers or os.cpu_count() or 1
+        self.own_executor: bool = executor is None
+        self.executor: Optional[Executor] = executor
+        self.batch_size: int = batch_size
+        self.max_delay: float = max_delay
+        self.max_queue: int = max_queue
+        self.queue: Optional[asyncio.Queue] = None
+        self.batcher: Optional[asyncio.Future] = None
+        self.running: Set[asyncio.Future] = set()  # batches being scored
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.requests: int = 0
+        self.pairs: int = 0
+        self.batches: int = 0
+        self.total_latency: float = 0.0
+        self.max_latency: float = 0.0
+
+    async def start(self) -> None:
+        """ Start taking requests. """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.slots = asyncio.Semaphore(2 * self.workers)
+        self.batcher = asyncio.ensure_future(self.run_batches())
+
+    async def stop(self) -> None:
+        """Stop taking requests, and shut down a pool made by `start`.
+
+        Pairs still waiting to be batched fail with `RuntimeError`.
+        """
+        if self.batcher is not None:
+            self.batcher.cancel()
+            try:
+                await self.batcher
+            except asyncio.CancelledError:
+                pass
+            self.batcher = None
+        queue: Optional[asyncio.Queue] = self.queue
+        self.queue = None
+        while queue is not None and not queue.empty():
+            abandon(queue.get_nowait())
+        if self.own_executor and self.executor is not None:
+            # Waiting for the pool's processes would block the event loop.
+            await asyncio.get_event_loop().run_in_executor(
+                None, self.executor.shutdown)
+            self.executor = None
+
+    async def score(self, pairs: List[Pair]) -> Reply:
+        """ Score pairs of sequences, waiting for room in the queue. """
+        queue: Optional[asyncio.Queue] = self.queue
+        if queue is None:
+            raise RuntimeError('service has not been started')
+        started: float = time.perf_counter()
+        loop = asyncio.get_event_loop()
+        futures: List[asyncio.Future] = []
+        for pair in pairs:
+            job = Job(pair, loop.create_future())
+            await queue.put(job)
+            if self.queue is not queue:  # stopped while waiting for room
+                abandon(job)
+            futures.append(job.future)
+        scores: List[Score] = list(await asyncio.gather(*futures))
+        latency: float = time.perf_counter() - started
+        self.requests += 1
+        self.pairs += len(pairs)
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        return Reply(scores, latency)
+
+    def stats(self) -> ServiceStats:
+        """ Report on requests served so far. """
+        return ServiceStats(
+            self.requests, self.pairs, self.batches,
+            self.queue.qsize() if self.queue is not None else 0,
+            self.total_latency / self.requests if self.requests else 0.0,
+            self.max_latency)
+
+    async def next_batch(self) -> List[Job]:
+        """ Wait for a job, then gather more until the batch is due. """
+        assert self.queue is not None
+        jobs: List[Job] = [await self.queue.get()]
+        loop = asyncio.get_event_loop()
+        deadline: float = loop.time() + self.max_delay
+        try:
+            while len(jobs) < self.batch_size:
+                if self.queue.empty():
+                    remaining: float = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        jobs.append(await asyncio.wait_for(
+                            self.queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    jobs.append(self.queue.get_nowait())
+        except asyncio.CancelledError:
+            for job in jobs:
+                abandon(job)
+            raise
+        return jobs
+
+    async def run_batches(self) -> None:
+        """ Send batches to the pool for as long as the service runs. """
+        assert self.slots is not None
+        while True:
+            await self.slots.acquire()
+            try:
+                jobs: List[Job] = await self.next_batch()
+            except asyncio.CancelledError:
+                self.slots.release()
+                raise
+            self.batches += 1
+            task: asyncio.Future = asyncio.ensure_future(self.run_batch(jobs))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def run_batch(self, jobs: List[Job]) -> None:
+        """Score one batch in the pool and hand out the scores.
+
+        If the batch fails, its pairs are scored one by one, so that only
+        the requests with bad pairs see the error.
+        """
+        assert self.slots is not None
+        try:
+            if len(jobs) == 1:
+                await self.run_job(jobs[0])
+                return
+            try:
+                scores: List[Score] = await asyncio.get_event_loop(
+                    ).run_in_executor(self.executor, score_chart_chunk,
+                                      self.task, [job.pair for job in jobs])
+            except Exception:                 #pylint: disable=broad-except
+                for job in jobs:
+                    await self.run_job(job)
+                return
+            for job, score in zip(jobs, scores):
+                if not job.future.done():
+                    job.future.set_result(score)
+        finally:
+            self.slots.release()
+
+    async def run_job(self, job: Job) -> None:
+        """ Score a single pair, passing any error to its request. """
+        try:
+            scores: List[Score] = await asyncio.get_event_loop(
+                ).run_in_executor(self.executor, score_chart_chunk,
+                                  self.task, [job.pair])
+        except Exception as error:            #pylint: disable=broad-except
+            if not job.future.done():
+                job.future.set_exception(error)
+        else:
+            if not job.future.done():
+                job.future.set_result(scores[0])
+
+def reply_json(reply: Reply) -> Dict[str, Any]:
+    """ Return the reply as data that JSON can represent. """
+    return {
+        'scores': [score if not isinstance(score, Scored) else
+                   {'distance': score.distance,
+                    'alignment': serialize_alignment(score)}
+                   for score in reply.scores],
+        'latency': reply.latency}
+
+def parse_pairs(body: bytes) -> List[Pair]:
+    """Return the pairs in the JSON body of a scoring request.
+
+    Raises `ValueError` unless the body is `{"pairs": [[source, target],
+    ...]}` with every source and target a string or an array.
+    >>> parse_pairs(b'{"pairs": [["dag", ["d", "o", "g", "e"]]]}')
+    [('dag', ['d', 'o', 'g', 'e'])]
+    >>> parse_pairs(b'{"pairs": [[null, "doge"]]}')
+    Traceback (most recent call last):
+    ...
+    ValueError: not a pair of sequences: [null, "doge"]
+    """
+    try:
+        items: Any = json.loads(body)['pairs']
+    except (KeyError, TypeError):
+        raise ValueError('no "pairs" member') from None
+    if not isinstance(items, list):
+        raise ValueError('"pairs" is not an array')
+    pairs: List[Pair] = []
+    for item in items:
+        if not (isinstance(item, list) and len(item) == 2
+                and all(isinstance(sequence, (str, list))
+                        for sequence in item)):
+            raise ValueError(f'not a pair of sequences: {json.dumps(item)}')
+        pairs.append((item[0], item[1]))
+    return pairs
+
+async def write_response(writer: asyncio.StreamWriter, status: int,
+                         body: Any, keep_alive: bool) -> None:
+    """ Send an HTTP response with a JSON body. """
+    data: bytes = json.dumps(body, ensure_ascii=False).encode('utf-8')
+    writer.write(
+        f'HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n'
+        f'Content-Type: application/json; charset=utf-8\r\n'
+        f'Content-Length: {len(data)}\r\n'
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f'\r\n'.encode('latin-1') + data)
+    await writer.drain()
+
+async def read_request(reader: asyncio.StreamReader
+                      ) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    """ Read a request line and headers; None at end of stream. """
+    line: bytes = await reader.readline()
+    if not line.strip():
+        return None
+    method, path, *_ = line.decode('latin-1').split()
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return method, path, headers
+
+class HttpFrontEnd:
+    """ Minimal HTTP/1.1 server for a `ScoringService`. """
+    def __init__(self, service: ScoringService,
+                 max_body: int = 16 * 1024 * 1024) -> None:
+        self.service: ScoringService = service
+        self.max_body: int = max_body
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """ Serve requests on one connection until it closes. """
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers = request
+                keep_alive: bool = (
+                    headers.get('connection', '').lower() != 'close')
+                length: int = int(headers.get('content-length', 0))
+                if length > self.max_body:
+                    await write_response(
+                        writer, 413, {'error': 'body too large'}, False)
+                    break
+                body: bytes = await reader.readexactly(length)
+                status, answer = await self.respond(method, path, body)
+                await write_response(writer, status, answer, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method: str, path: str,
+                      body: bytes) -> Tuple[int, Any]:
+        """ Return the status and JSON body answering a request. """
+        if path == '/stats':
+            if method != 'GET':
+                return 405, {'error': 'use GET'}
+            return 200, self.service.stats()._asdict()
+        if path != '/score':
+            return 404, {'error': f'no such path: {path}'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        try:
+            pairs: List[Pair] = parse_pairs(body)
+        except ValueError as error:
+            return 400, {'error': f'expected {{"pairs": [[source, target], '
+                                  f'...]}}: {error}'}
+        try:
+            reply: Reply = await self.service.score(pairs)
+        except (KeyError, TypeError, ValueError) as error:
+            return 400, {'error': f'cannot score pairs: {error!r}'}
+        except Exception as error:            #pylint: disable=broad-except
+            return 500, {'error': f'scoring failed: {error!r}'}
+        return 200, reply_json(reply)
+
+async def serve(service: ScoringService, host: str = '127.0.0.1',
+                port: int = 8000) -> asyncio.AbstractServer:
+    """ Start the service and an HTTP server for it. """
+    await service.start()
+    return await asyncio.start_server(
+        HttpFrontEnd(service).handle, host, port)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """ Run the HTTP service until interrupted; return exit status. """
+    parser = argparse.ArgumentParser(
+        prog='python -m pontospell.service',
+        description='Serve spelling scores over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--costs', default='levenshtein')
+    parser.add_argument('--distance-only', action='store_true')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--max-delay', type=float, default=0.005,
+                        help='seconds to wait while filling a batch')
+    parser.add_argument('--max-queue', type=int, default=4096)
+    args = parser.parse_args(argv)
+    service = ScoringService(
+        args.costs, distance_only=args.distance_only, workers=args.workers,
+        batch_size=args.batch_size, max_delay=args.max_delay,
+        max_queue=args.max_queue)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = loop.run_until_complete(serve(service, args.host, args.port))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        loop.run_until_complete(service.stop())
+        loop.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -0,0 +1,301 @@
+# developed under python 3.6.3 from anaconda
+""" vectorized.py
+
+Fill the distance matrix with NumPy, one anti-diagonal at a time.
+
+Every cell on an anti-diagonal (cells whose target and source positions
+have the same sum) depends only on the two anti-diagonals before it, so a
+whole anti-diagonal can be computed with a few array operations.
+Costs are read from a `costs.CostTable`, so the cost functions are called
+only once per pair of distinct elements.
+The result is the same `FlatMatrix`, cell for cell, as the `Engine.FLAT`
+engine would build, including its preference for substitution over
+deletion over insertion when costs tie.
+Usually this engine is reached through `chart.levenshtein`:
+>>> import pontospell.chart as chart
+>>> result = chart.levenshtein('intention', 'execution',
+...                            engine=chart.Engine.NUMPY)
+>>> chart.min_edit_distance(result)
+8
+
+To score many spellings of the same word, `score_targets` runs the
+dynamic programming for all of them at once, with the source and the cost
+table set up only once:
+>>> scores = score_targets('because', ['becuz', 'because', 'bcos'],
+...                        backtraces=True)
+>>> [int(cost) for cost in scores.distances]
+[4, 0, 5]
+>>> scores.backtraces[2][0]
+EditStep(source='b', target='b', cell=Cell(this_cost=0, cumulative_cost=0, \
+operation=<Operation.SUB: 's'>))
+
+NumPy is optional; without it, `Engine.NUMPY` quietly uses `Engine.FLAT`,
+and `score_targets` scores one pair at a time.
+"""
+# Brett Kessler, Washington University in St. Louis, Psychology
+# http://spell.psychology.wustl.edu
+
+from array import array
+from itertools import chain
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from pontospell.chart import (
+    DEL_CODE, INS_CODE, OPERATION_CODES, SUB_CODE, Backtrace, Cell,
+    DeleteCostFunction, EditStep, FlatMatrix, InsertCostFunction,
+    PairAnalysis, SubstituteCostFunction, distance, enumerate1,
+    Operation, get_one_backtrace, lev_del_function, lev_ins_function,
+    lev_sub_function, levenshtein, min_edit_distance)
+from pontospell.costs import CompiledCosts, CostTable
+
+try:
+    import numpy  # type: ignore
+except ImportError:
+    numpy = None  # type: ignore  #pylint: disable=invalid-name
+
+class TargetScores(NamedTuple):
+    """Distances from one source to many targets, in the targets’ order.
+
+    `distances` is a NumPy array, or a list if NumPy is not installed.
+    `backtraces` are as from `chart.get_one_backtrace`, if requested.
+    """
+    distances: Any
+    backtraces: Optional[List[Backtrace]] = None
+
+def numpy_available() -> bool:
+    """ Tell whether NumPy could be imported. """
+    return numpy is not None
+
+INT_LIMIT: int = 2 ** 31
+""" Integer costs must be smaller than this to be summed as `int64`. """
+
+def cost_dtype(table: CostTable) -> Any:
+    """Return the NumPy type that sums every cost in the table exactly.
+
+    Integer costs are summed as integers, floats and any integers with them
+    as floats, just as Python would sum them.
+    Returns None for any other kind of cost, such as a `Fraction` or a
+    `Decimal`, which NumPy could only approximate.
+    >>> from fractions import Fraction
+    >>> from pontospell.costs import CompiledCosts
+    >>> print(cost_dtype(CompiledCosts(lambda _: Fraction(1, 3)).table(
+    ...     'a', 'b')))
+    None
+    """
+    costs: List = list(chain(table.insert, table.delete, *table.substitute))
+    if all(isinstance(cost, int) and not isinstance(cost, bool)
+           and abs(cost) < INT_LIMIT for cost in costs):
+        return numpy.int64
+    if all(isinstance(cost, (int, float)) for cost in costs):
+        return numpy.float64
+    return None
+
+def object_array(values: Any) -> Any:
+    """ Return a NumPy array that holds the values as Python objects. """
+    result = numpy.empty(numpy.shape(values), dtype=object)
+    result[...] = values
+    return result
+
+def compute_numpy_min_edit_distance(
+        analysis: PairAnalysis, table: CostTable) -> None:
+    """Fill out the `FlatMatrix` of this analysis from the cost table.
+
+    Step costs are kept as the very objects in the table, so that they print
+    the same as the cost functions’ results; cumulative costs are NumPy
+    sums converted back to Python numbers.
+    """
+    matrix: FlatMatrix = analysis.matrix  # type: ignore
+    source_len: int = len(analysis.source)
+    target_len: int = len(analysis.target)
+    width: int = source_len + 1
+    source_ids = numpy.array(
+        [table.source_index[element] for element in analysis.source],
+        dtype=numpy.intp)
+    target_ids = numpy.array(
+        [table.target_index[element] for element in analysis.target],
+        dtype=numpy.intp)
+    dtype = cost_dtype(table)
+    del_costs: List = [table.delete[src_id] for src_id in source_ids]
+    ins_costs: List = [table.insert[targ_id] for targ_id in target_ids]
+    cumulative = numpy.zeros((target_len + 1) * width, dtype=dtype)
+    steps = object_array([0] * len(cumulative))
+    operations = numpy.zeros(len(cumulative), dtype=numpy.int8)
+    # Margins, summed in Python in the same order as the other engines:
+    total: Any = 0
+    pos: int
+    for pos, cost in enumerate1(del_costs):
+        total = total + cost
+        cumulative[pos], steps[pos], operations[pos] = total, cost, DEL_CODE
+    total = 0
+    for pos, cost in enumerate1(ins_costs):
+        total = total + cost
+        index: int = pos * width
+        cumulative[index], steps[index], operations[index] = (
+            total, cost, INS_CODE)
+    if source_len and target_len:
+        # Costs by (target position, source position), both zero-based:
+        sub_ids = (source_ids[numpy.newaxis, :], target_ids[:, numpy.newaxis])
+        sub_objects = object_array(table.substitute)[sub_ids]
+        sub_costs = numpy.array(table.substitute, dtype=dtype)[sub_ids]
+        del_array = numpy.array(del_costs, dtype=dtype)
+        ins_array = numpy.array(ins_costs, dtype=dtype)
+        for diagonal in range(2, target_len + source_len + 1):
+            targ_pos = numpy.arange(max(1, diagonal - source_len),
+                                    min(target_len, diagonal - 1) + 1)
+            src_pos = diagonal - targ_pos
+            here = targ_pos * width + src_pos
+            sub_total = (cumulative[here - width - 1]
+                         + sub_costs[targ_pos - 1, src_pos - 1])
+            del_total = cumulative[here - 1] + del_array[src_pos - 1]
+            ins_total = cumulative[here - width] + ins_array[targ_pos - 1]
+            use_sub = (sub_total <= del_total) & (sub_total <= ins_total)
+            use_del = ~use_sub & (del_total <= ins_total)
+            cumulative[here] = numpy.where(
+                use_sub, sub_total, numpy.where(use_del, del_total, ins_total))
+            operations[here] = numpy.where(
+                use_sub, SUB_CODE, numpy.where(use_del, DEL_CODE, INS_CODE))
+        body_operations = operations.reshape(target_len + 1, width)[1:, 1:]
+        steps.reshape(target_len + 1, width)[1:, 1:] = numpy.where(
+            body_operations == SUB_CODE, sub_objects,
+            numpy.where(body_operations == DEL_CODE,
+                        object_array(del_costs)[numpy.newaxis, :],
+                        object_array(ins_costs)[:, numpy.newaxis]))
+    matrix.resize(target_len, source_len)
+    matrix.this_costs = steps.tolist()
+    matrix.cumulative_costs = cumulative.tolist()
+    matrix.operations = array('b', operations.tobytes())
+
+def score_targets(source: Sequence, targets: Sequence[Sequence],
+                  ins_costs: InsertCostFunction = lev_ins_function,
+                  del_costs: DeleteCostFunction = lev_del_function,
+                  sub_costs: SubstituteCostFunction = lev_sub_function,
+                  costs: Optional[CompiledCosts] = None,
+                  backtraces: bool = False) -> TargetScores:
+    """Compare one source sequence with each of many target sequences.
+
+    The targets are encoded as rows of a padded integer matrix, and each
+    anti-diagonal of the distance matrix is computed for all of them in one
+    set of array operations.
+    Memory grows as the number of targets times the length of the longest
+    target times the length of the source.
+    Results are the same as from `chart.levenshtein` pair by pair.
+    """
+    if costs is None:
+        costs = CompiledCosts(ins_costs, del_costs, sub_costs)
+    table: Optional[CostTable] = None
+    if numpy is not None:
+        try:
+            table = costs.table(
+                source, [element for target in targets for element in target])
+        except TypeError:  # unhashable elements
+            pass
+        if table is not None and cost_dtype(table) is None:
+            table = None
+    if table is None:
+        if not backtraces:
+            return TargetScores([
+                distance(source, target, costs.insert, costs.delete,
+                         costs.substitute)
+                for target in targets])
+        analyses: List[PairAnalysis] = [
+            levenshtein(source, target, costs=costs) for target in targets]
+        return TargetScores(
+            [min_edit_distance(analysis) for analysis in analyses],
+            [get_one_backtrace(analysis) for analysis in analyses])
+    return score_encoded_targets(source, targets, table, backtraces)
+
+def score_encoded_targets(source: Sequence, targets: Sequence[Sequence],
+                          table: CostTable, backtraces: bool) -> TargetScores:
+    """ Run `score_targets` with NumPy, reading costs from the table. """
+    count: int = len(targets)
+    source_len: int = len(source)
+    lengths = numpy.array([len(target) for target in targets],
+                          dtype=numpy.intp)
+    longest: int = int(lengths.max()) if count else 0
+    width: int = source_len + 1
+    dtype = cost_dtype(table)
+    pad: int = len(table.target_alphabet)  # an extra id, costing nothing
+    target_ids = numpy.full((count, longest), pad, dtype=numpy.intp)
+    for row, target in enumerate(targets):
+        target_ids[row, :len(target)] = [
+            table.target_index[element] for element in target]
+    source_list: List[int] = [table.source_index[element]
+                              for element in source]
+    source_ids = numpy.array(source_list, dtype=numpy.intp)
+    sub_table = numpy.zeros((len(table.source_alphabet), pad + 1), dtype=dtype)
+    sub_table[:, :pad] = numpy.reshape(
+        numpy.array(table.substitute, dtype=dtype),
+        (len(table.source_alphabet), pad))
+    ins_array = numpy.zeros(pad + 1, dtype=dtype)
+    ins_array[:pad] = table.insert
+    del_array = numpy.array([table.delete[src_id] for src_id in source_list],
+                            dtype=dtype)
+    cumulative = numpy.zeros((count, longest + 1, width), dtype=dtype)
+    operations = numpy.zeros((count, longest + 1, width), dtype=numpy.int8)
+    total: Any = 0
+    pos: int
+    for pos, src_id in enumerate1(source_list):
+        total = total + table.delete[src_id]
+        cumulative[:, 0, pos] = total
+    operations[:, 0, 1:] = DEL_CODE
+    for pos in range(1, longest + 1):
+        cumulative[:, pos, 0] = (cumulative[:, pos - 1, 0]
+                                 + ins_array[target_ids[:, pos - 1]])
+    operations[:, 1:, 0] = INS_CODE
+    for diagonal in range(2, longest + source_len + 1):
+        targ_pos = numpy.arange(max(1, diagonal - source_len),
+                                min(longest, diagonal - 1) + 1)
+        src_pos = diagonal - targ_pos
+        targ_ids = target_ids[:, targ_pos - 1]
+        sub_total = (cumulative[:, targ_pos - 1, src_pos - 1]
+                     + sub_table[source_ids[src_pos - 1], targ_ids])
+        del_total = (cumulative[:, targ_pos, src_pos - 1]
+                     + del_array[src_pos - 1])
+        ins_total = cumulative[:, targ_pos - 1, src_pos] + ins_array[targ_ids]
+        use_sub = (sub_total <= del_total) & (sub_total <= ins_total)
+        use_del = ~use_sub & (del_total <= ins_total)
+        cumulative[:, targ_pos, src_pos] = numpy.where(
+            use_sub, sub_total, numpy.where(use_del, del_total, ins_total))
+        operations[:, targ_pos, src_pos] = numpy.where(
+            use_sub, SUB_CODE, numpy.where(use_del, DEL_CODE, INS_CODE))
+    distances = cumulative[numpy.arange(count), lengths, source_len]
+    if not backtraces:
+        return TargetScores(distances)
+    return TargetScores(distances, [
+        encoded_backtrace(source, target, table,
+                          cumulative[row], operations[row])
+        for row, target in enumerate(targets)])
+
+def encoded_backtrace(source: Sequence, target: Sequence, table: CostTable,
+                      cumulative: Any, operations: Any) -> Backtrace:
+    """ Trace one target’s path back through its slice of the matrices. """
+    src_pos: int = len(source)
+    targ_pos: int = len(target)
+    steps: List[EditStep] = []
+    while src_pos > 0 or targ_pos > 0:
+        opus: Operation = OPERATION_CODES[operations[targ_pos, src_pos]]
+        cumulative_cost = cumulative[targ_pos, src_pos].item()
+        if opus == Operation.SUB:
+            src_pos -= 1
+            targ_pos -= 1
+            src_element, targ_element = source[src_pos], target[targ_pos]
+            cost = table.substitute[table.source_index[src_element]][
+                table.target_index[targ_element]]
+        elif opus == Operation.INS:
+            targ_pos -= 1
+            src_element, targ_element = None, target[targ_pos]
+            cost = table.insert[table.target_index[targ_element]]
+        else:
+            src_pos -= 1
+            src_element, targ_element = source[src_pos], None
+            cost = table.delete[table.source_index[src_element]]
+        steps.append(EditStep(src_element, targ_element,
+                              Cell(cost, cumulative_cost, opus)))
+    steps.reverse()
+    return Backtrace(steps)
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
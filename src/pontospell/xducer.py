@@ -21,12 +21,31 @@ t = t  0
 i = i  0
 o = o  0
 n = n  0
+
+For long sequences, or when there are very many co-optimal alignments,
+build the optimal-cost graph without recursion and take parses lazily:
+>>> args = px.arguments('intention', 'execution')
+>>> px.count_optimal_alignments(args)
+134
+>>> next(px.iter_relate(args)) == first_parse
+True
+
+With `linked=True`, parses are `LinkedParse` chains whose co-optimal
+suffixes are shared rather than copied:
+>>> linked = px.relate(px.arguments('intention', 'execution', linked=True))
+>>> linked == result
+True
 """
 # Brett Kessler, Washington University in St. Louis, Psychology
 # http://spell.psychology.wustl.edu
 
+from collections.abc import Sequence as SequenceABC
 from enum import Enum
-from typing import Any, Callable, Dict, List, NamedTuple, NewType, Sequence
+from typing import (
+    Any, Callable, Dict, Iterator, List, NamedTuple, NewType, Optional,
+    Sequence, Tuple, Union, cast)
+
+import pontospell.instrument as instrument
 
                                                   #pylint: disable=invalid-name
 Element = Any
@@ -82,14 +101,66 @@ class Arguments(NamedTuple):
     cost_functions: CostFunctions
     just_one: bool
     memory: Dict[Coordinates, Parses]
+    linked: bool = False
 
 def arguments(source: Sequence,
               target: Sequence,
               costs: CostFunctions = CostFunctions(
                   lev_ins_function, lev_del_function, lev_sub_function),
-              just_one: bool = False) -> Arguments:
+              just_one: bool = False,
+              linked: bool = False) -> Arguments:
     """ Arguments in recursive parse. """
-    return Arguments(source, target, costs, just_one, {})
+    return Arguments(source, target, costs, just_one, {}, linked)
+
+class LinkedParse(SequenceABC):
+    """A parse as a cell prefixed to the parse of the rest.
+
+    Parses that end the same way share the same `rest`, as `relate` keeps
+    them in memory, so all the co-optimal parses together take space
+    proportional to the distinct suffixes rather than to their total
+    length.
+    Reads as a sequence of cells: indexing and `len` work, though indexing
+    past the first cell walks the chain.
+    """
+    __slots__ = ('cell', 'rest', 'size')
+
+    def __init__(self, cell: Cell,
+                 rest: Optional['LinkedParse'] = None) -> None:
+        self.cell: Cell = cell
+        self.rest: Optional[LinkedParse] = rest
+        self.size: int = 1 if rest is None else rest.size + 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Cell]:
+        node: Optional[LinkedParse] = self
+        while node is not None:
+            yield node.cell
+            node = node.rest
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('parse index out of range')
+        node: LinkedParse = self
+        for _ in range(index):
+            node = cast(LinkedParse, node.rest)  # not None: index < size
+        return node.cell
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (LinkedParse, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other))
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f'LinkedParse({list(self)!r})'
 
 def op_cost(args: Arguments, pos: Coordinates, opus: Operation) -> Cost:
     """ Return cost of string-edit operation at this point. """
@@ -101,66 +172,231 @@ def op_cost(args: Arguments, pos: Coordinates, opus: Operation) -> Cost:
         if opus == Operation.DEL else
         args.cost_functions.insert(args.target[pos.target]))
 
-def parse_cost(pars: Parse) -> Cost:
-    """ Return cost of parse (edit series) as a cumulative whole. """
-    return pars[0].cumul_cost
-
-def try_op(
-        args: Arguments, start_pos: Coordinates, opus: Operation) -> Parses:
-    """ Apply operation here, then parse rest of strings. """
+def advance(start_pos: Coordinates, opus: Operation) -> Coordinates:
+    """ Return position after applying operation at this point. """
     consume_source = 1 if opus in {Operation.DEL, Operation.SUB} else 0
     consume_target = 1 if opus in {Operation.INS, Operation.SUB} else 0
-    tail_start = Coordinates(
+    return Coordinates(
         start_pos.source + consume_source, start_pos.target + consume_target)
-    tail: Parses = relate(args, tail_start)
-    cost: Cost = op_cost(args, start_pos, opus)
-    cell = Cell(
-        args.source[start_pos.source] if consume_source else None,
-        args.target[start_pos.target] if consume_target else None,
+
+def parse_cost(pars: Sequence[Cell]) -> Cost:
+    """ Return cost of parse (edit series) as a cumulative whole. """
+    return pars[0].cumul_cost
+
+def make_cell(args: Arguments, start_pos: Coordinates, opus: Operation,
+              cost: Cost, cumul_cost: Cost) -> Cell:
+    """ Make cell for operation applied at this point. """
+    return Cell(
+        args.source[start_pos.source] if opus != Operation.INS else None,
+        args.target[start_pos.target] if opus != Operation.DEL else None,
         cost,
-        cost)
-    if not tail:
-        return Parses([Parse([cell])])
-    return Parses([
-        Parse([cell._replace(cumul_cost=cell.this_cost + parse_cost(p))] + p)
-        for p in tail])
-
-def remove_suboptimal_parses(parses: Parses, just_one: bool) -> Parses:
-    """ Return all parses that have same optimal cost. """
-    minimum = min(parse_cost(parse) for parse in parses)
-    minimal_parses = [parse for parse in parses if parse_cost(parse) == minimum]
-    if just_one:
-        return Parses([minimal_parses[0]])
-    return Parses(minimal_parses)
+        cumul_cost)
 
 def parse(args: Arguments, start_pos: Coordinates) -> Parses:
-    """ Parse and relate strings from the given starting coordinates. """
+    """Parse and relate strings from the given starting coordinates.
+
+    The total cost of each operation is known from its own cost and the
+    cost of its tail, which `relate` has already found, so parses are
+    built only for the operations with the least total cost.
+    """
     remaining_source: int = len(args.source) - start_pos.source
     remaining_target: int = len(args.target) - start_pos.target
     parses = Parses([])
     if not (remaining_source or remaining_target):
         return parses
-    if remaining_source and remaining_target:
-        parses.extend(try_op(args, start_pos, Operation.SUB))
-    if remaining_source:
-        parses.extend(try_op(args, start_pos, Operation.DEL))
-    if remaining_target:
-        parses.extend(try_op(args, start_pos, Operation.INS))
-    if parses:
-        parses = remove_suboptimal_parses(parses, args.just_one)
+    options: List[Tuple[Operation, Cost, Parses, Cost]] = []
+    for opus, possible in ((Operation.SUB,
+                            remaining_source and remaining_target),
+                           (Operation.DEL, remaining_source),
+                           (Operation.INS, remaining_target)):
+        if not possible:
+            continue
+        tail: Parses = relate(args, advance(start_pos, opus))
+        cost: Cost = op_cost(args, start_pos, opus)
+        options.append((opus, cost, tail,
+                        cost + parse_cost(tail[0]) if tail else cost))
+    minimum: Cost = min(total for _, _, _, total in options)
+    for opus, cost, tail, total in options:
+        if total != minimum:
+            if instrument.CURRENT is not None:
+                instrument.count('xducer.branches_pruned')
+            continue
+        cell = make_cell(args, start_pos, opus, cost, total)
+        if args.linked:
+            # Linked parses stand in for list parses as sequences of cells.
+            links: List[LinkedParse] = (
+                [LinkedParse(cell, cast(LinkedParse, p)) for p in tail]
+                if tail else [LinkedParse(cell)])
+            parses.extend(cast(List[Parse], links))
+        elif not tail:
+            parses.append(Parse([cell]))
+        else:
+            parses.extend(Parse([cell] + p) for p in tail)
+        if args.just_one:
+            break
     return parses
 
+def counted_arguments(args: Arguments) -> Arguments:
+    """ Return arguments whose cost functions count their calls. """
+    functions: CostFunctions = args.cost_functions
+    return args._replace(cost_functions=CostFunctions(
+        *instrument.counting_costs(
+            'xducer', ('ins_calls', functions.insert),
+            ('del_calls', functions.delete),
+            ('sub_calls', functions.substitute))))
+
 def relate(args: Arguments, start: Coordinates = None) -> Parses:
     """ Return optimal alignments between two sequences. """
     if start is None:
+        if instrument.CURRENT is not None:
+            with instrument.span('xducer.relate'):
+                return relate(counted_arguments(args), Coordinates(0, 0))
         start = Coordinates(0, 0)
     parses: Parses = args.memory.get(start, None)
     if parses is not None:
+        if instrument.CURRENT is not None:
+            instrument.count('xducer.memo_hits')
         return parses
+    if instrument.CURRENT is not None:
+        instrument.count('xducer.cells')
     parses = parse(args, start)
     args.memory[start] = parses
     return parses
 
+Choice = Tuple[Operation, Cost]
+""" An optimal operation at some position, with its own cost. """
+
+class OptimalDag(NamedTuple):
+    """Graph of all optimal alignments between two sequences.
+
+    Positions are numbered `source_pos * width + target_pos`.
+    For each position, `costs` holds the optimal cost of aligning the rest
+    of the sequences, and `choices` holds the operations that achieve it,
+    in the order `parse` would try them.
+    """
+    width: int
+    costs: List[Cost]
+    choices: List[Tuple[Choice, ...]]
+
+def optimal_dag(args: Arguments) -> OptimalDag:
+    """Build the graph of optimal alignments bottom-up, without recursion.
+
+    Costs are accumulated exactly as `parse` does, from the end of the
+    sequences back to the start, so the same operations tie.
+    Insertion and deletion costs are looked up once per element.
+    """
+    if instrument.CURRENT is not None:
+        instrument.count('xducer.cells',
+                         (len(args.source) + 1) * (len(args.target) + 1))
+        with instrument.span('xducer.optimal_dag'):
+            return fill_optimal_dag(counted_arguments(args))
+    return fill_optimal_dag(args)
+
+def fill_optimal_dag(args: Arguments) -> OptimalDag:
+    """ Build the graph of optimal alignments for `optimal_dag`. """
+    source, target = args.source, args.target
+    functions: CostFunctions = args.cost_functions
+    width: int = len(target) + 1
+    size: int = (len(source) + 1) * width
+    del_costs: List[Cost] = [functions.delete(element) for element in source]
+    ins_costs: List[Cost] = [functions.insert(element) for element in target]
+    costs: List[Cost] = [0] * size
+    choices: List[Tuple[Choice, ...]] = [()] * size
+    for index in range(size - 2, -1, -1):
+        src_pos, targ_pos = divmod(index, width)
+        candidates: List[Tuple[Choice, Cost]] = []
+        cost: Cost
+        tail: int
+        if src_pos < len(source) and targ_pos < len(target):
+            cost = functions.substitute(source[src_pos], target[targ_pos])
+            tail = index + width + 1
+            candidates.append(((Operation.SUB, cost),
+                               cost + costs[tail] if choices[tail] else cost))
+        if src_pos < len(source):
+            cost = del_costs[src_pos]
+            tail = index + width
+            candidates.append(((Operation.DEL, cost),
+                               cost + costs[tail] if choices[tail] else cost))
+        if targ_pos < len(target):
+            cost = ins_costs[targ_pos]
+            tail = index + 1
+            candidates.append(((Operation.INS, cost),
+                               cost + costs[tail] if choices[tail] else cost))
+        minimum: Cost = min(total for _, total in candidates)
+        costs[index] = minimum
+        choices[index] = tuple(
+            choice for choice, total in candidates if total == minimum)
+    return OptimalDag(width, costs, choices)
+
+Edge = Tuple[Cell, int]
+""" A cell of some parse, and the index of the position after it. """
+
+def dag_edges(args: Arguments, dag: OptimalDag, index: int) -> List[Edge]:
+    """ Return the cells of the optimal operations at this position. """
+    start_pos = Coordinates(*divmod(index, dag.width))
+    steps: Dict[Operation, int] = {
+        Operation.SUB: dag.width + 1, Operation.DEL: dag.width,
+        Operation.INS: 1}
+    return [(make_cell(args, start_pos, opus, cost, dag.costs[index]),
+             index + steps[opus])
+            for opus, cost in dag.choices[index]]
+
+def iter_relate(args: Arguments) -> Iterator[Parse]:
+    """Yield the same parses as `relate`, in the same order, one at a time.
+
+    Walks `optimal_dag` depth-first with an explicit stack, so neither
+    sequence length nor the number of co-optimal parses is limited by
+    recursion depth or memory.
+    Each parse yielded is a new list.
+    The cells leaving each position are made once, when it is first
+    reached, and reused by every parse through it, so taking all the
+    parses takes no longer than `relate`.
+    """
+    dag: OptimalDag = optimal_dag(args)
+    if not dag.choices[0]:
+        return
+    edges: Dict[int, List[Edge]] = {}
+    path: List[Cell] = []
+    stack: List[Iterator[Edge]] = [iter(dag_edges(args, dag, 0))]
+    while stack:
+        edge: Optional[Edge] = next(stack[-1], None)
+        if edge is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        cell, tail = edge
+        path.append(cell)
+        if dag.choices[tail]:
+            tail_edges: Optional[List[Edge]] = edges.get(tail)
+            if tail_edges is None:
+                tail_edges = edges[tail] = dag_edges(args, dag, tail)
+            stack.append(iter(tail_edges))
+            continue
+        yield Parse(list(path))
+        if args.just_one:
+            return
+        path.pop()
+
+def count_optimal_alignments(args: Arguments) -> int:
+    """Return how many parses `relate` would find, without making them.
+
+    Like `relate`, counts no alignments between two empty sequences.
+    `args.just_one` is ignored.
+    >>> count_optimal_alignments(arguments('cat', 'cot'))
+    3
+    """
+    dag: OptimalDag = optimal_dag(args)
+    steps: Dict[Operation, int] = {
+        Operation.SUB: dag.width + 1, Operation.DEL: dag.width,
+        Operation.INS: 1}
+    counts: List[int] = [0] * len(dag.costs)
+    counts[-1] = 1
+    for index in range(len(counts) - 2, -1, -1):
+        counts[index] = sum(counts[index + steps[opus]]
+                            for opus, _ in dag.choices[index])
+    return counts[0] if dag.choices[0] else 0
+
 def format_cell(cell: Cell, source_widest: int, target_widest: int) -> str:
     """ Make printable representation for vertical alignment. """
     source = f"{(cell.source or ' '):<{source_widest}}"
@@ -189,10 +425,11 @@ def vertical_align(pars: Parse) -> str:
     = for no change), target character (white space if deletion),
     and cost of the operation.
     """
-    source_widest: int = biggest_length_in_parse(pars, 'source')
-    target_widest: int = biggest_length_in_parse(pars, 'target')
-    lines: List[str] = [format_cell(cell, source_widest, target_widest)
-                        for cell in pars]
+    with instrument.span('xducer.render'):
+        source_widest: int = biggest_length_in_parse(pars, 'source')
+        target_widest: int = biggest_length_in_parse(pars, 'target')
+        lines: List[str] = [format_cell(cell, source_widest, target_widest)
+                            for cell in pars]
     return '\n'.join(lines)
 
 # Local Variables:
@@ -0,0 +1,40 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" helpers.py
+
+Cost functions shared by the tests.
+
+They live at module level so that batch workers can pickle them and
+the command line can import them by name.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import unicodedata
+
+import pontospell.xducer as px
+
+def my_ins_cost(insertion):
+    """ 1 for letters, 0.25 for other symbols.
+
+    0.25 is exact in binary, so sums of these costs agree whatever order
+    the engines add them in.
+    """
+    return 1 if unicodedata.category(insertion[0]).startswith('L') else 0.25
+
+def cheap_vowels(src, targ):
+    """ Vowel-for-vowel substitutions cost 1 rather than 2. """
+    if src == targ:
+        return 0
+    return 1 if src in 'aeiou' and targ in 'aeiou' else 2
+
+VOWEL_COSTS = px.CostFunctions(substitute=cheap_vowels)
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -0,0 +1,84 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_batch.py
+
+Tests for batch module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import pytest  # type: ignore
+
+import pontospell.batch as batch
+import pontospell.chart as chart
+import pontospell.instrument as instrument
+import pontospell.xducer as px
+from tests.helpers import VOWEL_COSTS, cheap_vowels
+
+PAIRS = [('intention', 'execution'), ('cat', 'coats'), ('dag', 'doge'),
+         (['ll', 'a', 'dd'], ['ll', 'a']), ('être', 'etre')] * 3
+
+batch.register_costs('vowels', VOWEL_COSTS)
+
+def test_levenshtein_many_in_process():
+    """ Results match one-at-a-time scoring, in order. """
+    results = batch.levenshtein_many(PAIRS, chunk_size=4)
+    assert len(results) == len(PAIRS)
+    for (src, targ), scored in zip(PAIRS, results):
+        analysis = chart.levenshtein(src, targ)
+        assert scored.distance == chart.min_edit_distance(analysis)
+        assert scored.backtrace == chart.get_one_backtrace(analysis)
+    assert batch.levenshtein_many(PAIRS, distance_only=True) == [
+        scored.distance for scored in results]
+
+def test_levenshtein_many_workers():
+    """ A process pool gives the same results as a single process. """
+    expected = batch.levenshtein_many(PAIRS, 'vowels', distance_only=True)
+    assert expected[0] == chart.min_edit_distance(chart.levenshtein(
+        'intention', 'execution', sub_costs=cheap_vowels))
+    assert batch.levenshtein_many(
+        PAIRS, 'vowels', distance_only=True, workers=2, chunk_size=2) == (
+            expected)
+    assert batch.levenshtein_many(
+        PAIRS, VOWEL_COSTS, workers=2, chunk_size=3) == (
+            batch.levenshtein_many(PAIRS, VOWEL_COSTS))
+
+def test_relate_many():
+    """ Batch xducer parses match single calls. """
+    assert batch.relate_many(PAIRS[:5], just_one=True, workers=2) == [
+        px.relate(px.arguments(src, targ, just_one=True))
+        for src, targ in PAIRS[:5]]
+
+def test_levenshtein_targets():
+    """ Prefix-sharing scores match pair-by-pair scores, in order. """
+    spellings = ['becaus', 'becuase', 'becos', 'because', 'bec', '',
+                 'becuase', 'because', 'becauseee', 'bicause']
+    with instrument.recording() as recorder:
+        results = batch.levenshtein_targets('because', spellings, 'vowels')
+    assert results == batch.levenshtein_many(
+        [('because', targ) for targ in spellings], 'vowels')
+    assert recorder.counters['incremental.rows'] < sum(
+        len(targ) for targ in spellings) / 2
+    assert batch.levenshtein_targets(
+        'because', spellings, distance_only=True) == (
+            batch.levenshtein_many([('because', targ) for targ in spellings],
+                                   distance_only=True))
+    mixed = [['ll', 1], ['ll', 'a'], ['ll', 1, 2]]
+    assert batch.levenshtein_targets(['ll', 'a'], mixed) == (
+        batch.levenshtein_many([(['ll', 'a'], targ) for targ in mixed]))
+
+def test_bad_arguments():
+    """ Unknown cost names and empty chunks are rejected. """
+    with pytest.raises(ValueError):
+        batch.levenshtein_many(PAIRS, 'no such costs')
+    with pytest.raises(ValueError):
+        batch.levenshtein_many(PAIRS, chunk_size=0)
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -0,0 +1,117 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_cache.py
+
+Tests for cache module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import pickle
+
+import pontospell.cache as pcache
+import pontospell.chart as chart
+import pontospell.costs as pc
+import pontospell.xducer as px
+from tests.helpers import cheap_vowels
+
+def scaled_ins(factor):
+    """ Return Levenshtein insertion costs multiplied by factor. """
+    return lambda targ: factor * chart.lev_ins_function(targ)
+
+def test_results_match_engines():
+    """ Cached results are those the engines compute. """
+    cache = pcache.ResultCache()
+    for _ in range(2):
+        scored = cache.levenshtein('intention', 'execution')
+        analysis = chart.levenshtein('intention', 'execution')
+        assert scored.distance == chart.min_edit_distance(analysis)
+        assert scored.backtrace == chart.get_one_backtrace(analysis)
+        assert cache.relate('cat', 'cot') == px.relate(
+            px.arguments('cat', 'cot'))
+    assert cache.cache_info() == pcache.ResultCacheInfo(2, 0, 2, 4096, 2)
+
+def test_costs_distinguish_results():
+    """ Different cost functions never share results. """
+    cache = pcache.ResultCache()
+    assert cache.levenshtein('cat', 'cot').distance == 2
+    assert cache.levenshtein('cat', 'cot', sub_costs=cheap_vowels
+                            ).distance == 1
+    assert cache.levenshtein('cat', 'cats', ins_costs=scaled_ins(3)
+                            ).distance == 3
+    assert cache.levenshtein('cat', 'cats', ins_costs=scaled_ins(5)
+                            ).distance == 5
+    compiled = pc.CompiledCosts(
+        chart.lev_ins_function, chart.lev_del_function, cheap_vowels)
+    assert cache.levenshtein('cat', 'cot', costs=compiled).distance == 1
+    assert cache.cache_info().hits == 1
+    assert cache.relate('cat', 'cot', just_one=True) != cache.relate(
+        'cat', 'cot')
+
+def test_fingerprint_stable():
+    """ Equal functions get equal fingerprints; closures count. """
+    assert pcache.cost_fingerprint(scaled_ins(2)) == (
+        pcache.cost_fingerprint(scaled_ins(2)))
+    assert pcache.cost_fingerprint(scaled_ins(2)) != (
+        pcache.cost_fingerprint(scaled_ins(3)))
+    assert pcache.cost_fingerprint(cheap_vowels) != (
+        pcache.cost_fingerprint(chart.lev_sub_function))
+
+VOWEL_COST = {'a': 1}
+
+def table_sub(src, targ):
+    """ Substitution costs read from a module-level table. """
+    return 0 if src == targ else VOWEL_COST.get(src, 2)
+
+def test_fingerprint_reads_globals():
+    """ Changing a table a cost function reads changes its fingerprint. """
+    before = pcache.cost_fingerprint(table_sub)
+    assert pcache.cost_fingerprint(table_sub) == before
+    VOWEL_COST['a'] = 3
+    try:
+        assert pcache.cost_fingerprint(table_sub) != before
+    finally:
+        VOWEL_COST['a'] = 1
+
+class Unpicklable:
+    """ A hashable element that cannot be pickled. """
+    def __reduce__(self):
+        raise pickle.PicklingError('not this one')
+
+def test_disk_tier(tmp_path):
+    """ Results written by one cache are found by another. """
+    path = str(tmp_path / 'results.sqlite')
+    with pcache.ResultCache(path) as cache:
+        expected = cache.levenshtein(['ll', 'a', 'dd'], ['ll', 'a'])
+        parses = cache.relate('dag', 'doge', px.CostFunctions(
+            substitute=cheap_vowels))
+    with pcache.ResultCache(path) as cache:
+        assert cache.levenshtein(['ll', 'a', 'dd'], ['ll', 'a']) == expected
+        assert cache.relate('dag', 'doge', px.CostFunctions(
+            substitute=cheap_vowels)) == parses
+        assert cache.levenshtein('dag', 'doge').distance == 3
+        assert cache.levenshtein(('ll', 'a', 'dd'), ('ll', 'a')) == expected
+        assert cache.cache_info() == pcache.ResultCacheInfo(1, 2, 1, 4096, 3)
+
+def test_eviction_and_unhashable():
+    """ Memory holds `maxsize` results; unhashable pairs are not kept. """
+    cache = pcache.ResultCache(maxsize=2)
+    for target in ['cot', 'cut', 'cat']:
+        cache.levenshtein('cat', target)
+    assert cache.cache_info().currsize == 2
+    cache.levenshtein('cat', 'cot')
+    assert cache.cache_info().hits == 0
+    assert cache.levenshtein([['a'], ['b']], [['a']]).distance == 1
+    assert cache.cache_info().currsize == 2
+    cache.cache_clear()
+    assert cache.cache_info() == pcache.ResultCacheInfo(0, 0, 0, 2, 0)
+
+def test_unpicklable_keys(tmp_path):
+    """ Pairs whose keys cannot be pickled are kept only in memory. """
+    element = Unpicklable()
+    with pcache.ResultCache(str(tmp_path / 'results.sqlite')) as cache:
+        assert cache.levenshtein([element], [element]).distance == 0
+        assert cache.levenshtein([element], [element]).distance == 0
+        assert cache.cache_info() == pcache.ResultCacheInfo(1, 0, 1, 4096, 1)
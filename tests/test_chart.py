@@ -10,11 +10,13 @@ Tests for chart module, using pytest.
 # http://spell.psychology.wustl.edu/bkessler.html
 
 from math import sqrt
+import random
 import unicodedata
 
 import pytest  # type: ignore
 
 import pontospell.chart as ponto
+import pontospell.xducer as px
 
 def test_coordinates_not_2():
     """ Test run-time errors for Coordinates constructor. """
@@ -204,6 +206,144 @@ def test_backtrace():
         cell=ponto.Cell(
             this_cost=0, cumulative_cost=1, operation=ponto.Operation.SUB))
 
+def test_flat_engine_matches_dict_engine():
+    """ Flat-array engine gives the same matrix and alignment as dicts. """
+    def my_ins_cost(insertion):
+        """ 1 for letters, 0.2 for other symbols. """
+        return 1 if unicodedata.category(insertion).startswith('L') else 0.2
+    for src, targ, kwargs in [
+            ('intention', 'execution', {}),
+            ('cat', 'coats', {}),
+            (['ll', 'a', 'dd'], ['ll', 'a'], {}),
+            ('cowgirl', 'cow-girls', {'ins_costs': my_ins_cost})]:
+        by_dict = ponto.levenshtein(src, targ, **kwargs)
+        by_flat = ponto.levenshtein(
+            src, targ, engine=ponto.Engine.FLAT, **kwargs)
+        assert isinstance(by_flat.matrix, ponto.FlatMatrix)
+        assert dict(by_flat.matrix) == by_dict.matrix
+        assert ponto.min_edit_distance(by_flat) == (
+            ponto.min_edit_distance(by_dict))
+        assert ponto.get_one_backtrace(by_flat) == (
+            ponto.get_one_backtrace(by_dict))
+        assert ponto.vertical_alignment(by_flat) == (
+            ponto.vertical_alignment(by_dict))
+
+def test_flat_matrix_bounds():
+    """ FlatMatrix rejects coordinates outside the matrix. """
+    matrix = ponto.FlatMatrix(2, 3)
+    assert len(matrix) == 12
+    assert ponto.Coordinates(2, 3) in matrix
+    assert ponto.Coordinates(3, 0) not in matrix
+    with pytest.raises(KeyError):
+        #pylint: disable=expression-not-assigned
+        matrix[ponto.Coordinates(0, 4)]
+
+def test_distance():
+    """ Two-row distance agrees with the full matrix in both orientations. """
+    def my_del_cost(deletion):
+        """ 0.3 for ^ else 1 """
+        return 0.3 if deletion == '\N{COMBINING CIRCUMFLEX ACCENT}' else 1
+    def my_sub_cost(src, targ):
+        """ Mismatch is √2 """
+        return 0 if src == targ else sqrt(2)
+    for src, targ in [('intention', 'execution'), ('cat', 'coats'),
+                      ('coats', 'cat'), (['ll', 'a', 'dd'], ['ll', 'a']),
+                      (unicodedata.normalize('NFD', 'être'), 'etr'),
+                      ('bard', 'bart'), ('a', 'bcd')]:
+        for kwargs in [{}, {'del_costs': my_del_cost},
+                       {'sub_costs': my_sub_cost}]:
+            analysis = ponto.levenshtein(src, targ, **kwargs)
+            assert ponto.distance(src, targ, **kwargs) == (
+                ponto.min_edit_distance(analysis))
+    assert ponto.distance('', '') == 0
+    assert ponto.distance('', 'abc') == 3
+    assert ponto.distance('abc', '') == 3
+
+def test_bounded_distance():
+    """ Threshold search agrees with full distance, or gives up. """
+    def my_ins_cost(insertion):
+        """ 1 for letters, 0.2 for other symbols. """
+        return 1 if unicodedata.category(insertion).startswith('L') else 0.2
+    spellings = ['because', 'becuase', 'becos', 'bcz', 'cause', '',
+                 'because-', 'be-cause', 'bekause', 'xyzzy', 'becausebecause']
+    for src in ['because', 'cause']:
+        for targ in spellings:
+            for kwargs in [{}, {'ins_costs': my_ins_cost}]:
+                full = ponto.distance(src, targ, **kwargs)
+                for max_cost in [0, 0.2, 1, 1.2, 2, 3, 5, 8, 100]:
+                    bounded = ponto.distance(
+                        src, targ, max_cost=max_cost, **kwargs)
+                    assert bounded == (full if full <= max_cost else None)
+                    assert ponto.within(src, targ, max_cost, **kwargs) == (
+                        full <= max_cost)
+
+def test_bitparallel_distance():
+    """ Default costs take the bit-parallel path with the same results. """
+    rng = random.Random(24)
+    def same_ins_cost(insertion):
+        """ Levenshtein’s cost, but not his function. """
+        #pylint: disable=unused-argument
+        return 1
+    for _ in range(200):
+        src = [rng.choice(['ll', 'a', 3, None])
+               for _ in range(rng.randrange(70))]
+        targ = [rng.choice(['ll', 'a', 3])
+                for _ in range(rng.randrange(70))]
+        expected = ponto.distance(src, targ, same_ins_cost)
+        assert ponto.distance(src, targ) == expected
+        assert ponto.distance(src, targ, px.lev_ins_function,
+                              px.lev_del_function,
+                              px.lev_sub_function) == expected
+        assert ponto.bounded_distance(src, targ, 10) == (
+            expected if expected <= 10 else None)
+    unhashable = [['a'], ['b']]
+    assert ponto.distance(unhashable, [['b']]) == 1
+    assert ponto.within(unhashable, [['b']], 1)
+
+class ScaledSub:
+    """ Substitution costs as a callable that cannot be hashed. """
+    def __init__(self, scale):
+        self.scale = scale
+
+    def __eq__(self, other):
+        return isinstance(other, ScaledSub) and other.scale == self.scale
+
+    def __call__(self, src, targ):
+        return 0 if src == targ else self.scale
+
+def test_unhashable_cost_functions():
+    """ Callable instances with __eq__ but no hash are cost functions. """
+    sub_costs = ScaledSub(3)
+    assert ponto.distance('cat', 'cot', sub_costs=sub_costs) == 2
+    assert ponto.distance('cat', 'cut', sub_costs=ScaledSub(1)) == 1
+    assert ponto.within('cat', 'cot', 2, sub_costs=sub_costs)
+    assert not ponto.within('cat', 'cot', 1, sub_costs=sub_costs)
+    assert ponto.min_edit_distance(ponto.levenshtein(
+        'cat', 'cot', sub_costs=sub_costs)) == 2
+
+def test_matrices_not_shared():
+    """ Each analysis gets a matrix of its own. """
+    first = ponto.levenshtein('intention', 'execution')
+    second = ponto.levenshtein('cat', 'coats')
+    assert first.matrix is not second.matrix
+    assert len(second.matrix) == 4 * 6
+    assert ponto.Coordinates(9, 9) not in second.matrix
+
+def test_aligner_reuses_matrix():
+    """ Aligner results match levenshtein whether its matrix grows or not. """
+    aligner = ponto.Aligner()
+    matrix = aligner.matrix
+    for src, targ in [('cat', 'coats'), ('intention', 'execution'),
+                      ('dag', 'doge'), ('', 'abc'), ('abc', ''),
+                      (['ll', 'a', 'dd'], ['ll', 'a'])]:
+        result = aligner.levenshtein(src, targ)
+        assert result.matrix is matrix
+        expected = ponto.levenshtein(src, targ)
+        assert dict(result.matrix) == expected.matrix
+        assert ponto.vertical_alignment(result) == (
+            ponto.vertical_alignment(expected))
+    assert len(matrix.operations) == 100
+
 # Local Variables:
 # mode: python
 # indent-tabs-mode: nil
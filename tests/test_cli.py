@@ -0,0 +1,129 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_cli.py
+
+Tests for cli module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import csv
+import json
+
+import pytest  # type: ignore
+
+import pontospell.cli as cli
+
+def test_csv_to_csv(tmp_path):
+    """ Score a CSV file, keeping its columns and order. """
+    infile = tmp_path / 'responses.csv'
+    infile.write_text(
+        'subject,target,spelling\n'
+        's1,intention,execution\n'
+        's2,cat,kat\n'
+        's3,cat,\n', encoding='utf-8')
+    outfile = tmp_path / 'scored.csv'
+    assert cli.main(
+        [str(infile), '-o', str(outfile), '--chunk-size', '2']) == 0
+    with open(outfile, newline='', encoding='utf-8') as stream:
+        rows = list(csv.DictReader(stream))
+    assert [row['subject'] for row in rows] == ['s1', 's2', 's3']
+    assert [row['distance'] for row in rows] == ['8', '2', '3']
+    assert json.loads(rows[1]['alignment']) == [
+        ['c', 'k', 2], ['a', 'a', 0], ['t', 't', 0]]
+
+def test_jsonl_pronunciation_workers(tmp_path):
+    """ Pronunciation replaces target as source; output as TSV. """
+    infile = tmp_path / 'responses.jsonl'
+    infile.write_text(
+        '{"target": "cat", "pronunciation": "kæt", "spelling": "kat"}\n'
+        '\n'
+        '{"target": "dog", "spelling": "dg"}\n', encoding='utf-8')
+    outfile = tmp_path / 'scored.tsv'
+    assert cli.main([str(infile), '-o', str(outfile), '--distance-only',
+                     '--workers', '2', '--chunk-size', '1']) == 0
+    lines = outfile.read_text(encoding='utf-8').splitlines()
+    assert lines == ['target\tpronunciation\tspelling\tdistance',
+                     'cat\tkæt\tkat\t2',
+                     'dog\t\tdg\t1']
+
+def test_graphemes(tmp_path):
+    """ Listed letters are aligned whole. """
+    infile = tmp_path / 'responses.csv'
+    infile.write_text('target,spelling\nlladd,lad\n', encoding='utf-8')
+    outfile = tmp_path / 'scored.jsonl'
+    assert cli.main([str(infile), '-o', str(outfile),
+                     '--graphemes', 'll,dd']) == 0
+    row = json.loads(outfile.read_text(encoding='utf-8'))
+    assert row['distance'] == 4
+    assert row['alignment'] == [['ll', 'l', 2], ['a', 'a', 0], ['dd', 'd', 2]]
+
+def test_bad_csv_rows(tmp_path, capsys):
+    """ Short and long rows are reported by line and skipped. """
+    infile = tmp_path / 'responses.csv'
+    infile.write_text(
+        'subject,target,spelling\n'
+        's1,cat,kat\n'
+        's2,cat\n'
+        's3,dog,dg,extra\n'
+        's4,dog,dog\n', encoding='utf-8')
+    outfile = tmp_path / 'scored.csv'
+    assert cli.main([str(infile), '-o', str(outfile),
+                     '--distance-only']) == 0
+    with open(outfile, newline='', encoding='utf-8') as stream:
+        rows = list(csv.DictReader(stream))
+    assert [(row['subject'], row['distance']) for row in rows] == [
+        ('s1', '2'), ('s4', '0')]
+    assert capsys.readouterr().err.splitlines() == [
+        f'{infile}:3: skipping row: no spelling text',
+        f'{infile}:4: skipping row: more fields than the header']
+
+def test_jsonl_to_csv_with_varying_keys(tmp_path, capsys):
+    """ Output columns follow the first row; bad JSON is skipped. """
+    infile = tmp_path / 'responses.jsonl'
+    infile.write_text(
+        '{"target": "cat", "spelling": "kat", "subject": "s1"}\n'
+        '{"target": "cat", "spelling": "cat", "grade": 2}\n'
+        '{"target": "cat"\n'
+        '["cat", "kat"]\n'
+        '{"target": "cat", "spelling": 5}\n', encoding='utf-8')
+    outfile = tmp_path / 'scored.csv'
+    assert cli.main([str(infile), '-o', str(outfile),
+                     '--distance-only']) == 0
+    with open(outfile, newline='', encoding='utf-8') as stream:
+        rows = list(csv.DictReader(stream))
+    assert rows == [
+        {'target': 'cat', 'spelling': 'kat', 'subject': 's1',
+         'distance': '2'},
+        {'target': 'cat', 'spelling': 'cat', 'subject': '',
+         'distance': '0'}]
+    assert capsys.readouterr().err.splitlines() == [
+        f'{infile}:3: skipping row: not valid JSON',
+        f'{infile}:4: skipping row: not a JSON object',
+        f'{infile}:5: skipping row: no spelling text']
+
+def test_imported_costs(tmp_path, capsys):
+    """ Cost functions can be named by module and attribute. """
+    infile = tmp_path / 'responses.csv'
+    infile.write_text('target,spelling\ncat,cot\n', encoding='utf-8')
+    outfile = tmp_path / 'scored.jsonl'
+    assert cli.main([str(infile), '-o', str(outfile), '--distance-only',
+                     '--costs', 'tests.helpers:VOWEL_COSTS']) == 0
+    assert json.loads(outfile.read_text(encoding='utf-8'))['distance'] == 1
+    with pytest.raises(SystemExit):
+        cli.main([str(infile), '--costs', 'tests.helpers:cheap_vowels'])
+    assert 'is not a CostFunctions' in capsys.readouterr().err
+
+def test_guess_format():
+    """ Formats follow file name extensions. """
+    assert cli.guess_format('a.JSONL') == 'jsonl'
+    assert cli.guess_format('a.txt', 'tsv') == 'tsv'
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
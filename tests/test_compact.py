@@ -0,0 +1,68 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_compact.py
+
+Tests for compact module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+from fractions import Fraction
+
+import pontospell.chart as chart
+import pontospell.compact as compact
+import pontospell.xducer as px
+from tests.helpers import my_ins_cost
+
+PAIRS = [('intention', 'execution'), ('', 'abc'), ('abc', ''), ('', ''),
+         (['ll', 'a', 'dd'], ['ll', 'a']), ('être', 'etre'),
+         ('fish-monger', "fish'mngr")]
+
+def test_backtrace_round_trip():
+    """ Backtraces and their renderings survive compaction. """
+    for engine in chart.Engine:
+        for src, targ in PAIRS:
+            analysis = chart.levenshtein(
+                src, targ, ins_costs=my_ins_cost, engine=engine)
+            backtrace = chart.get_one_backtrace(analysis)
+            packed = compact.from_backtrace(backtrace)
+            assert len(packed.operations) == len(backtrace)
+            rebuilt = compact.to_backtrace(packed, src, targ)
+            assert rebuilt == backtrace
+            if engine != chart.Engine.NUMPY:  # NumPy totals are floats
+                assert [type(step.cell.cumulative_cost)
+                        for step in rebuilt] == [
+                            type(step.cell.cumulative_cost)
+                            for step in backtrace]
+            assert compact.vertical_alignment(packed, src, targ) == (
+                chart.vertical_alignment(analysis))
+
+def test_parse_round_trip():
+    """ Every co-optimal parse survives compaction. """
+    for src, targ in PAIRS[:3] + [('fish-monger', "fish'mngr")]:
+        costs = px.CostFunctions(insert=my_ins_cost)
+        for pars in px.relate(px.arguments(src, targ, costs)):
+            packed = compact.from_parse(pars)
+            assert compact.to_parse(packed, src, targ) == pars
+            assert compact.vertical_align(packed, src, targ) == (
+                px.vertical_align(pars))
+
+def test_int_costs_kept():
+    """ Integer costs come back as ints, floats as floats. """
+    packed = compact.pack('sid', [0, 0.5, 2])
+    assert packed.int_costs == 0b101
+    assert [type(cost) for cost in compact.step_costs(packed)] == [
+        int, float, int]
+
+def test_exact_costs_kept():
+    """ Fractions and big integers are not rounded through doubles. """
+    for costs in [[Fraction(1, 3), 0, Fraction(2, 3)],
+                  [2 ** 60 + 1, 0.5, 1]]:
+        packed = compact.pack('sid', costs)
+        rebuilt = compact.to_backtrace(packed, 'ab', 'bc')
+        assert [step.cell.this_cost for step in rebuilt] == costs
+        assert rebuilt[-1].cell.cumulative_cost == sum(costs)
+        assert compact.to_parse(packed, 'ab', 'bc')[0].cumul_cost == sum(
+            reversed(costs))
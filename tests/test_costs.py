@@ -0,0 +1,85 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_costs.py
+
+Tests for costs module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import pontospell.chart as chart
+import pontospell.costs as pc
+import pontospell.xducer as px
+from tests.helpers import my_ins_cost
+
+def test_memoized_calls():
+    """ Each distinct element is passed to the cost functions once. """
+    calls = []
+    def counting_sub(src, targ):
+        """ Levenshtein substitution, recording its arguments. """
+        calls.append((src, targ))
+        return px.lev_sub_function(src, targ)
+    compiled = pc.CompiledCosts(substitute=counting_sub)
+    assert compiled.substitute('a', 'b') == 2
+    assert compiled.substitute('a', 'b') == 2
+    assert compiled.substitute('a', 'a') == 0
+    assert calls == [('a', 'b'), ('a', 'a')]
+    assert compiled.substitute(['a'], ['a']) == 0  # unhashable
+    assert len(calls) == 3
+
+def test_memo_eviction():
+    """ Least recently used costs are dropped beyond `memo_size`. """
+    calls = []
+    def counting_ins(targ):
+        """ Levenshtein insertion, recording its argument. """
+        calls.append(targ)
+        return 1
+    compiled = pc.CompiledCosts(insert=counting_ins, memo_size=2)
+    for element in 'abacab':
+        compiled.insert(element)
+    assert calls == ['a', 'b', 'c', 'b']
+    assert list(compiled.insert_memo) == ['a', 'b']
+
+def test_table_cache_eviction():
+    """ Least recently used tables are dropped beyond `maxsize`. """
+    compiled = pc.CompiledCosts(maxsize=2)
+    first = compiled.table('cat', 'cot')
+    compiled.table('dog', 'dig')
+    assert compiled.table('tac', 'toc') is first
+    compiled.table('pig', 'peg')
+    assert compiled.cache_info() == pc.CacheInfo(1, 3, 2, 2)
+    assert compiled.table('cat', 'cot') is first
+    compiled.table('dog', 'dig')
+    assert compiled.cache_info().misses == 4
+    compiled.cache_clear()
+    assert compiled.cache_info() == pc.CacheInfo(0, 0, 2, 0)
+
+def test_chart_with_compiled_costs():
+    """ Chart results are unchanged when costs come from tables. """
+    compiled = pc.CompiledCosts(insert=my_ins_cost)
+    for src, targ in [('cowgirl', 'cow-girls'), ('intention', 'execution'),
+                      ('cat', 'coats')]:
+        expected = chart.levenshtein(src, targ, ins_costs=my_ins_cost)
+        for engine in chart.Engine:
+            result = chart.levenshtein(
+                src, targ, engine=engine, costs=compiled)
+            assert chart.get_one_backtrace(result) == (
+                chart.get_one_backtrace(expected))
+            assert chart.vertical_alignment(result) == (
+                chart.vertical_alignment(expected))
+
+def test_xducer_with_compiled_costs():
+    """ A CompiledCosts can stand in for CostFunctions. """
+    functions = px.CostFunctions(insert=my_ins_cost)
+    compiled = pc.CompiledCosts.from_cost_functions(functions)
+    assert px.relate(px.arguments('cowgirl', 'cow-girls', compiled)) == (
+        px.relate(px.arguments('cowgirl', 'cow-girls', functions)))
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
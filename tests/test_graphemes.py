@@ -0,0 +1,55 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_graphemes.py
+
+Tests for graphemes module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import re
+
+import pontospell.chart as chart
+from pontospell.graphemes import Tokenizer
+import pontospell.xducer as px
+
+ENGLISH = ['ch', 'sh', 'th', 'tch', 'igh', 'ough', 'ee', 'oo']
+
+def test_longest_match() -> None:
+    """ The longest letter wins, as with a regex tried longest first. """
+    tokenizer = Tokenizer(ENGLISH)
+    for text in ['thought', 'catch', 'high', 'sheetch', 'through', '',
+                 'o\\nugh', 'tc', 'ouch']:
+        expected = re.findall('ough|tch|igh|ch|sh|th|ee|oo|.', text,
+                              re.DOTALL)
+        assert list(tokenizer.segment(text)) == expected
+    assert tokenizer.segment('thought') == ('th', 'ough', 't')
+
+def test_interning_and_cache() -> None:
+    """ Letters are shared objects, and repeated strings come from cache. """
+    tokenizer = Tokenizer(ENGLISH, cache_size=2)
+    first = tokenizer.segment('ch' + 'ee')
+    second = tokenizer.split(''.join(['c', 'h', 'e', 'e']))
+    assert first == second
+    assert all(mine is theirs for mine, theirs in zip(first, second))
+    assert tokenizer.segment('chee') is first
+    assert tokenizer.segment.cache_info().hits == 1
+    ids = tokenizer.encode('cheetah')
+    assert ids[:2] == (ENGLISH.index('ch'), ENGLISH.index('ee'))
+    assert tokenizer.decode(ids) == tokenizer.segment('cheetah')
+    assert tokenizer.encode('cheetah') is ids
+
+def test_aligners() -> None:
+    """ Segments and ids align as whole letters in chart and xducer. """
+    tokenizer = Tokenizer(ENGLISH)
+    source = tokenizer.segment('thought')
+    target = tokenizer.segment('thot')
+    analysis = chart.levenshtein(source, target)
+    assert chart.min_edit_distance(analysis) == 2
+    assert chart.distance(tokenizer.encode('thought'),
+                          tokenizer.encode('thot')) == 2
+    parses = px.relate(px.arguments(source, target))
+    assert px.parse_cost(parses[0]) == 2
+    assert [cell.target for cell in parses[0]] == ['th', 'o', 't']
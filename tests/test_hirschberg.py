@@ -0,0 +1,57 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_hirschberg.py
+
+Tests for hirschberg module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import random
+
+import pontospell.chart as chart
+import pontospell.hirschberg as ph
+from tests.helpers import cheap_vowels, my_ins_cost
+
+def check_backtrace(backtrace, src, targ, **costs):
+    """ The backtrace is an optimal alignment of src with targ. """
+    analysis = chart.levenshtein(src, targ, **costs)
+    assert [step.source for step in backtrace
+            if step.source is not None] == list(src)
+    assert [step.target for step in backtrace
+            if step.target is not None] == list(targ)
+    cumulative = 0
+    for step in backtrace:
+        assert step.cell.operation == (
+            chart.Operation.INS if step.source is None else
+            chart.Operation.DEL if step.target is None else
+            chart.Operation.SUB)
+        cumulative += step.cell.this_cost
+        assert step.cell.cumulative_cost == cumulative
+    assert cumulative == chart.min_edit_distance(analysis)
+
+def test_small_pairs(monkeypatch):
+    """ Splitting right down to single rows gives optimal alignments. """
+    monkeypatch.setattr(ph, 'BASE_CELLS', 0)
+    rng = random.Random(5)
+    pairs = [('intention', 'execution'), ('', 'abc'), ('abc', ''), ('', ''),
+             (['ll', 'a', 'dd'], ['ll', 'a']), ('fish-monger', "fish'mngr")]
+    for _ in range(100):
+        pairs.append((
+            ''.join(rng.choice('abe-') for _ in range(rng.randrange(20))),
+            ''.join(rng.choice('abe-') for _ in range(rng.randrange(20)))))
+    for src, targ in pairs:
+        check_backtrace(ph.hirschberg(src, targ), src, targ)
+        check_backtrace(
+            ph.hirschberg(src, targ, my_ins_cost, sub_costs=cheap_vowels),
+            src, targ, ins_costs=my_ins_cost, sub_costs=cheap_vowels)
+
+def test_long_pair():
+    """ Long sequences are split, then finished with `chart`. """
+    rng = random.Random(7)
+    src = [rng.choice('abcdefgh') for _ in range(300)]
+    targ = [element for element in src if rng.random() < 0.9]
+    check_backtrace(ph.hirschberg(src, targ, sub_costs=cheap_vowels),
+                    src, targ, sub_costs=cheap_vowels)
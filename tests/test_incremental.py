@@ -0,0 +1,64 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_incremental.py
+
+Tests for incremental module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import random
+
+import pytest  # type: ignore
+
+import pontospell.chart as chart
+from pontospell.incremental import IncrementalAligner
+from tests.helpers import cheap_vowels
+
+def check_matches_chart(aligner, source, **costs):
+    """ The aligner's matrix is the one `chart` fills for its target. """
+    target = ''.join(aligner.target)
+    analysis = chart.levenshtein(source, target, engine=chart.Engine.FLAT,
+                                 **costs)
+    assert aligner.min_edit_distance() == chart.min_edit_distance(analysis)
+    assert dict(aligner.analysis().matrix) == dict(analysis.matrix)
+    assert aligner.backtrace() == chart.get_one_backtrace(analysis)
+
+def test_typing() -> None:
+    """ Each keystroke gives the distance from the whole matrix. """
+    aligner = IncrementalAligner('intention')
+    assert aligner.min_edit_distance() == 9
+    for letter in 'execution':
+        aligner.push(letter)
+        check_matches_chart(aligner, 'intention')
+    assert aligner.min_edit_distance() == 8
+    assert len(aligner) == 9
+    while aligner.target:
+        aligner.pop()
+        check_matches_chart(aligner, 'intention')
+    with pytest.raises(IndexError):
+        aligner.pop()
+
+def test_random_edits() -> None:
+    """ Random keystrokes and corrections with nondefault costs. """
+    rng = random.Random(22)
+    source = 'education'
+    aligner = IncrementalAligner(source, sub_costs=cheap_vowels)
+    for _ in range(200):
+        if aligner.target and rng.random() < 0.4:
+            aligner.pop()
+        else:
+            aligner.push(rng.choice('aeducnot'))
+        check_matches_chart(aligner, source, sub_costs=cheap_vowels)
+    assert aligner.update('edication') == 1
+    check_matches_chart(aligner, source, sub_costs=cheap_vowels)
+
+def test_empty_source() -> None:
+    """ Only insertions align with an empty source. """
+    aligner = IncrementalAligner('')
+    assert aligner.update('abc') == 3
+    check_matches_chart(aligner, '')
+    assert aligner.update('') == 0
+    assert aligner.backtrace() == []
@@ -0,0 +1,74 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_index.py
+
+Tests for index module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import pytest  # type: ignore
+
+import pontospell.chart as chart
+import pontospell.index as pi
+
+WORDS = ['because', 'cause', 'became', 'beast', 'bee', 'be', '', 'cat',
+         'coat', 'cot', 'dog', 'doge', 'dag', 'intention', 'execution',
+         'because', 'bicycle', 'cycle', 'sickle', 'tickle']
+SPELLINGS = ['becuz', 'bcos', 'koat', 'dgo', 'sikel', 'b', '', 'xyz',
+             'execushun', 'because']
+
+def brute_force(spelling, k, max_cost=None, **kwargs):
+    """ Score every word, keeping ties in list order. """
+    scored = [pi.Match(word, chart.distance(word, spelling, **kwargs))
+              for word in WORDS]
+    scored = [match for match in scored
+              if max_cost is None or match.cost <= max_cost]
+    return sorted(scored, key=lambda match: match.cost)[:k]
+
+def test_trie_matches_brute_force():
+    """ Trie search finds the same words as scoring the whole list. """
+    index = pi.TrieIndex(WORDS)
+    assert len(index) == len(WORDS)
+    for spelling in SPELLINGS:
+        for k in [1, 3, 30]:
+            for max_cost in [None, 0, 2, 5]:
+                assert index.nearest(spelling, k, max_cost) == (
+                    brute_force(spelling, k, max_cost))
+
+def test_trie_custom_costs():
+    """ Cost functions apply to the shared rows. """
+    def cheap_sub(src, targ):
+        """ Every mismatch costs 0.5. """
+        return 0 if src == targ else 0.5
+    index = pi.TrieIndex(WORDS, sub_costs=cheap_sub)
+    for spelling in SPELLINGS:
+        assert index.nearest(spelling, 4) == (
+            brute_force(spelling, 4, sub_costs=cheap_sub))
+
+def test_bk_tree_matches_brute_force():
+    """ BK-tree search agrees in its costs with scoring the whole list. """
+    tree = pi.BKTree(WORDS)
+    assert len(tree) == len(WORDS)
+    for spelling in SPELLINGS:
+        for k in [1, 3, 30]:
+            for max_cost in [None, 0, 2, 5]:
+                assert tree.nearest(spelling, k, max_cost) == (
+                    brute_force(spelling, k, max_cost))
+    assert pi.BKTree().nearest('abc') == []
+
+def test_k_must_be_positive():
+    """ Asking for no matches is an error, not an IndexError. """
+    for index in [pi.TrieIndex(WORDS), pi.BKTree(WORDS)]:
+        for k in [0, -1]:
+            with pytest.raises(ValueError):
+                index.nearest('becuz', k)
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -0,0 +1,88 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_instrument.py
+
+Tests for instrument module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import pickle
+
+import pontospell.chart as chart
+import pontospell.instrument as instrument
+import pontospell.paths as paths
+import pontospell.xducer as px
+
+def test_chart_counters():
+    """ Cells and cost calls are counted for each engine. """
+    for engine in [chart.Engine.DICT, chart.Engine.FLAT]:
+        with instrument.recording() as recorder:
+            result = chart.levenshtein('intention', 'execution',
+                                       engine=engine)
+            chart.get_one_backtrace(result)
+            assert chart.distance('cat', 'coats', lambda _: 1) == 2
+            assert chart.distance('cat', 'coats') == 2
+        assert recorder.counters['chart.cells'] == 99 + 23
+        assert recorder.counters['chart.sub_calls'] == 81 + 15
+        assert recorder.counters['chart.bitparallel_calls'] == 1
+        assert recorder.spans['chart.fill'] == 1
+        assert recorder.spans['chart.backtrace'] == 1
+        assert set(recorder.timings) == {'chart.fill', 'chart.backtrace'}
+    assert instrument.CURRENT is None
+    paths.optimal_paths(result)  # calls after recording are not counted
+    assert recorder.counters['chart.sub_calls'] == 81 + 15
+
+def test_analyses_keep_own_costs():
+    """ Analyses made while recording hold the caller's cost functions. """
+    aligner = chart.Aligner()
+    with instrument.recording() as recorder:
+        results = [chart.levenshtein('dag', 'doge', engine=engine)
+                   for engine in [chart.Engine.DICT, chart.Engine.FLAT]]
+        results.append(aligner.levenshtein('dag', 'doge'))
+    assert recorder.counters['chart.sub_calls'] == 3 * 12
+    for result in results:
+        assert result.sub_cost is chart.lev_sub_function
+        assert result.ins_cost is chart.lev_ins_function
+    copy = pickle.loads(pickle.dumps(results[0]))
+    assert chart.min_edit_distance(copy) == 3
+
+def test_xducer_counters():
+    """ Memory hits and pruned branches are counted. """
+    with instrument.recording() as recorder:
+        parses = px.relate(px.arguments('intention', 'execution'))
+        px.vertical_align(parses[0])
+    counters = recorder.counters
+    assert counters['xducer.cells'] == 100  # includes the end
+    assert counters['xducer.memo_hits'] > 0
+    assert counters['xducer.sub_calls'] == 81
+    assert counters['xducer.branches_pruned'] > 0
+    assert set(recorder.timings) == {'xducer.relate', 'xducer.render'}
+    with instrument.recording() as recorder:
+        assert px.count_optimal_alignments(
+            px.arguments('intention', 'execution')) == 134
+    assert recorder.counters['xducer.sub_calls'] == 81
+    assert recorder.spans['xducer.optimal_dag'] == 1
+
+def test_callback_and_nesting():
+    """ Spans are reported as they end; recorders nest. """
+    events = []
+    outer = instrument.Recorder(lambda name, seconds: events.append(name))
+    with instrument.recording(outer):
+        chart.vertical_alignment(chart.levenshtein('dag', 'doge'))
+        with instrument.recording() as inner:
+            chart.levenshtein('cat', 'cot')
+        assert instrument.CURRENT is outer
+    assert events == ['chart.fill', 'chart.backtrace', 'chart.render']
+    assert inner.counters['chart.cells'] == 15
+    assert outer.counters['chart.cells'] == 19
+    assert 'chart.render' in outer.report()
+
+def test_disabled_is_silent():
+    """ Nothing is recorded outside a `recording` block. """
+    assert instrument.CURRENT is None
+    with instrument.span('anything'):
+        instrument.count('anything')
+    assert chart.min_edit_distance(chart.levenshtein('dag', 'doge')) == 3
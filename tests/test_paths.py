@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_paths.py
+
+Tests for paths module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import random
+
+import pontospell.chart as chart
+import pontospell.paths as pp
+import pontospell.xducer as px
+
+def test_optimal_paths_counted():
+    """ Path counts agree with the xducer for every engine. """
+    for src, targ in [('intention', 'execution'), ('cat', 'coats'),
+                      ('', 'abc'), ('abc', ''), ('', ''),
+                      (['ll', 'a', 'dd'], ['ll', 'a'])]:
+        expected = px.count_optimal_alignments(px.arguments(src, targ))
+        for engine in chart.Engine:
+            result = chart.levenshtein(src, targ, engine=engine)
+            assert pp.count_optimal_paths(result) == max(expected, 1)
+
+def test_sample_backtrace():
+    """ Sampling returns every co-optimal alignment, about equally. """
+    result = chart.levenshtein('dag', 'doge')
+    tallies = {px.vertical_align(pars): 0
+               for pars in px.relate(px.arguments('dag', 'doge'))}
+    rng = random.Random(1)
+    for _ in range(200 * len(tallies)):
+        backtrace = pp.sample_backtrace(result, rng)
+        assert backtrace[-1].cell.cumulative_cost == 3
+        tallies[px.vertical_align([
+            px.Cell(step.source, step.target, step.cell.this_cost)
+            for step in backtrace])] += 1
+    assert len(tallies) == pp.count_optimal_paths(result) == 3
+    assert all(tally > 150 for tally in tallies.values())
+    assert pp.sample_backtrace(chart.levenshtein('', '')) == []
+
+def test_k_best_backtraces():
+    """ The cheapest alignments come first, without repeats. """
+    result = chart.levenshtein('intention', 'execution')
+    backtraces = pp.k_best_backtraces(result, 200)
+    assert len(backtraces) == 200
+    assert backtraces[0] == chart.get_one_backtrace(result)
+    costs = [backtrace[-1].cell.cumulative_cost for backtrace in backtraces]
+    assert costs == sorted(costs)
+    assert costs.count(8) == 134
+    steps = {tuple((step.source, step.target) for step in backtrace)
+             for backtrace in backtraces}
+    assert len(steps) == 200
+    for backtrace in backtraces:
+        assert sum(step.cell.this_cost for step in backtrace) == (
+            backtrace[-1].cell.cumulative_cost)
+    assert pp.k_best_backtraces(chart.levenshtein('', ''), 3) == [[]]
+    assert len(pp.k_best_backtraces(chart.levenshtein('a', 'b'), 5)) == 3
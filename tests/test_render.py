@@ -0,0 +1,57 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_render.py
+
+Tests for render module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import io
+import json
+
+import pontospell.chart as chart
+import pontospell.compact as compact
+import pontospell.render as render
+import pontospell.xducer as px
+
+PAIRS = [('intention', 'execution'), ('', 'abc'), ('abc', ''),
+         (['ll', 'a', 'dd'], ['ll', 'a']), ('être', 'etre'),
+         ('cre\N{COMBINING ACUTE ACCENT}e', 'cree')]
+
+def test_chart_rendering():
+    """ Output matches `chart.vertical_alignment`. """
+    for src, targ in PAIRS:
+        analysis = chart.levenshtein(src, targ)
+        backtrace = chart.get_one_backtrace(analysis)
+        formatter = render.AlignmentFormatter(src, targ)
+        expected = chart.vertical_alignment(analysis)
+        assert formatter.render(backtrace) == expected
+        assert formatter.render(compact.from_backtrace(backtrace)) == (
+            expected)
+        stream = io.StringIO()
+        formatter.write(backtrace, stream)
+        assert stream.getvalue() == (expected + '\n' if expected else '')
+
+def test_xducer_rendering():
+    """ Output matches `xducer.vertical_align` for every parse. """
+    for src, targ in PAIRS:
+        formatter = render.AlignmentFormatter(src, targ, render.text_len)
+        for pars in px.relate(px.arguments(src, targ)):
+            assert formatter.render(pars) == px.vertical_align(pars)
+
+def test_machine_readable():
+    """ TSV and JSON forms are unpadded. """
+    src, targ = ['ll', 'a', 'dd'], ['ll', 'a']
+    backtrace = chart.get_one_backtrace(chart.levenshtein(src, targ))
+    formatter = render.AlignmentFormatter(src, targ)
+    assert list(formatter.tsv_lines(backtrace)) == [
+        'll\t=\tll\t0', 'a\t=\ta\t0', 'dd\t>\t\t1']
+    stream = io.StringIO()
+    formatter.write_json([backtrace, backtrace], stream)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == [['ll', 'll', 0], ['a', 'a', 0],
+                                    ['dd', None, 1]]
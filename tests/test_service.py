@@ -0,0 +1,169 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_service.py
+
+Tests for service module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+
+import pytest  # type: ignore
+
+import pontospell.batch as batch
+import pontospell.service as ps
+import pontospell.xducer as px
+
+PAIRS = [('intention', 'execution'), ('cat', 'coats'), ('dag', 'doge'),
+         (['ll', 'a', 'dd'], ['ll', 'a']), ('être', 'etre')]
+
+def run(coroutine):
+    """ Run a coroutine in a fresh event loop. """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+def test_concurrent_requests():
+    """ Requests batched together get their own scores, in order. """
+    async def scenario():
+        service = ps.ScoringService(
+            executor=ThreadPoolExecutor(2), workers=2, batch_size=3,
+            max_queue=4)
+        await service.start()
+        replies = await asyncio.gather(*[
+            service.score(PAIRS[index:] + PAIRS[:index])
+            for index in range(len(PAIRS))])
+        stats = service.stats()
+        await service.stop()
+        return replies, stats
+    replies, stats = run(scenario())
+    expected = batch.levenshtein_many(PAIRS)
+    for index, reply in enumerate(replies):
+        assert reply.scores == expected[index:] + expected[:index]
+        assert reply.latency > 0
+    assert stats.requests == 5
+    assert stats.pairs == 25
+    assert stats.batches >= 25 / 3
+    assert stats.queued == 0
+    assert stats.max_latency >= stats.mean_latency > 0
+
+def test_process_pool_distance_only():
+    """ The default pool of processes scores distances. """
+    async def scenario():
+        service = ps.ScoringService(distance_only=True, workers=2)
+        await service.start()
+        reply = await service.score(PAIRS)
+        await service.stop()
+        return reply
+    assert run(scenario()).scores == batch.levenshtein_many(
+        PAIRS, distance_only=True)
+
+def test_errors_reach_requests():
+    """ A pair that cannot be scored fails its request, not the service. """
+    async def scenario():
+        service = ps.ScoringService(executor=ThreadPoolExecutor(1),
+                                    max_delay=0.1)
+        await service.start()
+        bad = asyncio.ensure_future(service.score([('cat', 5)]))
+        good = asyncio.ensure_future(service.score([('cat', 'cot')]))
+        with pytest.raises(TypeError):
+            await bad
+        reply = await good
+        stats = service.stats()
+        await service.stop()
+        return reply, stats
+    reply, stats = run(scenario())
+    assert reply.scores[0].distance == 2
+    assert stats.batches == 1
+
+def test_stop_fails_waiting_requests():
+    """ Pairs still queued when the service stops fail their requests. """
+    async def scenario():
+        service = ps.ScoringService(executor=ThreadPoolExecutor(1),
+                                    workers=1, batch_size=1)
+        await service.start()
+        waiting = asyncio.ensure_future(service.score(PAIRS * 4))
+        await asyncio.sleep(0)
+        await service.stop()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(waiting, 5)
+        with pytest.raises(RuntimeError):
+            await service.score(PAIRS)
+    run(scenario())
+
+def letters_only(src, targ):
+    """ Levenshtein substitution, defined only for lowercase letters. """
+    if not (src.isalpha() and targ.isalpha()):
+        raise ValueError(f'not a letter: {src!r} or {targ!r}')
+    return 0 if src == targ else 2
+
+async def request(reader, writer, method, path, body=b''):
+    """ Send an HTTP request; return the status and the JSON answer. """
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: test\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1')
+                 + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        if line.lower().startswith('content-length:'):
+            length = int(line.split(':')[1])
+    return status, json.loads(await reader.readexactly(length))
+
+def test_http_unscorable_pairs():
+    """ Pairs that cannot be scored get a JSON error, not a hang-up. """
+    async def scenario():
+        service = ps.ScoringService(
+            px.CostFunctions(substitute=letters_only),
+            executor=ThreadPoolExecutor(1))
+        server = await ps.serve(service, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        answers = [
+            await request(reader, writer, 'POST', '/score', json.dumps(
+                {'pairs': pairs}).encode())
+            for pairs in [[[None, 'doge']], [[5, 'doge']], [['dag']],
+                          [['d4g', 'doge']], [['dag', 'doge']]]]
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        await service.stop()
+        return answers
+    answers = run(scenario())
+    assert [status for status, _ in answers] == [400, 400, 400, 400, 200]
+    assert 'error' in answers[3][1]
+    assert answers[4][1]['scores'][0]['distance'] == 3
+
+def test_http_front_end():
+    """ Requests on one connection are answered in turn. """
+    async def scenario():
+        service = ps.ScoringService(executor=ThreadPoolExecutor(1))
+        server = await ps.serve(service, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        answers = [
+            await request(reader, writer, 'POST', '/score', json.dumps(
+                {'pairs': [['dag', 'doge'], ['cat', 'cat']]}).encode()),
+            await request(reader, writer, 'POST', '/score', b'{}'),
+            await request(reader, writer, 'GET', '/nowhere'),
+            await request(reader, writer, 'GET', '/stats')]
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        await service.stop()
+        return answers
+    answers = run(scenario())
+    assert [status for status, _ in answers] == [200, 400, 404, 200]
+    scores = answers[0][1]['scores']
+    assert [score['distance'] for score in scores] == [3, 0]
+    assert scores[0]['alignment'][-1] == [None, 'e', 1]
+    assert answers[3][1]['requests'] == 1
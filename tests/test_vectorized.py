@@ -0,0 +1,131 @@
+#! /usr/bin/env python
+# developed under 3.6.3
+
+""" test_vectorized.py
+
+Tests for vectorized module, using pytest.
+"""
+
+# Brett Kessler, Washington University in St. Louis
+# http://spell.psychology.wustl.edu/bkessler.html
+
+from fractions import Fraction
+from math import sqrt
+import random
+
+import pytest  # type: ignore
+
+import pontospell.chart as chart
+import pontospell.vectorized as vectorized
+from tests.helpers import my_ins_cost
+
+def my_sub_cost(src, targ):
+    """ Mismatch is √2 """
+    return 0 if src == targ else sqrt(2)
+
+def tie_sub_cost(src, targ):
+    """ Substitution costs the same as deletion plus insertion. """
+    return 0 if src == targ else 2.0
+
+def assert_same_analysis(src, targ, **kwargs):
+    """ NumPy engine gives cells and alignment identical to dicts. """
+    expected = chart.levenshtein(src, targ, **kwargs)
+    result = chart.levenshtein(src, targ, engine=chart.Engine.NUMPY, **kwargs)
+    assert dict(result.matrix) == expected.matrix
+    backtrace = chart.get_one_backtrace(result)
+    assert backtrace == chart.get_one_backtrace(expected)
+    assert [repr(step.cell.this_cost) for step in backtrace] == [
+        repr(step.cell.this_cost)
+        for step in chart.get_one_backtrace(expected)]
+    assert chart.vertical_alignment(result) == (
+        chart.vertical_alignment(expected))
+
+def test_numpy_engine_matches():
+    """ Identical results across cost profiles, including ties. """
+    pytest.importorskip('numpy')
+    rng = random.Random(7)
+    pairs = [('intention', 'execution'), ('cowgirl', 'cow-girls'),
+             ('cat', 'coats'), ('', 'abc'), ('abc', ''), ('a', 'a'),
+             (['ll', 'a', 'dd'], ['ll', 'a']), ((6, 78, 5), (6, 79, 5))]
+    for _ in range(20):
+        length = rng.randrange(1, 15)
+        pairs.append((''.join(rng.choice('abc-') for _ in range(12)),
+                      ''.join(rng.choice('abc-') for _ in range(length))))
+    for src, targ in pairs:
+        assert_same_analysis(src, targ)
+        assert_same_analysis(src, targ, sub_costs=my_sub_cost)
+        assert_same_analysis(src, targ, sub_costs=tie_sub_cost)
+        if all(isinstance(element, str) and len(element) == 1
+               for element in targ):
+            assert_same_analysis(src, targ, ins_costs=my_ins_cost)
+
+def test_numpy_engine_unhashable():
+    """ Unhashable elements fall back to the flat engine. """
+    result = chart.levenshtein([['a'], ['b']], [['a']],
+                               engine=chart.Engine.NUMPY)
+    assert chart.min_edit_distance(result) == 1
+    assert isinstance(result.matrix, chart.FlatMatrix)
+
+def third_sub_cost(src, targ):
+    """ Mismatch is exactly 1/3. """
+    return 0 if src == targ else Fraction(1, 3)
+
+def test_numpy_engine_inexact_costs():
+    """ Fractions are not rounded to floats; the flat engine is used. """
+    result = chart.levenshtein('abc', 'abd', sub_costs=third_sub_cost,
+                               engine=chart.Engine.NUMPY)
+    assert chart.min_edit_distance(result) == Fraction(1, 3)
+    scores = vectorized.score_targets('abc', ['abd', 'xyz'],
+                                      sub_costs=third_sub_cost)
+    assert list(scores.distances) == [Fraction(1, 3), 1]
+
+INS_TABLE = {'a': 1}
+
+def table_ins_cost(insertion):
+    """ Insertion costs read from a table that tests change. """
+    return INS_TABLE.get(insertion, 1)
+
+def test_costs_read_afresh():
+    """ Plain cost functions are consulted anew on every call. """
+    for cost in [1, 3]:
+        INS_TABLE['a'] = cost
+        for engine in chart.Engine:
+            assert chart.min_edit_distance(chart.levenshtein(
+                'b', 'ab', table_ins_cost, engine=engine)) == cost
+        assert list(vectorized.score_targets(
+            'b', ['ab'], table_ins_cost).distances) == [cost]
+    INS_TABLE['a'] = 1
+
+def test_score_targets_matches_pairs():
+    """ Batched scoring agrees with chart.levenshtein pair by pair. """
+    pytest.importorskip('numpy')
+    rng = random.Random(3)
+    targets = ['becuz', 'because', 'bcos', '', 'b', 'becausebecause']
+    targets += [''.join(rng.choice('beca-us') for _ in range(rng.randrange(9)))
+                for _ in range(40)]
+    for source in ['because', '', 'c']:
+        for kwargs in [{}, {'sub_costs': my_sub_cost},
+                       {'sub_costs': tie_sub_cost, 'ins_costs': my_ins_cost}]:
+            scores = vectorized.score_targets(
+                source, targets, backtraces=True, **kwargs)
+            assert len(scores.distances) == len(targets)
+            for target, cost, backtrace in zip(
+                    targets, scores.distances, scores.backtraces):
+                analysis = chart.levenshtein(source, target, **kwargs)
+                assert cost == chart.min_edit_distance(analysis)
+                assert backtrace == chart.get_one_backtrace(analysis)
+    assert list(vectorized.score_targets('abc', []).distances) == []
+
+def test_score_targets_unhashable():
+    """ Unhashable elements are scored one pair at a time. """
+    scores = vectorized.score_targets(
+        [['a'], ['b']], [[['a']], [['b'], ['c']]], backtraces=True)
+    assert scores.distances == [1, 2]
+    assert scores.backtraces[0][0].source == ['a']
+
+# Local Variables:
+# mode: python
+# indent-tabs-mode: nil
+# tab-width: 4
+# coding: utf-8-unix
+# End:
@@ -9,10 +9,11 @@ Tests for xducer module, using pytest.
 # Brett Kessler, Washington University in St. Louis
 # http://spell.psychology.wustl.edu/bkessler.html
 
+import random
 from sys import stderr
-from typing import Set
+from typing import List, Optional, Set, cast
 
-#import pytest  # type: ignore
+import pytest  # type: ignore
 
 import pontospell.xducer as px
 
@@ -171,3 +172,107 @@ r = r  0
 l = l  0
   < s  1
 '''
+
+def test_iter_relate_matches_relate() -> None:
+    """ The iterative engine yields the recursive engine's parses. """
+    for src, targ in [('intention', 'execution'), ('cat', 'coats'),
+                      ('', 'cat'), ('cat', ''), ('', '')]:
+        args = px.arguments(src, targ)
+        assert list(px.iter_relate(args)) == px.relate(args)
+        assert px.count_optimal_alignments(args) == len(px.relate(args))
+    one_args = px.arguments('intention', 'execution', just_one=True)
+    assert list(px.iter_relate(one_args)) == px.relate(one_args)
+
+def try_op(args: px.Arguments, start_pos: px.Coordinates,
+           opus: px.Operation) -> px.Parses:
+    """ Apply operation here, then parse rest of strings, unpruned. """
+    tail: px.Parses = px.relate(args, px.advance(start_pos, opus))
+    cost: px.Cost = px.op_cost(args, start_pos, opus)
+    cell = px.make_cell(args, start_pos, opus, cost, cost)
+    if not tail:
+        return px.Parses([px.Parse([cell])])
+    return px.Parses([
+        px.Parse([cell._replace(cumul_cost=cell.this_cost
+                                + px.parse_cost(p))] + p)
+        for p in tail])
+
+def remove_suboptimal_parses(parses: px.Parses,
+                             just_one: bool) -> px.Parses:
+    """ Return all parses that have same optimal cost. """
+    minimum = min(px.parse_cost(pars) for pars in parses)
+    minimal_parses = [pars for pars in parses
+                      if px.parse_cost(pars) == minimum]
+    if just_one:
+        return px.Parses([minimal_parses[0]])
+    return px.Parses(minimal_parses)
+
+def test_pruning_matches_full_expansion() -> None:
+    """ Parses built after pruning are those that full expansion keeps. """
+    def expanded(args: px.Arguments,
+                 start_pos: px.Coordinates) -> px.Parses:
+        if start_pos in args.memory:
+            return args.memory[start_pos]
+        parses = px.Parses([])
+        remaining_source = len(args.source) - start_pos.source
+        remaining_target = len(args.target) - start_pos.target
+        for opus, possible in ((px.Operation.SUB,
+                                remaining_source and remaining_target),
+                               (px.Operation.DEL, remaining_source),
+                               (px.Operation.INS, remaining_target)):
+            if possible:
+                expanded(args, px.advance(start_pos, opus))
+                parses.extend(try_op(args, start_pos, opus))
+        if parses:
+            parses = remove_suboptimal_parses(parses, args.just_one)
+        args.memory[start_pos] = parses
+        return parses
+    rng = random.Random(20)
+    for _ in range(30):
+        src = ''.join(rng.choice('abc') for _ in range(rng.randrange(7)))
+        targ = ''.join(rng.choice('abc') for _ in range(rng.randrange(7)))
+        for just_one in (False, True):
+            old_args = px.arguments(src, targ, just_one=just_one)
+            assert px.relate(px.arguments(src, targ, just_one=just_one)) == (
+                expanded(old_args, px.Coordinates(0, 0)))
+
+def test_linked_parses() -> None:
+    """ Linked parses equal list parses and share their suffixes. """
+    for src, targ in [('intention', 'execution'), ('cat', 'coats'),
+                      ('', 'cat'), ('cat', ''), ('', '')]:
+        for just_one in (False, True):
+            linked = px.relate(
+                px.arguments(src, targ, just_one=just_one, linked=True))
+            plain = px.relate(px.arguments(src, targ, just_one=just_one))
+            assert linked == plain
+            assert [px.vertical_align(p) for p in linked] == (
+                [px.vertical_align(p) for p in plain])
+    chains: List[px.LinkedParse] = cast(List[px.LinkedParse], px.relate(
+        px.arguments('intention', 'execution', linked=True)))
+    nodes: Set[int] = set()
+    for pars in chains:
+        node: Optional[px.LinkedParse] = pars
+        while node is not None:
+            nodes.add(id(node))
+            node = node.rest
+    assert len(nodes) < sum(len(pars) for pars in chains) // 4
+    first, second = chains[0], chains[1]
+    while len(first) > 4 and first.rest is not None:
+        first = first.rest
+    while len(second) > 4 and second.rest is not None:
+        second = second.rest
+    assert first is second
+    assert px.parse_cost(chains[0]) == 8
+    assert chains[0][-1] == chains[0][9] == px.Cell('n', 'n', 0, 0)
+    assert chains[0][:2] == list(chains[0])[:2]
+    with pytest.raises(IndexError):
+        chains[0][10]  #pylint: disable=pointless-statement
+
+def test_iter_relate_long() -> None:
+    """ Sequences too long for the recursive engine. """
+    src = 'ab' * 200
+    targ = 'ba' * 200
+    args = px.arguments(src, targ)
+    assert px.count_optimal_alignments(args) == 2
+    first_parse: px.Parse = next(px.iter_relate(args))
+    assert px.parse_cost(first_parse) == 2
+    assert len(first_parse) == 401